@@ -0,0 +1,103 @@
+"""
+Costo de arranque de un worker: tiempo de importación y memoria (RSS).
+
+Cada repetición corre en un proceso nuevo (arranque en frío) que hace lo
+mismo que un worker WSGI al iniciar: `get_wsgi_application()` y la carga
+de las URLs (que importa core.views). Se mide:
+
+    - ms: tiempo desde antes de importar Django hasta tener las URLs
+    - rss_kb: memoria máxima del proceso (ru_maxrss)
+    - modulos: módulos cargados en sys.modules
+    - reportlab: si reportlab quedó importado
+
+El caso `worker_con_pdf` además pide el exportador PDF del registro
+(core.exporters), o sea lo que paga un worker la primera vez que genera un
+PDF; la diferencia con `worker` es lo que se ahorra al cargarlo recién ahí.
+
+Uso (desde sistema_escolar/):
+    python benchmarks/arranque.py --salida resultados/arranque.json
+    python benchmarks/arranque.py --repeticiones 20 --comparar resultados/arranque.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from comun import PROYECTO, comparar, guardar
+
+
+# Código que corre en cada proceso hijo; imprime una línea JSON
+MEDIR = """
+import json, os, resource, sys, time
+inicio = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.conf import settings
+from importlib import import_module
+get_wsgi_application()
+import_module(settings.ROOT_URLCONF)
+if {con_pdf}:
+    from core import exporters
+    exporters.exportador('pdf')
+print(json.dumps({{
+    'ms': (time.perf_counter() - inicio) * 1000,
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modulos': len(sys.modules),
+    'reportlab': 'reportlab' in sys.modules,
+}}))
+"""
+
+CASOS = (('worker', False), ('worker_con_pdf', True))
+
+
+def medir(nombre, con_pdf, repeticiones):
+    """Corre `repeticiones` procesos nuevos y resume sus mediciones"""
+    entorno = dict(os.environ, DJANGO_SETTINGS_MODULE='sistema_escolar.settings')
+    corridas = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', MEDIR.format(con_pdf=con_pdf)],
+            cwd=PROYECTO, env=entorno, capture_output=True, text=True, check=True,
+        ).stdout
+        corridas.append(json.loads(salida.strip().splitlines()[-1]))
+    tiempos = sorted(c['ms'] for c in corridas)
+    return {
+        'nombre': nombre,
+        'repeticiones': repeticiones,
+        'min_ms': round(tiempos[0], 3),
+        'p50_ms': round(statistics.median(tiempos), 3),
+        'rss_kb': statistics.median(c['rss_kb'] for c in corridas),
+        'modulos': corridas[-1]['modulos'],
+        'reportlab': corridas[-1]['reportlab'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument('--comparar', metavar='ANTERIOR.json', help="Compara contra una corrida guardada.")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'caso':<20} {'min ms':>9} {'p50 ms':>9} {'RSS KB':>9} {'módulos':>8} {'reportlab':>10}")
+    for nombre, con_pdf in CASOS:
+        r = medir(nombre, con_pdf, args.repeticiones)
+        resultados.append(r)
+        print(
+            f"{nombre:<20} {r['min_ms']:>9.1f} {r['p50_ms']:>9.1f} {r['rss_kb']:>9.0f} "
+            f"{r['modulos']:>8} {'sí' if r['reportlab'] else 'no':>10}",
+            flush=True,
+        )
+
+    parametros = {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')}
+    if args.salida:
+        guardar(args.salida, 'arranque', parametros, resultados)
+        print(f"\nResultados guardados en {args.salida}", file=sys.stderr)
+    if args.comparar:
+        comparar(args.comparar, resultados)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark del exportador PDF: tabla única (implementación anterior) vs. por bloques.
+
+Genera filas sintéticas con el formato del reporte de estudiantes, sin base
+de datos, y mide tiempo y pico de memoria (tracemalloc) de cada motor.
+
+Uso (desde sistema_escolar/):
+    python benchmarks/bench_pdf.py --filas 1000 10000 100000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from core.pdf import ReportePDF
+
+ENCABEZADOS = ['Nombre', 'Apellido', 'Documento', 'Email', 'F. Nacimiento', 'Activo']
+ANCHOS = [1.3*inch, 1.3*inch, 1.2*inch, 1.3*inch, 1.1*inch, 0.7*inch]
+
+
+def filas_sinteticas(cantidad):
+    """Filas ya formateadas como las produce el listado de estudiantes"""
+    for i in range(cantidad):
+        yield [
+            f'Nombre{i}', f'Apellido{i}', str(1000000 + i), f'alumno{i}@mail.com',
+            date(2000 + i % 10, i % 12 + 1, i % 28 + 1).strftime('%d/%m/%Y'),
+            'Sí' if i % 7 else 'No',
+        ]
+
+
+def exportador_anterior(destino, filas):
+    """Reproduce el export_pdf original: una sola Table con todas las filas"""
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    story = []
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=18,
+                                 textColor=colors.HexColor('#2c3e50'), spaceAfter=20, alignment=1)
+    story.append(Paragraph('Reporte de Estudiantes', title_style))
+    story.append(Spacer(1, 0.2*inch))
+    data = [ENCABEZADOS] + list(filas)
+    table = Table(data, colWidths=ANCHOS)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
+    ]))
+    story.append(table)
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
+    story.append(Spacer(1, 0.3*inch))
+    story.append(Paragraph(f'Generado: {datetime.now().strftime("%d/%m/%Y %H:%M")}', footer_style))
+    doc.build(story)
+
+
+def exportador_por_bloques(destino, filas):
+    ReportePDF('Reporte de Estudiantes', ENCABEZADOS, ANCHOS).render(destino, filas)
+
+
+def medir(exportador, cantidad):
+    """Retorna (segundos, pico de memoria en MB, tamaño del PDF en KB)"""
+    destino = io.BytesIO()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    exportador(destino, filas_sinteticas(cantidad))
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20, len(destino.getvalue()) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--sin-anterior', action='store_true',
+                        help="Omite el exportador anterior (útil con 100k filas o más).")
+    args = parser.parse_args()
+
+    motores = [('por bloques', exportador_por_bloques)]
+    if not args.sin_anterior:
+        motores.insert(0, ('tabla única', exportador_anterior))
+
+    print(f"{'filas':>8}  {'motor':<12} {'segundos':>9} {'pico MB':>9} {'PDF KB':>9}")
+    for cantidad in args.filas:
+        for nombre, exportador in motores:
+            segundos, pico, tamano = medir(exportador, cantidad)
+            print(f"{cantidad:>8}  {nombre:<12} {segundos:>9.2f} {pico:>9.1f} {tamano:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Prueba de carga: compara el rendimiento del sitio servido por WSGI y por ASGI.
+
+Abre `--concurrencia` clientes HTTP simultáneos (conexiones keep-alive) que
+piden las rutas indicadas durante `--duracion` segundos y reporta pedidos por
+segundo y latencias p50/p95/p99. Con `--lentitud` cada cliente lee la
+respuesta de a poco, como un celular con mala señal: ahí es donde ASGI
+atiende más clientes con menos procesos.
+
+Solo usa la biblioteca estándar. Los servidores pueden estar ya levantados
+(--url) o el script los levanta y los baja uno por uno (--servidor):
+
+    python benchmarks/carga_wsgi_asgi.py --usuario admin --clave admin \\
+        --servidor wsgi 8001 "gunicorn sistema_escolar.wsgi -w 2 --threads 4 -b 127.0.0.1:8001" \\
+        --servidor asgi 8002 "uvicorn sistema_escolar.asgi:application --workers 2 --port 8002" \\
+        --ruta /estudiantes/ --ruta /cursos/ --concurrencia 200 --duracion 15
+
+    python benchmarks/carga_wsgi_asgi.py --url wsgi=http://127.0.0.1:8000 --ruta / \\
+        --salida resultados/carga.json --comparar resultados/carga_anterior.json
+
+Se ejecuta desde la carpeta del proyecto (donde está manage.py).
+"""
+import argparse
+import asyncio
+import http.cookiejar
+import re
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from comun import comparar, guardar
+
+
+def iniciar_sesion(base, usuario, clave):
+    """Inicia sesión con el formulario de login y retorna la cookie de sesión"""
+    cookies = http.cookiejar.CookieJar()
+    abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    login = f"{base}/accounts/login/"
+    html = abridor.open(login).read().decode()
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html).group(1)
+    datos = urllib.parse.urlencode({'username': usuario, 'password': clave, 'csrfmiddlewaretoken': token})
+    pedido = urllib.request.Request(login, data=datos.encode(), headers={'Referer': login})
+    abridor.open(pedido).read()
+    sesion = {c.name: c.value for c in cookies}
+    if 'sessionid' not in sesion:
+        raise SystemExit(f"No se pudo iniciar sesión en {login} con el usuario '{usuario}'")
+    return '; '.join(f"{nombre}={valor}" for nombre, valor in sesion.items())
+
+
+async def _leer_respuesta(lector, lentitud):
+    """Lee una respuesta HTTP/1.1 completa (Content-Length o chunked) y retorna el status"""
+    linea = await lector.readline()
+    if not linea:
+        raise ConnectionError("Conexión cerrada por el servidor")
+    status = int(linea.split()[1])
+    encabezados = {}
+    while (linea := await lector.readline()) not in (b'\r\n', b'\n', b''):
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        encabezados[nombre.strip().lower()] = valor.strip()
+
+    async def leer(cantidad):
+        while cantidad > 0:
+            parte = await lector.read(min(cantidad, 16384))
+            if not parte:
+                raise ConnectionError("Respuesta incompleta")
+            cantidad -= len(parte)
+            if lentitud:
+                await asyncio.sleep(lentitud)
+
+    if encabezados.get('transfer-encoding') == 'chunked':
+        while (tamano := int((await lector.readline()).split(b';')[0], 16)) > 0:
+            await leer(tamano + 2)
+        await lector.readline()
+    else:
+        await leer(int(encabezados.get('content-length', 0)))
+    return status, encabezados.get('connection', '').lower() == 'close'
+
+
+async def _cliente(host, puerto, rutas, cookie, fin, lentitud, latencias, errores):
+    """Un cliente keep-alive que repite los pedidos hasta `fin`"""
+    conexion = None
+    i = 0
+    while time.perf_counter() < fin:
+        ruta = rutas[i % len(rutas)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            if conexion is None:
+                conexion = await asyncio.open_connection(host, puerto)
+            lector, escritor = conexion
+            escritor.write(
+                f"GET {ruta} HTTP/1.1\r\nHost: {host}:{puerto}\r\nCookie: {cookie}\r\n"
+                f"Connection: keep-alive\r\n\r\n".encode()
+            )
+            await escritor.drain()
+            status, cerrar = await _leer_respuesta(lector, lentitud)
+            if status >= 400:
+                errores.append(status)
+            else:
+                latencias.append(time.perf_counter() - inicio)
+            if cerrar:
+                escritor.close()
+                conexion = None
+        except (OSError, ConnectionError, ValueError, IndexError) as exc:
+            errores.append(type(exc).__name__)
+            conexion = None
+    if conexion is not None:
+        conexion[1].close()
+
+
+async def medir(base, rutas, cookie, concurrencia, duracion, lentitud):
+    """Ejecuta la carga contra `base` y retorna las métricas"""
+    url = urllib.parse.urlsplit(base)
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    await asyncio.gather(*[
+        _cliente(url.hostname, url.port or 80, rutas, cookie, fin, lentitud, latencias, errores)
+        for _ in range(concurrencia)
+    ])
+    transcurrido = time.perf_counter() - inicio
+    percentiles = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else [0] * 99
+    return {
+        'pedidos': len(latencias),
+        'errores': len(errores),
+        'pedidos_por_segundo': len(latencias) / transcurrido,
+        'p50_ms': percentiles[49] * 1000,
+        'p95_ms': percentiles[94] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+    }
+
+
+def esperar_puerto(puerto, proceso, espera=30):
+    """Espera a que el servidor recién lanzado acepte conexiones"""
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise SystemExit(f"El servidor terminó al arrancar (código {proceso.returncode})")
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"El servidor no respondió en el puerto {puerto}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servidor', nargs=3, action='append', default=[], metavar=('NOMBRE', 'PUERTO', 'COMANDO'),
+                        help="Servidor a lanzar y medir (se puede repetir).")
+    parser.add_argument('--url', action='append', default=[], metavar='NOMBRE=URL',
+                        help="Servidor ya levantado a medir (se puede repetir).")
+    parser.add_argument('--ruta', action='append', metavar='RUTA', help="Ruta a pedir (por defecto /).")
+    parser.add_argument('--usuario', help="Usuario para iniciar sesión (las vistas requieren login).")
+    parser.add_argument('--clave', default='')
+    parser.add_argument('--concurrencia', type=int, default=100)
+    parser.add_argument('--duracion', type=float, default=10)
+    parser.add_argument('--lentitud', type=float, default=0,
+                        help="Segundos de espera por cada bloque de 16 KB leído (clientes lentos).")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument('--comparar', metavar='ANTERIOR.json', help="Compara contra una corrida guardada.")
+    args = parser.parse_args()
+
+    objetivos = [(nombre, f"http://127.0.0.1:{puerto}", comando) for nombre, puerto, comando in args.servidor]
+    objetivos += [(*item.split('=', 1), None) for item in args.url]
+    if not objetivos:
+        parser.error("Indique al menos un --servidor o una --url")
+    rutas = args.ruta or ['/']
+
+    resultados = []
+    for nombre, base, comando in objetivos:
+        proceso = None
+        if comando:
+            proceso = subprocess.Popen(shlex.split(comando))
+            esperar_puerto(urllib.parse.urlsplit(base).port, proceso)
+        try:
+            cookie = iniciar_sesion(base, args.usuario, args.clave) if args.usuario else ''
+            print(f"{nombre}: {args.concurrencia} clientes durante {args.duracion:g}s contra {base} ...", file=sys.stderr)
+            metricas = asyncio.run(medir(base, rutas, cookie, args.concurrencia, args.duracion, args.lentitud))
+            resultados.append({'nombre': nombre, **metricas})
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+
+    print(f"{'servidor':<10} {'pedidos':>8} {'errores':>8} {'ped/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in resultados:
+        print(
+            f"{r['nombre']:<10} {r['pedidos']:>8} {r['errores']:>8} {r['pedidos_por_segundo']:>9.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+
+    parametros = {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar', 'clave')}
+    if args.salida:
+        guardar(args.salida, 'carga', parametros, resultados)
+        print(f"\nResultados guardados en {args.salida}", file=sys.stderr)
+    if args.comparar:
+        comparar(args.comparar, resultados)
+
+
+if __name__ == '__main__':
+    main()
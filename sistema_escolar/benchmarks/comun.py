@@ -0,0 +1,114 @@
+"""
+Funciones compartidas por los benchmarks: preparar Django contra una base de
+prueba y guardar / comparar resultados en JSON.
+
+Los resultados de cada corrida se guardan como:
+
+    {
+      "tipo": "vistas" | "carga",
+      "fecha": "2026-10-18T12:00:00",
+      "commit": "abc1234",
+      "entorno": {"python": "3.11.7", "django": "5.2", "base": "..."},
+      "parametros": {...},            # argumentos de la corrida
+      "escala": {"estudiantes": 100000, ...},
+      "resultados": [{"nombre": "...", "p50_ms": ..., ...}, ...]
+    }
+
+y `--comparar anterior.json` muestra la diferencia de cada caso contra otra
+corrida (misma clave "nombre").
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PROYECTO = Path(__file__).resolve().parent.parent
+
+# Columnas que se comparan entre corridas (menor es mejor, salvo pedidos/s)
+METRICAS_COMPARABLES = ('p50_ms', 'p95_ms', 'p99_ms', 'pedidos_por_segundo', 'consultas', 'rss_kb')
+
+
+def preparar_django(base=None, cache='dummy'):
+    """
+    Configura Django para correr en este proceso.
+
+    Args:
+        base (str): Archivo SQLite a usar (DB_NAME); None deja el de .env
+        cache (str): CACHE_BACKEND; 'dummy' mide sin caché
+    """
+    sys.path.insert(0, str(PROYECTO))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sistema_escolar.settings')
+    if base:
+        os.environ['DB_NAME'] = str(Path(base).resolve())
+    os.environ['CACHE_BACKEND'] = cache
+    # El cliente de pruebas de Django pide con Host: testserver
+    hosts = os.environ.get('ALLOWED_HOSTS', '127.0.0.1,localhost')
+    os.environ['ALLOWED_HOSTS'] = f"{hosts},testserver"
+    import django
+    django.setup()
+
+
+def escala():
+    """Cantidad de filas de cada tabla (requiere preparar_django)"""
+    from core.models import Curso, Estudiante, Matricula, Profesor
+
+    return {
+        'profesores': Profesor.objects.count(),
+        'cursos': Curso.objects.count(),
+        'estudiantes': Estudiante.objects.count(),
+        'matriculas': Matricula.objects.count(),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROYECTO, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def guardar(ruta, tipo, parametros, resultados, escala_datos=None):
+    """Escribe la corrida en `ruta` (JSON) y retorna el documento"""
+    documento = {
+        'tipo': tipo,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'parametros': parametros,
+        'escala': escala_datos,
+        'resultados': resultados,
+    }
+    try:
+        import django
+        documento['entorno']['django'] = django.get_version()
+    except ImportError:
+        pass
+    Path(ruta).write_text(json.dumps(documento, indent=2, ensure_ascii=False))
+    return documento
+
+
+def comparar(ruta_anterior, resultados, salida=sys.stdout):
+    """Imprime, por caso, el valor anterior, el actual y la variación porcentual"""
+    anterior = json.loads(Path(ruta_anterior).read_text())
+    previos = {fila['nombre']: fila for fila in anterior['resultados']}
+    print(f"\nComparación contra {ruta_anterior} (commit {anterior.get('commit')}, {anterior.get('fecha')}):", file=salida)
+    print(f"{'caso':<32} {'métrica':<20} {'antes':>10} {'ahora':>10} {'cambio':>8}", file=salida)
+    for fila in resultados:
+        previa = previos.get(fila['nombre'])
+        if previa is None:
+            continue
+        for metrica in METRICAS_COMPARABLES:
+            if metrica not in fila or metrica not in previa:
+                continue
+            antes, ahora = previa[metrica], fila[metrica]
+            cambio = f"{(ahora - antes) / antes * 100:+.1f}%" if antes else '-'
+            print(f"{fila['nombre']:<32} {metrica:<20} {antes:>10.2f} {ahora:>10.2f} {cambio:>8}", file=salida)
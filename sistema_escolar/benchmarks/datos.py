@@ -0,0 +1,68 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Crea una base SQLite nueva (migrada) con N estudiantes, M cursos, P
+profesores y K matrículas por estudiante usando core.generador (el mismo de
+`manage.py create_setup`). Con la misma semilla genera siempre los mismos
+datos, así dos corridas de benchmarks sobre bases de igual escala son
+comparables.
+
+Uso (desde sistema_escolar/):
+    python benchmarks/datos.py --base /tmp/bench_10k.sqlite3 --estudiantes 10000 --cursos 200
+    python benchmarks/datos.py --base /tmp/bench_1m.sqlite3 --estudiantes 1000000 --cursos 5000 --matriculas-por-estudiante 6
+
+Al terminar quedan cargados los totales de matrículas (core.agregados), el
+índice de búsqueda y el usuario 'bench' (clave 'bench') para los benchmarks.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from comun import preparar_django
+
+
+def _informar(tabla, nuevas, total, segundos):
+    print(f"  {tabla:<12} {nuevas:>10} filas  {segundos:>7.1f}s  {nuevas / segundos if segundos else 0:>10.0f} filas/s",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', required=True, help="Archivo SQLite a crear.")
+    parser.add_argument('--estudiantes', type=int, default=10000)
+    parser.add_argument('--cursos', type=int, default=200)
+    parser.add_argument('--matriculas-por-estudiante', type=int, default=6)
+    parser.add_argument('--profesores', type=int, default=None, help="Por defecto un profesor cada 4 cursos.")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--reemplazar', action='store_true', help="Borra la base si ya existe.")
+    args = parser.parse_args()
+
+    base = Path(args.base)
+    if base.exists():
+        if not args.reemplazar:
+            parser.error(f"{base} ya existe (use --reemplazar para recrearla)")
+        for archivo in (base, Path(f"{base}-wal"), Path(f"{base}-shm")):
+            archivo.unlink(missing_ok=True)
+
+    preparar_django(base)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from core.generador import Generador
+
+    print(f"Migrando {base} ...", file=sys.stderr)
+    call_command('migrate', verbosity=0)
+    inicio = time.perf_counter()
+    Generador(
+        args.estudiantes, args.cursos, args.matriculas_por_estudiante, args.profesores,
+        semilla=args.semilla, informar=_informar,
+    ).ejecutar()
+    usuarios = get_user_model().objects
+    if not usuarios.filter(username='bench').exists():
+        usuarios.create_superuser('bench', 'bench@bench.test', 'bench')
+    print(f"Listo en {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Micro-benchmarks de las vistas de core/views.py contra una base generada con
+benchmarks/datos.py.
+
+Cada caso se pide con el cliente de pruebas de Django (en el mismo proceso,
+sin red ni servidor), se repite `--repeticiones` veces y se reporta la
+latencia (mín / p50 / p95 / p99 en ms), las consultas SQL y los bytes de la
+respuesta. Las descargas (CSV, JSON, XLSX, NDJSON) se consumen completas y el PDF se
+renderiza como lo hace el worker de reportes. Por defecto la caché es
+'dummy', así se mide el costo real de cada vista.
+
+Uso (desde sistema_escolar/):
+    python benchmarks/vistas.py --base /tmp/bench_100k.sqlite3 --salida resultados/vistas_100k.json
+    python benchmarks/vistas.py --base /tmp/bench_100k.sqlite3 --solo listado busqueda --comparar resultados/vistas_100k.json
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+
+from comun import comparar, escala, guardar, preparar_django
+
+
+def casos():
+    """
+    Casos a medir: (nombre, función que hace el pedido y retorna (status, bytes)).
+
+    Los ids y cursores se eligen antes de medir: el estudiante, curso y
+    profesor de la mitad de la tabla, y un cursor a mitad del listado.
+    """
+    from django.urls import reverse
+
+    from core import reportes
+    from core.models import Curso, Estudiante, Profesor
+    from core.generador import APELLIDOS
+    from core.paginacion import campos_orden, codificar_cursor
+
+    def del_medio(model):
+        cantidad = model.objects.count()
+        return model.objects.order_by('pk').values_list('pk', flat=True)[cantidad // 2]
+
+    estudiante, curso, profesor = del_medio(Estudiante), del_medio(Curso), del_medio(Profesor)
+    campos = [nombre for nombre, _ in campos_orden(Estudiante)]
+    mitad = Estudiante.objects.count() // 2
+    valores = Estudiante.objects.order_by(*campos).values_list(*campos)[mitad]
+    cursor_medio = codificar_cursor(valores, 's')
+    busqueda = APELLIDOS[0][:4].lower()
+
+    def get(url, **parametros):
+        def pedir(cliente):
+            resp = cliente.get(url, parametros)
+            if resp.streaming:
+                return resp.status_code, sum(len(parte) for parte in resp.streaming_content)
+            return resp.status_code, len(resp.content)
+        return pedir
+
+    def pdf(vista):
+        def renderizar(cliente):
+            destino = io.BytesIO()
+            reportes.construir_vista(vista, {}).render_export('pdf', destino)
+            return 200, destino.tell()
+        return renderizar
+
+    return [
+        ('inicio', get(reverse('home'))),
+        ('listado_estudiantes', get(reverse('estudiante_list'))),
+        ('listado_estudiantes_mitad', get(reverse('estudiante_list'), cursor=cursor_medio)),
+        ('listado_estudiantes_por_cursos', get(reverse('estudiante_list'), orden='matriculas')),
+        ('listado_estudiantes_activos', get(reverse('estudiante_list'), activos='1')),
+        ('listado_cursos', get(reverse('curso_list'))),
+        ('listado_cursos_por_inscriptos', get(reverse('curso_list'), orden='inscriptos')),
+        ('listado_profesores', get(reverse('profesor_list'))),
+        ('busqueda_estudiantes', get(reverse('estudiante_list'), q=busqueda)),
+        ('busqueda_cursos', get(reverse('curso_list'), q='matem')),
+        ('busqueda_matricula', get(reverse('curso_matricular_buscar', args=[curso]), q=busqueda)),
+        ('detalle_estudiante', get(reverse('estudiante_detail', args=[estudiante]))),
+        ('detalle_curso', get(reverse('curso_detail', args=[curso]))),
+        ('detalle_profesor', get(reverse('profesor_detail', args=[profesor]))),
+        ('estadisticas_curso', get(reverse('estadisticas'), nivel='curso')),
+        ('estadisticas_profesor', get(reverse('estadisticas'), nivel='profesor')),
+        ('api_estudiantes_pagina', get(reverse('api_estudiantes'), limite='1000')),
+        ('exportar_csv_estudiantes', get(reverse('estudiante_list'), export='csv')),
+        ('exportar_csv_cursos', get(reverse('curso_list'), export='csv')),
+        ('exportar_csv_profesores', get(reverse('profesor_list'), export='csv')),
+        ('exportar_json_estudiantes', get(reverse('estudiante_list'), export='json')),
+        ('exportar_xlsx_estudiantes', get(reverse('estudiante_list'), export='xlsx')),
+        ('exportar_csv_estadisticas', get(reverse('estadisticas'), nivel='curso', export='csv')),
+        ('exportar_json_estadisticas', get(reverse('estadisticas'), nivel='curso', export='json')),
+        ('exportar_ndjson_matriculas', get(reverse('api_matriculas'), formato='ndjson')),
+        ('exportar_pdf_cursos', pdf('core.views.CursoListView')),
+        ('exportar_pdf_estudiantes', pdf('core.views.EstudianteListView')),
+    ]
+
+
+def _percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+
+def medir(nombre, pedir, cliente, repeticiones):
+    """Un pedido de calentamiento y luego `repeticiones` medidos"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as capturadas:
+        status, cantidad_bytes = pedir(cliente)
+    # Se cuenta ya: los pedidos siguientes vacían el registro de consultas
+    consultas = len(capturadas.captured_queries)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        pedir(cliente)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'nombre': nombre,
+        'status': status,
+        'consultas': consultas,
+        'bytes': cantidad_bytes,
+        'repeticiones': repeticiones,
+        'min_ms': round(tiempos[0], 3),
+        'p50_ms': round(statistics.median(tiempos), 3),
+        'p95_ms': round(_percentil(tiempos, 95), 3),
+        'p99_ms': round(_percentil(tiempos, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', required=True, help="Base SQLite generada con benchmarks/datos.py.")
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--solo', nargs='+', metavar='PREFIJO', help="Solo los casos que empiezan así.")
+    parser.add_argument('--omitir', nargs='+', metavar='PREFIJO', default=[],
+                        help="Omite los casos que empiezan así (ej: exportar_pdf con 1M filas).")
+    parser.add_argument('--cache', default='dummy', help="CACHE_BACKEND durante la medición (dummy = sin caché).")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument('--comparar', metavar='ANTERIOR.json', help="Compara contra una corrida guardada.")
+    args = parser.parse_args()
+
+    preparar_django(args.base, cache=args.cache)
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    cliente = Client()
+    cliente.force_login(get_user_model().objects.get(username='bench'))
+    datos = escala()
+    print(f"Escala: {datos}", file=sys.stderr)
+
+    resultados = []
+    print(f"{'caso':<32} {'status':>6} {'consultas':>9} {'bytes':>11} {'min ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for nombre, pedir in casos():
+        if args.solo and not nombre.startswith(tuple(args.solo)):
+            continue
+        if nombre.startswith(tuple(args.omitir)):
+            continue
+        r = medir(nombre, pedir, cliente, args.repeticiones)
+        resultados.append(r)
+        print(
+            f"{nombre:<32} {r['status']:>6} {r['consultas']:>9} {r['bytes']:>11} "
+            f"{r['min_ms']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}",
+            flush=True,
+        )
+
+    parametros = {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')}
+    if args.salida:
+        guardar(args.salida, 'vistas', parametros, resultados, datos)
+        print(f"\nResultados guardados en {args.salida}", file=sys.stderr)
+    if args.comparar:
+        comparar(args.comparar, resultados)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Estudiante, Profesor, Curso, Matricula
+from django.urls import reverse
+from django.utils.html import format_html
+
+from . import reportes
+from .models import Estudiante, Profesor, Curso, Matricula, ReporteJob
 
 # Personalización del Admin para Estudiante
 @admin.register(Estudiante)
@@ -14,6 +18,20 @@ class EstudianteAdmin(admin.ModelAdmin):
     list_editable = ('activo',)
     # Mostrar la fecha de creación/actualización (opcional, si los tienes en el modelo)
     # readonly_fields = ('fecha_creacion',)
+    actions = ['generar_boletines']
+
+    # Encola un zip con un boletín PDF por estudiante seleccionado (lo genera `procesar_reportes`)
+    @admin.action(description='Generar boletines (PDF) de los estudiantes seleccionados')
+    def generar_boletines(self, request, queryset):
+        ids = ','.join(str(pk) for pk in queryset.order_by('pk').values_list('pk', flat=True))
+        job = reportes.encolar(
+            'core.boletines.ReporteBoletines', 'zip', {'estudiantes': ids},
+            nombre_descarga='boletines.zip', usuario=request.user,
+        )
+        self.message_user(request, format_html(
+            'Boletines encolados (reporte {}). Cuando esté listo se descargan desde <a href="{}">{}</a>.',
+            job.pk, reverse('reporte_descargar', args=[job.pk]), reverse('reporte_descargar', args=[job.pk]),
+        ))
 
 
 # Personalización del Admin para Curso
@@ -43,3 +61,12 @@ class MatriculaAdmin(admin.ModelAdmin):
     list_display = ('estudiante', 'curso', 'fecha', 'nota')
     list_filter = ('curso', 'fecha')
     search_fields = ('estudiante__apellido', 'curso__nombre')
+
+
+# Reportes generados en segundo plano (solo lectura, los crea el sistema)
+@admin.register(ReporteJob)
+class ReporteJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nombre_descarga', 'estado', 'usuario', 'creado', 'terminado')
+    list_filter = ('estado', 'formato')
+    readonly_fields = ('vista', 'formato', 'parametros', 'clave', 'estado', 'archivo',
+                       'nombre_descarga', 'error', 'usuario', 'creado', 'terminado')
@@ -0,0 +1,110 @@
+"""
+Totales de matrículas y notas guardados en Curso y Estudiante.
+
+Los campos de `AgregadosMatricula` se recalculan con un único UPDATE por
+modelo con subconsultas correlacionadas sobre core_matricula (por los
+índices de curso_id y estudiante_id), en lugar de sumar o restar en Python:
+así el resultado es correcto aunque cambie la nota, se borre la nota mínima
+o se actualicen varias matrículas a la vez.
+
+Se llama:
+    - Desde las señales de Matricula (core.signals), para save() y delete()
+    - Explícitamente en los caminos masivos (bulk_create, bulk_update),
+      que no disparan señales
+    - Desde el comando `recalcular_agregados`, para reconstruir o verificar
+"""
+from django.db.models import Avg, Count, DecimalField, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Curso, Estudiante, Matricula
+from . import versiones
+
+
+def _agregaciones():
+    """Campo del modelo -> agregación sobre las matrículas de la fila"""
+    # El promedio se redondea a 2 decimales en la base, igual que se guarda
+    decimal = DecimalField(max_digits=4, decimal_places=2)
+    return {
+        'cantidad_matriculas': Count('id'),
+        'cantidad_calificadas': Count('nota'),
+        'promedio_nota': Cast(Avg('nota'), output_field=decimal),
+        'nota_minima': Min('nota'),
+        'nota_maxima': Max('nota'),
+    }
+
+
+CAMPOS = tuple(_agregaciones())
+
+
+def expresiones(campo_fk):
+    """
+    Subconsultas correlacionadas que calculan cada total para la fila externa.
+
+    Args:
+        campo_fk (str): 'curso' o 'estudiante' (lado de Matricula a agrupar)
+
+    Returns:
+        dict: campo -> expresión para `update()` o `annotate()`
+    """
+    resultado = {}
+    for campo, agregacion in _agregaciones().items():
+        subconsulta = Subquery(
+            Matricula.objects
+            .filter(**{campo_fk: OuterRef('pk')})
+            .order_by()
+            .values(campo_fk)
+            .annotate(valor=agregacion)
+            .values('valor')
+        )
+        if campo.startswith('cantidad'):
+            # Sin matrículas la subconsulta no retorna filas: 0 en lugar de NULL
+            subconsulta = Coalesce(subconsulta, Value(0), output_field=IntegerField())
+        resultado[campo] = subconsulta
+    return resultado
+
+
+def _recalcular(model, campo_fk, ids):
+    queryset = model.objects.all() if ids is None else model.objects.filter(pk__in=set(ids))
+    return queryset.order_by().update(**expresiones(campo_fk))
+
+
+# update() no dispara señales: cada función registra el cambio (versión y caché) a mano
+
+def recalcular_cursos(ids=None):
+    """Recalcula los totales de los cursos `ids` (todos si es None)"""
+    versiones.registrar_cambio('curso')
+    return _recalcular(Curso, 'curso', ids)
+
+
+def recalcular_estudiantes(ids=None):
+    """Recalcula los totales de los estudiantes `ids` (todos si es None)"""
+    versiones.registrar_cambio('estudiante')
+    return _recalcular(Estudiante, 'estudiante', ids)
+
+
+def recalcular(cursos=(), estudiantes=()):
+    """Recalcula los totales de los cursos y estudiantes indicados (ids)"""
+    grupos = [grupo for grupo, ids in (('curso', cursos), ('estudiante', estudiantes)) if ids]
+    if grupos:
+        versiones.registrar_cambio(*grupos)
+    if cursos:
+        _recalcular(Curso, 'curso', cursos)
+    if estudiantes:
+        _recalcular(Estudiante, 'estudiante', estudiantes)
+
+
+def inconsistentes(model, campo_fk):
+    """
+    Filas cuyos totales guardados no coinciden con core_matricula.
+
+    Yields:
+        tuple: (instancia con atributos calculado_<campo>, lista de campos distintos)
+    """
+    calculados = {f'calculado_{campo}': expresion for campo, expresion in expresiones(campo_fk).items()}
+    for fila in model.objects.order_by('pk').annotate(**calculados).iterator(chunk_size=2000):
+        distintos = [
+            campo for campo in CAMPOS
+            if getattr(fila, campo) != getattr(fila, f'calculado_{campo}')
+        ]
+        if distintos:
+            yield fila, distintos
@@ -0,0 +1,246 @@
+"""
+API JSON de solo lectura (v1) para estudiantes, cursos, profesores y matrículas.
+
+    GET /api/v1/<recurso>/            Página de resultados (cursor)
+    GET /api/v1/<recurso>/<id>/       Un registro
+    GET /api/v1/<recurso>/?formato=ndjson   Todos los registros, uno por línea
+    GET /api/v1/<recurso>/?formato=parquet  Todos los registros en Parquet (o =arrow)
+
+Parámetros GET de los listados:
+    fields: Campos a incluir separados por coma (el id siempre se incluye)
+    q: Búsqueda de texto, igual que en los listados HTML (estudiantes y cursos)
+    curso, estudiante, profesor: Filtros por id donde el recurso los admite
+    limite: Filas por página (por defecto 100, máximo 1000)
+    cursor: Token de la página (lo devuelven `siguiente` / `anterior`)
+    compresion: Códec de parquet/arrow (zstd por defecto; ver core.columnar)
+    desnormalizado: En matrículas con parquet/arrow, =1 agrega documento del
+        estudiante y código y profesor del curso
+
+Las filas salen de `.values()` (sin instanciar modelos) y se codifican con
+orjson si está instalado (`pip install orjson`) o con json de la biblioteca
+estándar. Las páginas se ordenan por id con paginación keyset, así sirven
+para sincronizar por partes sin OFFSET. Todas las respuestas llevan ETag y
+responden 304 si los datos no cambiaron (ConditionalGetMixin). Parquet y
+Arrow necesitan pyarrow (`pip install pyarrow`); sin él responden 501.
+"""
+import datetime
+import json
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.generic import View
+
+from .exporters import medir_exportacion
+from .models import Curso, Estudiante, Matricula, Profesor
+from .paginacion import KeysetPaginator
+from .views import ConditionalGetMixin
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+POR_PAGINA = 100
+MAX_POR_PAGINA = 1000
+
+# Filas que se leen y codifican juntas en el modo NDJSON
+LOTE_NDJSON = 2000
+
+_CAMPOS_TOTALES = (
+    'cantidad_matriculas', 'cantidad_calificadas', 'promedio_nota', 'nota_minima', 'nota_maxima',
+)
+
+
+class Recurso:
+    """
+    Modelo expuesto por la API.
+
+    Atributos:
+        model: Modelo de Django
+        campos (tuple): Campos públicos; son nombres válidos para `.values()`
+            (una ForeignKey como 'profesor' devuelve el id, 'profesor__nombre'
+            el campo relacionado)
+        busqueda (bool): Si admite ?q= (BusquedaQuerySet.buscar)
+        filtros (dict): Parámetro GET -> campo por el que filtra (ids)
+        grupos (tuple): Grupos de core.versiones de los que dependen los datos
+    """
+
+    def __init__(self, model, campos, busqueda=False, filtros=None, grupos=()):
+        self.model = model
+        self.campos = campos
+        self.busqueda = busqueda
+        self.filtros = filtros or {}
+        self.grupos = grupos
+
+
+RECURSOS = {
+    'estudiantes': Recurso(
+        Estudiante,
+        ('id', 'nombre', 'apellido', 'documento', 'email', 'fecha_nacimiento', 'activo') + _CAMPOS_TOTALES,
+        busqueda=True, grupos=('estudiante', 'matricula'),
+    ),
+    'cursos': Recurso(
+        Curso,
+        ('id', 'codigo', 'nombre', 'descripcion', 'profesor', 'profesor__nombre', 'profesor__apellido')
+        + _CAMPOS_TOTALES,
+        busqueda=True, filtros={'profesor': 'profesor_id'}, grupos=('curso', 'profesor', 'matricula'),
+    ),
+    'profesores': Recurso(
+        Profesor, ('id', 'nombre', 'apellido', 'email'), grupos=('profesor',),
+    ),
+    'matriculas': Recurso(
+        Matricula, ('id', 'estudiante', 'curso', 'fecha', 'nota'),
+        filtros={'curso': 'curso_id', 'estudiante': 'estudiante_id'}, grupos=('matricula',),
+    ),
+}
+
+
+class ErrorAPI(Exception):
+    """Parámetro inválido: se responde 400 con el mensaje"""
+
+
+def _convertir(valor):
+    """Tipos que ni orjson ni json saben codificar (las notas van como número)"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    raise TypeError(f"No se puede convertir a JSON: {type(valor).__name__}")
+
+
+def codificar(datos):
+    """Codifica `datos` como JSON (bytes), con orjson si está disponible"""
+    if orjson is not None:
+        return orjson.dumps(datos, default=_convertir)
+    return json.dumps(datos, default=_convertir, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def respuesta_json(datos, status=200):
+    return HttpResponse(codificar(datos), status=status, content_type='application/json')
+
+
+def lineas_ndjson(filas):
+    """Codifica las filas de a LOTE_NDJSON: un objeto JSON por línea"""
+    filas = iter(filas)
+    while lote := list(islice(filas, LOTE_NDJSON)):
+        yield b''.join(codificar(fila) + b'\n' for fila in lote)
+
+
+class RecursoAPIView(LoginRequiredMixin, ConditionalGetMixin, View):
+    """
+    Listado, detalle y volcado NDJSON de un recurso de RECURSOS.
+
+    El recurso se indica en urls.py: RecursoAPIView.as_view(recurso='cursos').
+    Sin sesión responde 403 en lugar de redirigir al login.
+    """
+    http_method_names = ['get', 'head']
+    raise_exception = True
+    recurso = None
+
+    @property
+    def cache_grupos(self):
+        return RECURSOS[self.recurso].grupos
+
+    def get(self, request, *args, **kwargs):
+        recurso = RECURSOS[self.recurso]
+        try:
+            campos = self.get_campos(recurso)
+            queryset = self.get_queryset(recurso)
+            if 'pk' in kwargs:
+                fila = queryset.filter(pk=kwargs['pk']).values(*campos).first()
+                if fila is None:
+                    return respuesta_json({'error': "No encontrado"}, status=404)
+                return respuesta_json(fila)
+            if request.GET.get('formato') == 'ndjson':
+                filas = queryset.order_by('pk').values(*campos).iterator(chunk_size=LOTE_NDJSON)
+                return StreamingHttpResponse(
+                    medir_exportacion(lineas_ndjson(filas), f'api_{self.recurso}', 'ndjson'),
+                    content_type='application/x-ndjson',
+                )
+            if request.GET.get('formato') in ('parquet', 'arrow'):
+                return self.get_columnar(queryset, campos, request.GET['formato'])
+            return respuesta_json(self.get_pagina(queryset, campos))
+        except ErrorAPI as exc:
+            return respuesta_json({'error': str(exc)}, status=400)
+
+    def get_columnar(self, queryset, campos, formato):
+        """
+        Todos los registros en un archivo Parquet o Arrow, escrito por lotes.
+
+        core.columnar (y pyarrow) se importan recién acá, así no suman al
+        arranque de los workers.
+        """
+        from . import columnar
+
+        if not columnar.disponible():
+            return respuesta_json({'error': "Formato no disponible: falta pyarrow en el servidor"}, status=501)
+        compresion = self.request.GET.get('compresion', 'zstd')
+        error = columnar.validar(formato, compresion)
+        if error:
+            raise ErrorAPI(error)
+        nombre = self.recurso
+        if self.request.GET.get('desnormalizado') == '1':
+            if self.recurso != 'matriculas':
+                raise ErrorAPI("'desnormalizado' solo se admite en matrículas")
+            nombre = columnar.DESNORMALIZADA
+            campos = columnar.TABLAS_OPCIONALES[nombre][1]
+        extension, content_type = columnar.FORMATOS[formato]
+        respuesta = StreamingHttpResponse(
+            medir_exportacion(
+                columnar.contenido(queryset, campos, formato, compresion), f'api_{self.recurso}', formato,
+            ),
+            content_type=content_type,
+        )
+        respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.{extension}"'
+        return respuesta
+
+    def get_campos(self, recurso):
+        """Campos pedidos en ?fields= (todos si no se indica), siempre con el id"""
+        pedidos = [c.strip() for c in self.request.GET.get('fields', '').split(',') if c.strip()]
+        if not pedidos:
+            return recurso.campos
+        desconocidos = [c for c in pedidos if c not in recurso.campos]
+        if desconocidos:
+            raise ErrorAPI(
+                f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(recurso.campos)}"
+            )
+        return list(dict.fromkeys(['id'] + pedidos))
+
+    def get_queryset(self, recurso):
+        """Queryset con la búsqueda ?q= y los filtros por id aplicados"""
+        queryset = recurso.model.objects.all()
+        q = self.request.GET.get('q')
+        if q:
+            if not recurso.busqueda:
+                raise ErrorAPI(f"'{self.recurso}' no admite búsqueda (q)")
+            queryset = queryset.buscar(q)
+        for parametro, campo in recurso.filtros.items():
+            valor = self.request.GET.get(parametro)
+            if valor is not None:
+                if not valor.isdigit():
+                    raise ErrorAPI(f"'{parametro}' debe ser un id entero")
+                queryset = queryset.filter(**{campo: int(valor)})
+        return queryset
+
+    def get_pagina(self, queryset, campos):
+        """Página keyset por id: {resultados, siguiente, anterior}"""
+        try:
+            limite = min(max(int(self.request.GET.get('limite', POR_PAGINA)), 1), MAX_POR_PAGINA)
+        except ValueError:
+            raise ErrorAPI("'limite' debe ser un número entero")
+        paginator = KeysetPaginator(queryset.values(*campos), limite, ordering=['id'])
+        try:
+            pagina = paginator.paginar(self.request.GET.get('cursor'), parametros=self.request.GET)
+        except Http404:
+            raise ErrorAPI("Cursor de paginación inválido")
+        return {
+            'resultados': pagina.object_list,
+            'siguiente': self._url(pagina.url_siguiente),
+            'anterior': self._url(pagina.url_anterior),
+        }
+
+    def _url(self, query_string):
+        return self.request.build_absolute_uri(self.request.path + query_string) if query_string else None
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import busqueda
+        # Índices FTS5 de búsqueda: los triggers se quitan mientras corren las
+        # migraciones y se (re)instalan después de cada migrate
+        pre_migrate.connect(busqueda.quitar_triggers, sender=self)
+        post_migrate.connect(busqueda.instalar_indices, sender=self)
+        # Totales de matrículas en Curso y Estudiante (ver core/agregados.py)
+        from . import signals  # noqa: F401
+        # Conteo y tiempo de consultas por pedido (ver core/metricas.py)
+        from . import metricas  # noqa: F401
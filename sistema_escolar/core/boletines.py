@@ -0,0 +1,198 @@
+"""
+Generación masiva de boletines (un PDF por estudiante).
+
+Lo usan `manage.py generate_boletines` y la acción "Generar boletines" del
+admin de estudiantes (que encola un ReporteJob con `ReporteBoletines`).
+
+    1. Los estudiantes se reparten en lotes de `tamano_lote` ids.
+    2. Cada lote se lee con dos consultas (estudiantes + matrículas con su
+       curso y profesor por `Prefetch`) y se renderiza completo en memoria.
+    3. Con más de un worker los lotes se renderizan en un pool de procesos
+       ('spawn', como `procesar_reportes`); el proceso padre es el único que
+       escribe (carpeta o zip) y solo mantiene `workers * 2` lotes en vuelo,
+       así la memoria no crece con la cantidad de estudiantes.
+
+Renderizar es CPU puro (reportlab), por eso escala casi linealmente con
+los workers hasta la cantidad de núcleos.
+"""
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from html import escape
+from io import BytesIO
+
+from django.db import connections
+from django.db.models import Prefetch
+from reportlab.lib.units import inch
+
+from .models import Estudiante, Matricula
+from .pdf import ReportePDF
+
+
+# Estudiantes por lote (unidad de trabajo de cada proceso)
+LOTE = 250
+
+ENCABEZADOS = ['Código', 'Curso', 'Profesor', 'Nota']
+ANCHOS = [1*inch, 2.6*inch, 2.2*inch, 0.8*inch]
+
+# Caracteres del documento que no se usan en el nombre de archivo
+NO_PERMITIDOS = re.compile(r'[^\w.-]')
+
+
+def ids_estudiantes(cursos=None, solo_activos=False):
+    """
+    Ids de los estudiantes a los que se genera boletín, en orden alfabético.
+
+    Args:
+        cursos (list): Códigos de curso; solo estudiantes matriculados en alguno
+        solo_activos (bool): Excluir estudiantes inactivos
+    """
+    qs = Estudiante.objects.all()
+    if solo_activos:
+        qs = qs.filter(activo=True)
+    if cursos:
+        qs = qs.filter(matriculas__curso__codigo__in=cursos).distinct()
+    return list(qs.order_by('apellido', 'nombre', 'id').values_list('id', flat=True))
+
+
+def nombre_archivo(estudiante):
+    """Nombre del PDF dentro de la carpeta o el zip: boletin_<documento>.pdf"""
+    return f"boletin_{NO_PERMITIDOS.sub('_', estudiante.documento)}.pdf"
+
+
+def renderizar(estudiante, destino):
+    """Escribe en `destino` el boletín de un estudiante con sus matrículas precargadas"""
+    promedio = estudiante.promedio_nota
+    reporte = ReportePDF(
+        'Boletín de Calificaciones', ENCABEZADOS, ANCHOS, alineacion='LEFT',
+        subtitulos=[
+            f"<b>Estudiante:</b> {escape(str(estudiante))}",
+            f"<b>Documento:</b> {escape(estudiante.documento)}",
+            f"<b>Promedio:</b> {promedio if promedio is not None else 'sin notas'}",
+        ],
+    )
+    reporte.render(destino, (
+        [
+            m.curso.codigo, m.curso.nombre,
+            str(m.curso.profesor) if m.curso.profesor else 'Sin asignar',
+            m.nota if m.nota is not None else '—',
+        ]
+        for m in estudiante.matriculas.all()
+    ))
+
+
+def renderizar_lote(ids):
+    """
+    Renderiza los boletines de un lote de estudiantes.
+
+    Optimización: dos consultas por lote sin importar su tamaño; las
+    matrículas llegan con curso y profesor por `select_related` dentro del
+    `Prefetch`.
+
+    Returns:
+        list: Tuplas (nombre de archivo, bytes del PDF)
+    """
+    estudiantes = (
+        Estudiante.objects.filter(pk__in=ids)
+        .order_by('apellido', 'nombre', 'id')
+        .only('id', 'nombre', 'apellido', 'documento', 'promedio_nota')
+        .prefetch_related(Prefetch(
+            'matriculas',
+            queryset=Matricula.objects.select_related('curso__profesor').order_by('curso__nombre', 'curso_id'),
+        ))
+    )
+    resultado = []
+    for estudiante in estudiantes:
+        destino = BytesIO()
+        renderizar(estudiante, destino)
+        resultado.append((nombre_archivo(estudiante), destino.getvalue()))
+    return resultado
+
+
+def _lotes(ids, tamano_lote):
+    return (ids[i:i + tamano_lote] for i in range(0, len(ids), tamano_lote))
+
+
+def generar(ids, guardar, workers=1, tamano_lote=LOTE, progreso=None):
+    """
+    Genera los boletines de `ids` y los entrega a `guardar(nombre, datos)`.
+
+    Args:
+        ids (list): Ids de estudiantes
+        guardar (callable): Recibe cada (nombre de archivo, bytes); se llama
+            siempre desde este proceso, en el orden en que terminan los lotes
+        workers (int): Procesos del pool; con 1 se renderiza en este proceso
+        tamano_lote (int): Estudiantes por lote
+        progreso (callable): Recibe (generados, total) al terminar cada lote
+
+    Returns:
+        int: Cantidad de boletines generados
+    """
+    total, generados = len(ids), 0
+    progreso = progreso or (lambda *args: None)
+    lotes = _lotes(ids, max(1, tamano_lote))
+
+    def entregar(archivos):
+        nonlocal generados
+        for nombre, datos in archivos:
+            guardar(nombre, datos)
+        generados += len(archivos)
+        progreso(generados, total)
+
+    if workers <= 1:
+        for lote in lotes:
+            entregar(renderizar_lote(lote))
+        return generados
+
+    from .workers import generar_boletines, inicializar
+
+    # Los hijos abren sus propias conexiones; no deben heredar la del padre
+    connections.close_all()
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto, initializer=inicializar) as pool:
+        en_curso = set()
+        for lote in lotes:
+            en_curso.add(pool.submit(generar_boletines, lote))
+            if len(en_curso) >= workers * 2:
+                terminados, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    entregar(futuro.result())
+        for futuro in wait(en_curso).done:
+            entregar(futuro.result())
+    return generados
+
+
+class ReporteBoletines:
+    """
+    Boletines de varios estudiantes en un zip, como trabajo de `core.reportes`.
+
+    Tiene la misma interfaz que las vistas exportables (`setup` con una
+    petición GET, `export_formats` y `render_export`), así lo ejecuta
+    `procesar_reportes`.
+    Parámetro GET `estudiantes`: ids separados por coma. Dentro del worker
+    se renderiza en el mismo proceso (ya es un proceso del pool).
+    """
+
+    export_formats = ('zip',)
+    # Grupos de core.versiones que lee (clave del archivo en core.reportes)
+    cache_grupos = ('estudiante', 'matricula', 'curso', 'profesor')
+
+    def setup(self, request):
+        self.ids = [int(pk) for pk in request.GET.get('estudiantes', '').split(',') if pk]
+
+    def render_export(self, formato, destino):
+        """Escribe en `destino` un zip con un PDF por estudiante"""
+        escribir_zip(destino, self.ids)
+
+
+def escribir_zip(destino, ids, **opciones):
+    """Genera los boletines en un único zip (`destino`: ruta o archivo binario); retorna la cantidad"""
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as archivo:
+        return generar(ids, archivo.writestr, **opciones)
+
+
+def escribir_carpeta(carpeta, ids, **opciones):
+    """Genera los boletines como archivos sueltos en `carpeta` (Path); retorna la cantidad"""
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return generar(ids, lambda nombre, datos: (carpeta / nombre).write_bytes(datos), **opciones)
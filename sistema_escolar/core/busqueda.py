@@ -0,0 +1,227 @@
+"""
+Índice de búsqueda de texto para estudiantes y cursos.
+
+En SQLite se usan tablas virtuales FTS5 con el tokenizador
+`unicode61 remove_diacritics 2`, que pliega mayúsculas y acentos ("Pérez"
+se encuentra buscando "perez"). Las tablas se mantienen sincronizadas con
+triggers, así también quedan al día las escrituras masivas
+(`bulk_create`, `update()`) que no disparan señales de Django.
+
+Cada palabra de la búsqueda se trata como prefijo y todas deben aparecer
+("ana gom" encuentra "Ana Gómez"), y la consulta usa el índice invertido en
+lugar de recorrer la tabla con LIKE '%...%'.
+
+En otros motores (o si SQLite no tiene FTS5) se usa el filtro portable con
+`icontains` sobre los mismos campos.
+"""
+import re
+import unicodedata
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+class Indice:
+    """
+    Definición del índice de búsqueda de una tabla.
+
+    Atributos:
+        tabla (str): Tabla del modelo (ej: core_estudiante)
+        campos_respaldo (tuple): Campos para el filtro icontains portable
+        distinct (bool): Si el filtro portable necesita `.distinct()` por joins
+        sql_instalar (list): Sentencias que crean la tabla FTS5 y sus triggers
+        sql_reconstruir (list): Sentencias que recargan el índice desde la tabla
+    """
+
+    def __init__(self, tabla, campos_respaldo, sql_instalar, sql_reconstruir, distinct=False):
+        self.tabla = tabla
+        self.tabla_fts = f"{tabla}_fts"
+        self.campos_respaldo = campos_respaldo
+        self.sql_instalar = sql_instalar
+        self.sql_reconstruir = sql_reconstruir
+        self.distinct = distinct
+
+
+TOKENIZADOR = "tokenize = 'unicode61 remove_diacritics 2'"
+
+INDICES = {
+    'core_estudiante': Indice(
+        'core_estudiante',
+        campos_respaldo=('nombre', 'apellido', 'documento'),
+        sql_instalar=[
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS core_estudiante_fts USING fts5(
+                nombre, apellido, documento,
+                content = 'core_estudiante', content_rowid = 'id', {TOKENIZADOR})""",
+            """CREATE TRIGGER IF NOT EXISTS core_estudiante_fts_ai AFTER INSERT ON core_estudiante BEGIN
+                INSERT INTO core_estudiante_fts(rowid, nombre, apellido, documento)
+                VALUES (new.id, new.nombre, new.apellido, new.documento);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS core_estudiante_fts_ad AFTER DELETE ON core_estudiante BEGIN
+                INSERT INTO core_estudiante_fts(core_estudiante_fts, rowid, nombre, apellido, documento)
+                VALUES ('delete', old.id, old.nombre, old.apellido, old.documento);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS core_estudiante_fts_au
+            AFTER UPDATE OF nombre, apellido, documento ON core_estudiante BEGIN
+                INSERT INTO core_estudiante_fts(core_estudiante_fts, rowid, nombre, apellido, documento)
+                VALUES ('delete', old.id, old.nombre, old.apellido, old.documento);
+                INSERT INTO core_estudiante_fts(rowid, nombre, apellido, documento)
+                VALUES (new.id, new.nombre, new.apellido, new.documento);
+            END""",
+        ],
+        sql_reconstruir=["INSERT INTO core_estudiante_fts(core_estudiante_fts) VALUES ('rebuild')"],
+    ),
+    # El índice de cursos guarda además el nombre del profesor, por eso tiene
+    # contenido propio y un trigger sobre core_profesor.
+    'core_curso': Indice(
+        'core_curso',
+        campos_respaldo=('codigo', 'nombre', 'profesor__nombre', 'profesor__apellido'),
+        distinct=True,
+        sql_instalar=[
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS core_curso_fts USING fts5(codigo, nombre, profesor, {TOKENIZADOR})",
+            """CREATE TRIGGER IF NOT EXISTS core_curso_fts_ai AFTER INSERT ON core_curso BEGIN
+                INSERT INTO core_curso_fts(rowid, codigo, nombre, profesor)
+                VALUES (new.id, new.codigo, new.nombre,
+                        (SELECT nombre || ' ' || apellido FROM core_profesor WHERE id = new.profesor_id));
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS core_curso_fts_ad AFTER DELETE ON core_curso BEGIN
+                DELETE FROM core_curso_fts WHERE rowid = old.id;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS core_curso_fts_au
+            AFTER UPDATE OF codigo, nombre, profesor_id ON core_curso BEGIN
+                UPDATE core_curso_fts SET codigo = new.codigo, nombre = new.nombre,
+                    profesor = (SELECT nombre || ' ' || apellido FROM core_profesor WHERE id = new.profesor_id)
+                WHERE rowid = new.id;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS core_profesor_fts_au
+            AFTER UPDATE OF nombre, apellido ON core_profesor BEGIN
+                UPDATE core_curso_fts SET profesor = new.nombre || ' ' || new.apellido
+                WHERE rowid IN (SELECT id FROM core_curso WHERE profesor_id = new.id);
+            END""",
+        ],
+        sql_reconstruir=[
+            "DELETE FROM core_curso_fts",
+            """INSERT INTO core_curso_fts(rowid, codigo, nombre, profesor)
+            SELECT c.id, c.codigo, c.nombre, p.nombre || ' ' || p.apellido
+            FROM core_curso c LEFT JOIN core_profesor p ON p.id = c.profesor_id""",
+        ],
+    ),
+}
+
+_TRIGGERS = {
+    'core_estudiante': ('core_estudiante_fts_ai', 'core_estudiante_fts_ad', 'core_estudiante_fts_au'),
+    'core_curso': ('core_curso_fts_ai', 'core_curso_fts_ad', 'core_curso_fts_au', 'core_profesor_fts_au'),
+}
+
+# Disponibilidad de FTS5 por conexión (alias, nombre de la base)
+_disponible = {}
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita acentos: 'Pérez' -> 'perez'"""
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def expresion_fts(q):
+    """
+    Convierte el texto buscado en una expresión MATCH de FTS5.
+
+    Cada palabra se cita (para que caracteres como '-' o '"' no se lean como
+    operadores) y se marca como prefijo; FTS5 las combina con AND.
+
+    Returns:
+        str: Expresión MATCH, o '' si el texto no tiene palabras
+    """
+    palabras = re.findall(r'\w+', normalizar(q))
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+def fts_disponible(using='default'):
+    """Indica si la base `using` es SQLite y tiene instaladas las tablas FTS5"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    clave = (using, str(connection.settings_dict['NAME']))
+    if clave not in _disponible:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)",
+                [INDICES['core_estudiante'].tabla_fts, INDICES['core_curso'].tabla_fts],
+            )
+            _disponible[clave] = cursor.fetchone()[0] == len(INDICES)
+    return _disponible[clave]
+
+
+def buscar(queryset, q):
+    """
+    Filtra `queryset` por el texto `q` usando el índice de su tabla.
+
+    Args:
+        queryset: QuerySet de Estudiante o Curso
+        q (str): Texto buscado
+
+    Returns:
+        QuerySet: Queryset filtrado
+    """
+    indice = INDICES[queryset.model._meta.db_table]
+    expresion = expresion_fts(q)
+    if expresion and fts_disponible(queryset.db):
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {indice.tabla_fts} WHERE {indice.tabla_fts} MATCH %s", [expresion])
+        )
+
+    filtro = Q()
+    for campo in indice.campos_respaldo:
+        filtro |= Q(**{f"{campo}__icontains": q})
+    queryset = queryset.filter(filtro)
+    return queryset.distinct() if indice.distinct else queryset
+
+
+def quitar_triggers(using='default', plan=None, **kwargs):
+    """
+    Borra los triggers de los índices antes de aplicar migraciones.
+
+    Se conecta a `pre_migrate`: al agregar un campo SQLite reconstruye la
+    tabla (crea una nueva, borra la original y la renombra), y el renombrado
+    falla si un trigger de otra tabla (core_profesor_fts_au) apunta a la
+    tabla borrada. `instalar_indices` los vuelve a crear al terminar.
+    """
+    connection = connections[using]
+    if not plan or connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for triggers in _TRIGGERS.values():
+            for nombre in triggers:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+
+
+def instalar_indices(using='default', **kwargs):
+    """
+    Crea las tablas FTS5 y sus triggers si faltan (idempotente).
+
+    Se conecta a `post_migrate`: en SQLite algunas migraciones reconstruyen
+    la tabla del modelo y con ella se pierden los triggers, por eso se
+    verifica después de cada `migrate`. Si hubo que crear algún trigger el
+    índice se reconstruye desde la tabla.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    _disponible.clear()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existentes = {fila[0] for fila in cursor.fetchall()}
+        for tabla, indice in INDICES.items():
+            if tabla not in existentes or 'core_profesor' not in existentes:
+                continue
+            faltantes = not all(nombre in existentes for nombre in _TRIGGERS[tabla] + (indice.tabla_fts,))
+            if not faltantes:
+                continue
+            try:
+                for sql in indice.sql_instalar + indice.sql_reconstruir:
+                    cursor.execute(sql)
+            except OperationalError as exc:
+                # SQLite compilado sin FTS5: queda el filtro portable
+                if 'fts5' not in str(exc):
+                    raise
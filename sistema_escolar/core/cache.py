@@ -0,0 +1,117 @@
+"""
+Caché de páginas, fragmentos y objetos con invalidación por versión.
+
+Cada grupo de datos ('estudiante', 'curso', 'profesor', 'matricula') tiene
+un número de versión en la base (VersionTabla, ver core.versiones). Las
+claves de lo cacheado incluyen las versiones de los grupos de los que
+depende, así que para invalidar no hace falta buscar ni borrar claves: al
+registrarse un cambio la versión del grupo sube y las entradas viejas
+dejan de leerse (y expiran solas).
+
+    clave = core:<nombre>:<v_estudiante>.<v_matricula>@<último cambio>:<hash de la variante>
+
+Reglas para no servir datos viejos:
+    - Las señales post_save/post_delete (core.signals) y los caminos
+      masivos (bulk_create, update) llaman a
+      core.versiones.registrar_cambio(), que incrementa la versión dentro
+      de la transacción: los demás procesos la ven al confirmarse.
+    - Nada se guarda mientras se está dentro de una transacción: lo leído
+      podría no estar confirmado todavía.
+    - La fecha del último cambio va en la clave para que una base recreada
+      (versiones de nuevo en 0) no reutilice entradas de la anterior.
+
+Como las versiones se leen de la base (una consulta a una tabla de cuatro
+filas), todos los procesos ven las mismas aunque la caché sea locmem,
+propia de cada proceso: un cambio hecho en un worker invalida lo cacheado
+en todos. Backend: settings.CACHES['default'] (CACHE_BACKEND en .env);
+'file' o 'redis' además comparten las entradas entre procesos.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+
+from .versiones import aestado, estado
+
+
+# Valor centinela para distinguir "no está en caché" de un None cacheado
+_FALTA = object()
+
+
+def _texto(version, modificado):
+    return f"{version}@{modificado.timestamp() if modificado else 0}"
+
+
+def versiones(grupos):
+    """
+    Versión actual de los grupos (leída de VersionTabla), como texto para armar claves.
+
+    Returns:
+        str: Versiones separadas por punto, en el orden de `grupos`, y la
+            fecha del último cambio
+    """
+    return _texto(*estado(grupos))
+
+
+async def aversiones(grupos):
+    """Como `versiones()`, con el ORM asíncrono (vistas async)"""
+    return _texto(*await aestado(grupos))
+
+
+def _clave(nombre, version, variantes):
+    variante = hashlib.md5(repr(variantes).encode()).hexdigest() if variantes else '-'
+    return f"core:{nombre}:{version}:{variante}"
+
+
+def clave(nombre, grupos, *variantes):
+    """Clave de caché de `nombre` para las versiones actuales de `grupos`"""
+    return _clave(nombre, versiones(grupos), variantes)
+
+
+def puede_guardar():
+    """Solo se guarda fuera de transacciones (lo leído está confirmado)"""
+    return not connection.in_atomic_block
+
+
+def obtener(nombre, grupos, variantes, calcular, timeout=None):
+    """
+    Retorna el valor cacheado o lo calcula y lo guarda.
+
+    Args:
+        nombre (str): Qué se cachea (ej: 'pagina:EstudianteListView')
+        grupos (tuple): Grupos de datos de los que depende el valor
+        variantes (tuple): Lo que distingue una entrada de otra (ej: pk, GET)
+        calcular (callable): Función sin argumentos que produce el valor
+        timeout (int): Segundos de vida; por defecto el TIMEOUT de CACHES
+    """
+    clave_valor = clave(nombre, grupos, *variantes)
+    valor = cache.get(clave_valor, _FALTA)
+    if valor is _FALTA:
+        valor = calcular()
+        if puede_guardar():
+            if timeout is None:
+                cache.set(clave_valor, valor)
+            else:
+                cache.set(clave_valor, valor, timeout)
+    return valor
+
+
+async def aobtener(nombre, grupos, variantes, calcular, timeout=None):
+    """
+    Como `obtener()`, para vistas async: `calcular` es una corrutina.
+
+    Las versiones se leen con el ORM asíncrono y la caché directo; la
+    comprobación de transacción se hace en el hilo de la base, que es donde
+    estaría abierta.
+    """
+    clave_valor = _clave(nombre, await aversiones(grupos), variantes)
+    valor = cache.get(clave_valor, _FALTA)
+    if valor is _FALTA:
+        valor = await calcular()
+        if await sync_to_async(puede_guardar)():
+            if timeout is None:
+                cache.set(clave_valor, valor)
+            else:
+                cache.set(clave_valor, valor, timeout)
+    return valor
@@ -0,0 +1,230 @@
+"""
+Exportación por columnas (Parquet / Arrow IPC) para análisis de datos.
+
+Lo usan `manage.py exportar_columnar` (volcado nocturno de todas las
+tablas a una carpeta) y la API (`/api/v1/<recurso>/?formato=parquet`).
+
+    1. El esquema Arrow sale de los campos del modelo: enteros, booleanos,
+       fechas (date32), fechas y horas (timestamp UTC), decimales con su
+       precisión (decimal128) y textos. Una ForeignKey se exporta como
+       `<campo>_id` con el tipo de la clave.
+    2. Las filas se leen con `.values_list().iterator()` (sin instancias de
+       modelo) y cada lote de `tamano_lote` filas se transpone a columnas y
+       se convierte en un `RecordBatch` de una vez (`pa.array` por columna).
+    3. Cada lote se escribe y se descarta (en Parquet, un row group por
+       lote), así la memoria depende del lote y no del tamaño de la tabla.
+
+La tabla opcional `matriculas_detalle` es una tabla de hechos
+desnormalizada: cada matrícula con el documento del estudiante y el código
+y profesor del curso, para no tener que unir tablas al analizar.
+
+pyarrow es opcional (`pip install pyarrow`); sin él `disponible()` es False
+y el comando y la API informan que falta.
+"""
+import os
+from itertools import islice
+
+from django.db import models
+
+from .models import Curso, Estudiante, Matricula, Profesor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional
+    pa = pq = None
+
+
+# Formato -> (extensión, content type)
+FORMATOS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+COMPRESIONES = ('zstd', 'snappy', 'gzip', 'lz4', 'none')
+# Arrow IPC solo admite estos códecs
+COMPRESIONES_ARROW = ('zstd', 'lz4', 'none')
+
+# Filas por RecordBatch (y por row group en Parquet)
+LOTE = 65536
+
+_TOTALES = ('cantidad_matriculas', 'cantidad_calificadas', 'promedio_nota', 'nota_minima', 'nota_maxima')
+
+# Tabla -> (modelo, campos de values_list)
+TABLAS = {
+    'estudiantes': (Estudiante, ('id', 'nombre', 'apellido', 'documento', 'email', 'fecha_nacimiento', 'activo') + _TOTALES),
+    'cursos': (Curso, ('id', 'codigo', 'nombre', 'descripcion', 'profesor') + _TOTALES),
+    'profesores': (Profesor, ('id', 'nombre', 'apellido', 'email')),
+    'matriculas': (Matricula, ('id', 'estudiante', 'curso', 'fecha', 'nota')),
+}
+DESNORMALIZADA = 'matriculas_detalle'
+TABLAS_OPCIONALES = {
+    DESNORMALIZADA: (Matricula, (
+        'id', 'fecha', 'nota', 'estudiante', 'estudiante__documento',
+        'curso', 'curso__codigo', 'curso__profesor',
+    )),
+}
+
+
+def disponible():
+    """Indica si pyarrow está instalado"""
+    return pa is not None
+
+
+def _campo(model, ruta):
+    """
+    Campo final de una ruta de `values_list` ('curso__profesor') y si puede
+    ser nulo (algún campo del camino admite nulos).
+    """
+    nulo = False
+    partes = ruta.split('__')
+    for parte in partes[:-1]:
+        relacion = model._meta.get_field(parte)
+        nulo = nulo or relacion.null
+        model = relacion.related_model
+    campo = model._meta.get_field(partes[-1])
+    return campo, nulo or campo.null
+
+
+def tipo_arrow(campo):
+    """Tipo Arrow de un campo de Django"""
+    if isinstance(campo, models.ForeignKey):
+        return tipo_arrow(campo.target_field)
+    if isinstance(campo, (models.BigAutoField, models.BigIntegerField, models.PositiveBigIntegerField)):
+        return pa.int64()
+    if isinstance(campo, (models.AutoField, models.IntegerField)):
+        return pa.int32()
+    if isinstance(campo, models.BooleanField):
+        return pa.bool_()
+    if isinstance(campo, models.DecimalField):
+        return pa.decimal128(campo.max_digits, campo.decimal_places)
+    if isinstance(campo, models.FloatField):
+        return pa.float64()
+    # DateTimeField hereda de DateField: va primero
+    if isinstance(campo, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(campo, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def nombre_columna(model, ruta):
+    """'profesor' -> 'profesor_id', 'curso__codigo' -> 'curso_codigo'"""
+    campo, _ = _campo(model, ruta)
+    nombre = ruta.replace('__', '_')
+    return f"{nombre}_id" if isinstance(campo, models.ForeignKey) else nombre
+
+
+def esquema(model, campos):
+    """Esquema Arrow de los campos de `values_list` de un modelo"""
+    columnas = []
+    for ruta in campos:
+        campo, nulo = _campo(model, ruta)
+        columnas.append(pa.field(nombre_columna(model, ruta), tipo_arrow(campo), nullable=nulo))
+    return pa.schema(columnas)
+
+
+def lotes(queryset, campos, schema, tamano_lote=LOTE):
+    """
+    Lee el queryset (ordenado por id) y genera RecordBatch de `tamano_lote` filas.
+
+    Optimización: cada lote se transpone con `zip(*filas)` y cada columna se
+    convierte con una sola llamada a `pa.array`, sin recorrer celda por
+    celda en Python.
+    """
+    filas = queryset.order_by('pk').values_list(*campos).iterator(chunk_size=min(tamano_lote, 10000))
+    while lote := list(islice(filas, tamano_lote)):
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(columna, type=campo.type) for columna, campo in zip(zip(*lote), schema)],
+            schema=schema,
+        )
+
+
+def _escritor(destino, schema, formato, compresion):
+    """ParquetWriter o escritor de archivo Arrow IPC con la compresión pedida"""
+    if formato == 'parquet':
+        return pq.ParquetWriter(destino, schema, compression=compresion)
+    codec = None if compresion == 'none' else compresion
+    return pa.ipc.new_file(destino, schema, options=pa.ipc.IpcWriteOptions(compression=codec))
+
+
+def escribir_lotes(destino, queryset, campos, formato='parquet', compresion='zstd', tamano_lote=LOTE):
+    """
+    Escribe el queryset en `destino` (ruta o archivo de pyarrow) lote por lote.
+
+    Yields:
+        int: Filas de cada lote, después de escribirlo
+    """
+    schema = esquema(queryset.model, campos)
+    with _escritor(destino, schema, formato, compresion) as escritor:
+        for lote in lotes(queryset, campos, schema, tamano_lote):
+            escritor.write_batch(lote)
+            yield lote.num_rows
+
+
+def validar(formato, compresion):
+    """Mensaje de error si el formato o la compresión no son válidos; None si lo son"""
+    if formato not in FORMATOS:
+        return f"Formato desconocido: {formato}. Disponibles: {', '.join(FORMATOS)}"
+    validas = COMPRESIONES if formato == 'parquet' else COMPRESIONES_ARROW
+    if compresion not in validas:
+        return f"Compresión no válida para {formato}: {compresion}. Disponibles: {', '.join(validas)}"
+    return None
+
+
+def exportar_tabla(carpeta, tabla, formato='parquet', compresion='zstd', tamano_lote=LOTE):
+    """
+    Escribe una tabla de TABLAS / TABLAS_OPCIONALES en `carpeta` (Path).
+
+    El archivo se escribe primero en un temporal y se renombra, así un
+    proceso que lo lee nunca ve un archivo a medio escribir.
+
+    Returns:
+        tuple: (ruta del archivo, filas)
+    """
+    model, campos = {**TABLAS, **TABLAS_OPCIONALES}[tabla]
+    ruta = carpeta / f"{tabla}.{FORMATOS[formato][0]}"
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    filas = sum(escribir_lotes(str(temporal), model.objects.all(), campos, formato, compresion, tamano_lote))
+    os.replace(temporal, ruta)
+    return ruta, filas
+
+
+class _Salida:
+    """Archivo de solo escritura para pyarrow: acumula bytes hasta que se retiran"""
+
+    closed = False
+
+    def __init__(self):
+        self.partes = []
+        self.posicion = 0
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self.partes.append(datos)
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def retirar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+def contenido(queryset, campos, formato='parquet', compresion='zstd', tamano_lote=LOTE):
+    """
+    Genera los bytes del archivo a medida que se escribe cada lote (para
+    una `StreamingHttpResponse`); el pie del archivo sale al final.
+    """
+    salida = _Salida()
+    for _ in escribir_lotes(pa.PythonFile(salida, mode='w'), queryset, campos, formato, compresion, tamano_lote):
+        yield salida.retirar()
+    yield salida.retirar()
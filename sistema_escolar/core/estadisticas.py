@@ -0,0 +1,199 @@
+"""
+Estadísticas de notas por curso, por profesor y de toda la escuela.
+
+Todo se calcula a partir de una tabla de frecuencias que arma la base con
+una única consulta agrupada:
+
+    SELECT grupo, nota, COUNT(*) FROM core_matricula
+    WHERE nota IS NOT NULL GROUP BY grupo, nota ORDER BY grupo, nota
+
+Las notas tienen dos decimales entre 0 y 10, así que cada grupo tiene como
+mucho 1001 valores distintos: el tamaño del resultado depende de la cantidad
+de cursos (o profesores), no de la cantidad de matrículas. Promedio,
+mediana, percentiles, histograma y porcentaje de aprobados salen de recorrer
+esas frecuencias ya ordenadas, grupo por grupo, sin instanciar modelos ni
+cargar las notas individuales (no hace falta NumPy).
+"""
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import accumulate, groupby
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import Curso, Matricula, Profesor
+
+
+NIVELES = ('curso', 'profesor', 'general')
+
+# Campo de Matricula por el que se agrupa en cada nivel
+_CAMPO_GRUPO = {'curso': 'curso_id', 'profesor': 'curso__profesor_id'}
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Intervalos del histograma: [0, 1), [1, 2), ... [9, 10]
+RANGOS_HISTOGRAMA = [(i, i + 1) for i in range(10)]
+
+CENTESIMO = Decimal('0.01')
+
+
+def _redondear(valor):
+    return valor.quantize(CENTESIMO, rounding=ROUND_HALF_UP)
+
+
+class Distribucion:
+    """
+    Distribución de notas de un grupo de matrículas.
+
+    Atributos:
+        clave: Id del curso o profesor (None para el total general o sin profesor)
+        nombre (str): Descripción del grupo
+        cantidad (int): Matrículas con nota
+        promedio, mediana, minima, maxima (Decimal): Medidas de la distribución
+        percentiles (dict): Percentil (10, 25, 50, 75, 90) -> nota
+        histograma (list): Cantidad de notas en cada intervalo de RANGOS_HISTOGRAMA
+        aprobados (int): Notas mayores o iguales a NOTA_APROBACION
+        porcentaje_aprobados (Decimal): aprobados / cantidad * 100
+    """
+
+    def __init__(self, clave, frecuencias, nota_aprobacion, nombre=''):
+        """
+        Args:
+            clave: Id del grupo
+            frecuencias (list): Pares (nota, cantidad) ordenados por nota
+            nota_aprobacion (Decimal): Nota mínima para aprobar
+        """
+        self.clave = clave
+        self.nombre = nombre
+        valores = [nota for nota, _ in frecuencias]
+        acumulado = list(accumulate(cantidad for _, cantidad in frecuencias))
+        self.cantidad = acumulado[-1]
+
+        self.minima = valores[0]
+        self.maxima = valores[-1]
+        self.promedio = _redondear(sum(nota * cantidad for nota, cantidad in frecuencias) / self.cantidad)
+        self.percentiles = {p: self._percentil(valores, acumulado, p) for p in PERCENTILES}
+        self.mediana = self.percentiles[50]
+
+        self.histograma = [0] * len(RANGOS_HISTOGRAMA)
+        self.aprobados = 0
+        for nota, cantidad in frecuencias:
+            self.histograma[min(int(nota), len(RANGOS_HISTOGRAMA) - 1)] += cantidad
+            if nota >= nota_aprobacion:
+                self.aprobados += cantidad
+        self.porcentaje_aprobados = _redondear(Decimal(self.aprobados * 100) / self.cantidad)
+
+    def _percentil(self, valores, acumulado, p):
+        """
+        Percentil con interpolación lineal entre posiciones (el método por
+        defecto de NumPy), ubicando cada posición en las frecuencias acumuladas.
+        """
+        posicion = Decimal(p) / 100 * (self.cantidad - 1)
+        inferior = int(posicion)
+        bajo = valores[bisect_right(acumulado, inferior)]
+        alto = valores[bisect_right(acumulado, min(inferior + 1, self.cantidad - 1))]
+        return _redondear(bajo + (alto - bajo) * (posicion - inferior))
+
+    def como_dict(self):
+        """Representación JSON (notas como float)"""
+        return {
+            'clave': self.clave,
+            'nombre': self.nombre,
+            'cantidad': self.cantidad,
+            'promedio': float(self.promedio),
+            'mediana': float(self.mediana),
+            'minima': float(self.minima),
+            'maxima': float(self.maxima),
+            'percentiles': {str(p): float(valor) for p, valor in self.percentiles.items()},
+            'histograma': [
+                {'desde': desde, 'hasta': hasta, 'cantidad': cantidad}
+                for (desde, hasta), cantidad in zip(RANGOS_HISTOGRAMA, self.histograma)
+            ],
+            'aprobados': self.aprobados,
+            'porcentaje_aprobados': float(self.porcentaje_aprobados),
+        }
+
+
+def nota_aprobacion():
+    """Nota mínima de aprobación (setting NOTA_APROBACION)"""
+    return Decimal(str(settings.NOTA_APROBACION))
+
+
+def frecuencias(nivel, queryset=None):
+    """
+    Tabla de frecuencias (grupo, nota, cantidad) ordenada, en una consulta.
+
+    Args:
+        nivel (str): 'curso', 'profesor' o 'general'
+        queryset: Matrículas a considerar (por defecto todas)
+
+    Yields:
+        tuple: (grupo, nota, cantidad); el grupo es None en el nivel general
+    """
+    queryset = (queryset if queryset is not None else Matricula.objects.all()).filter(nota__isnull=False)
+    if nivel == 'general':
+        filas = queryset.order_by('nota').values_list('nota').annotate(cantidad=Count('id'))
+        for nota, cantidad in filas.iterator():
+            yield None, nota, cantidad
+        return
+    campo = _CAMPO_GRUPO[nivel]
+    filas = queryset.order_by(campo, 'nota').values_list(campo, 'nota').annotate(cantidad=Count('id'))
+    yield from filas.iterator()
+
+
+def _nombres(nivel, claves):
+    """Descripción de cada grupo, con una consulta por nivel"""
+    if nivel == 'curso':
+        return {pk: f"{codigo} - {nombre}" for pk, codigo, nombre in
+                Curso.objects.filter(pk__in=claves).values_list('pk', 'codigo', 'nombre')}
+    if nivel == 'profesor':
+        nombres = {pk: f"{apellido}, {nombre}" for pk, apellido, nombre in
+                   Profesor.objects.filter(pk__in=claves).values_list('pk', 'apellido', 'nombre')}
+        nombres[None] = "Sin profesor"
+        return nombres
+    return {None: "Todos los cursos"}
+
+
+def distribuciones(nivel='curso', queryset=None):
+    """
+    Distribución de notas de cada grupo del nivel pedido.
+
+    Recorre la tabla de frecuencias una sola vez: al cambiar de grupo se
+    cierra la distribución del anterior.
+
+    Returns:
+        list: Objetos Distribucion ordenados por nombre del grupo (los grupos
+            sin ninguna nota no aparecen)
+    """
+    if nivel not in NIVELES:
+        raise ValueError(f"Nivel desconocido: {nivel}")
+    aprobacion = nota_aprobacion()
+    resultado = [
+        Distribucion(clave, [(nota, cantidad) for _, nota, cantidad in filas], aprobacion)
+        for clave, filas in groupby(frecuencias(nivel, queryset), key=lambda fila: fila[0])
+    ]
+    nombres = _nombres(nivel, [d.clave for d in resultado if d.clave is not None])
+    for distribucion in resultado:
+        distribucion.nombre = nombres.get(distribucion.clave, '')
+    return sorted(resultado, key=lambda d: d.nombre)
+
+
+def encabezados_csv():
+    """Columnas del CSV de estadísticas"""
+    return (
+        ['Id', 'Grupo', 'Notas', 'Promedio', 'Mediana', 'Mínima', 'Máxima']
+        + [f'P{p}' for p in PERCENTILES]
+        + ['Aprobados', '% Aprobados']
+        + [f'{desde}-{hasta}' for desde, hasta in RANGOS_HISTOGRAMA]
+    )
+
+
+def fila_csv(distribucion):
+    """Valores de una distribución en el orden de `encabezados_csv()`"""
+    d = distribucion
+    return (
+        [d.clave if d.clave is not None else '', d.nombre, d.cantidad, d.promedio, d.mediana, d.minima, d.maxima]
+        + [d.percentiles[p] for p in PERCENTILES]
+        + [d.aprobados, d.porcentaje_aprobados]
+        + d.histograma
+    )
@@ -0,0 +1,265 @@
+"""
+Exportadores compartidos por las vistas de listado.
+
+Las vistas declaran sus columnas una sola vez con `Columna` y el exportador
+lee el queryset por bloques con `.values_list().iterator()`, sin construir
+instancias de modelo. La respuesta se envía con `StreamingHttpResponse`, de
+modo que la memoria del worker se mantiene constante sin importar la
+cantidad de filas.
+
+Registro de formatos: `EXPORTADORES` asocia cada valor de `?export=` con la
+ruta de su clase, que se importa recién la primera vez que se pide ese
+formato (`exportador()`). Así las dependencias pesadas (reportlab para el
+PDF) no se cargan al iniciar cada worker, solo en el que genera el archivo.
+Las columnas entregan valores con su tipo (fechas, booleanos, decimales) y
+cada exportador los convierte a su formato.
+"""
+import csv
+import time
+from functools import lru_cache
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from django.utils.text import slugify
+
+from . import prometheus
+
+
+# Cantidad de filas que se leen de la base por cada viaje al cursor
+CHUNK_SIZE = 2000
+
+# Formato de ?export= -> clase exportadora (se importa al primer uso)
+EXPORTADORES = {
+    'csv': 'core.exporters.CSVExporter',
+    'json': 'core.exporters.JSONExporter',
+    'pdf': 'core.pdf.PDFExporter',
+    'xlsx': 'core.xlsx.XLSXExporter',
+}
+
+
+def registrar(formato, ruta):
+    """Agrega (o reemplaza) el exportador de un formato, dado como ruta 'modulo.Clase'"""
+    EXPORTADORES[formato] = ruta
+    exportador.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def exportador(formato):
+    """Clase exportadora del formato (importada la primera vez); None si no está registrado"""
+    ruta = EXPORTADORES.get(formato)
+    return import_string(ruta) if ruta else None
+
+
+class Columna:
+    """
+    Columna exportable de un listado.
+
+    Atributos:
+        titulo (str): Encabezado de la columna en el archivo
+        campos (tuple): Campos de `values_list` que necesita la columna
+        formato (callable): Recibe los valores de `campos` y retorna el valor
+            a escribir. Por defecto se escribe el primer campo tal cual.
+        clave (str): Nombre de la columna en formatos con claves (JSON); por
+            defecto el campo, o el título en minúsculas si son varios
+        titulo_corto (str): Encabezado en formatos impresos (PDF), si difiere
+        ancho (float): Ancho en pulgadas en formatos impresos
+        recorte (int): Largo máximo del texto en formatos impresos
+    """
+
+    def __init__(self, titulo, *campos, formato=None, clave=None, titulo_corto=None, ancho=None, recorte=None):
+        self.titulo = titulo
+        self.campos = campos
+        self.formato = formato
+        self.clave = clave or (campos[0] if len(campos) == 1 else slugify(titulo).replace('-', '_'))
+        self.titulo_corto = titulo_corto or titulo
+        self.ancho = ancho
+        self.recorte = recorte
+
+    def valor(self, valores):
+        """Aplica el formato de la columna a los valores leídos de la fila"""
+        if self.formato is None:
+            return valores[0]
+        return self.formato(*valores)
+
+
+def filas(queryset, columnas, chunk_size=CHUNK_SIZE):
+    """
+    Genera las filas formateadas de un queryset según sus columnas.
+
+    Optimización: se pide a la base un único `values_list` con todos los
+    campos de todas las columnas y se recorre con `.iterator()`, por lo que
+    solo hay `chunk_size` tuplas en memoria a la vez.
+
+    Yields:
+        list: Valores de la fila en el orden de `columnas`
+    """
+    campos = []
+    cortes = []
+    for columna in columnas:
+        inicio = len(campos)
+        campos.extend(columna.campos)
+        cortes.append((columna, inicio, len(campos)))
+
+    for fila in queryset.values_list(*campos).iterator(chunk_size=chunk_size):
+        yield [columna.valor(fila[inicio:fin]) for columna, inicio, fin in cortes]
+
+
+class _Eco:
+    """Pseudo-buffer: `csv.writer` escribe aquí y recibimos la línea de vuelta"""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(encabezados, filas):
+    """Genera el encabezado y luego una línea CSV por cada fila (lista de valores)"""
+    writer = csv.writer(_Eco())
+    yield writer.writerow(encabezados)
+    for fila in filas:
+        yield writer.writerow(fila)
+
+
+def medir_exportacion(contenido, exportador, formato):
+    """
+    Envía `contenido` codificado en UTF-8 y, al terminar (o si el cliente
+    corta la descarga), registra la duración y los bytes enviados en
+    core.prometheus. Las partes salen ya en bytes, así la respuesta no las
+    vuelve a codificar.
+    """
+    inicio = time.perf_counter()
+    enviados = 0
+    try:
+        for parte in contenido:
+            if isinstance(parte, str):
+                parte = parte.encode()
+            enviados += len(parte)
+            yield parte
+    finally:
+        prometheus.registrar_exportacion(exportador, formato, time.perf_counter() - inicio, enviados)
+
+
+def respuesta_descarga(contenido, filename, content_type):
+    """
+    `StreamingHttpResponse` que el navegador descarga como `filename`.
+
+    La exportación se registra en las métricas con el nombre del archivo
+    (ej: exportador 'estudiantes', formato 'csv').
+    """
+    exportador, _, formato = filename.rpartition('.')
+    response = StreamingHttpResponse(medir_exportacion(contenido, exportador, formato), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+async def iterar_async(iterable, lote=CHUNK_SIZE):
+    """
+    Recorre un iterador síncrono (que consulta la base) desde código async.
+
+    Cada viaje al hilo de la base trae `lote` elementos, así el costo de
+    cambiar de hilo no se paga por cada línea.
+    """
+    iterador = iter(iterable)
+    leer = sync_to_async(lambda: list(islice(iterador, lote)), thread_sensitive=True)
+    while partes := await leer():
+        for parte in partes:
+            yield parte
+
+
+def respuesta_async(response):
+    """
+    Adapta una descarga en streaming para servirla desde una vista async.
+
+    Con ASGI, Django lee un iterador síncrono completo en memoria antes de
+    enviarlo; con un iterador asíncrono lo envía a medida que se genera.
+    """
+    if response.streaming and not response.is_async:
+        response.streaming_content = iterar_async(response.streaming_content)
+    return response
+
+
+class Exportador:
+    """
+    Base de los exportadores del registro.
+
+    Atributos de clase:
+        content_type (str): Tipo MIME de la descarga
+        en_segundo_plano (bool): El archivo se genera en un ReporteJob
+            (`procesar_reportes`) en lugar de durante la petición
+
+    Cada subclase implementa `contenido(queryset)` (partes en texto o bytes)
+    o, si genera el archivo de una vez, `render(destino, queryset)`.
+    """
+    content_type = 'application/octet-stream'
+    en_segundo_plano = False
+
+    def __init__(self, columnas, titulo='', alineacion='CENTER', chunk_size=CHUNK_SIZE):
+        self.columnas = columnas
+        self.titulo = titulo
+        self.alineacion = alineacion
+        self.chunk_size = chunk_size
+
+    def filas(self, queryset):
+        """Filas del queryset con los valores tal como salen de la base"""
+        return filas(queryset, self.columnas, self.chunk_size)
+
+    def contenido(self, queryset):
+        raise NotImplementedError
+
+    def response(self, queryset, filename):
+        """Retorna la `StreamingHttpResponse` lista para descargar"""
+        return respuesta_descarga(self.contenido(queryset), filename, self.content_type)
+
+    def render(self, destino, queryset):
+        """Escribe el archivo completo en `destino` (archivo binario); lo usa el worker de reportes"""
+        for parte in self.contenido(queryset):
+            destino.write(parte.encode() if isinstance(parte, str) else parte)
+
+
+def texto_csv(valor):
+    """Valor de una celda CSV: booleanos como Sí/No, el resto como lo escribe `csv`"""
+    if valor is True:
+        return 'Sí'
+    if valor is False:
+        return 'No'
+    return valor
+
+
+class CSVExporter(Exportador):
+    """
+    Exportador CSV en streaming.
+
+    Cada fila se convierte en texto apenas sale del cursor y se envía al
+    cliente, así el primer byte llega de inmediato y nunca se arma el
+    archivo completo en memoria.
+    """
+    content_type = 'text/csv'
+
+    def lineas(self, queryset):
+        """Genera el encabezado y luego una línea CSV por fila del queryset"""
+        return lineas_csv(
+            [columna.titulo for columna in self.columnas],
+            ([texto_csv(valor) for valor in fila] for fila in self.filas(queryset)),
+        )
+
+    contenido = lineas
+
+
+class JSONExporter(Exportador):
+    """
+    Exportador JSON en streaming: un arreglo con un objeto por fila, con las
+    claves de las columnas (`Columna.clave`). Fechas en ISO 8601 y decimales
+    como texto (DjangoJSONEncoder), booleanos y nulos nativos.
+    """
+    content_type = 'application/json'
+
+    def contenido(self, queryset):
+        claves = [columna.clave for columna in self.columnas]
+        codificar = DjangoJSONEncoder(ensure_ascii=False).encode
+        separador = '[\n'
+        for fila in self.filas(queryset):
+            yield separador + codificar(dict(zip(claves, fila)))
+            separador = ',\n'
+        yield '[]\n' if separador == '[\n' else '\n]\n'
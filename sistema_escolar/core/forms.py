@@ -1,6 +1,7 @@
 from django import forms
 # AÑADIDO: Importar Profesor y Matricula
 from .models import Estudiante, Curso, Profesor, Matricula
+from .matriculas import no_matriculados, separar_valores
 
 # 1. EstudianteForm (Con Datepicker "cheto")
 class EstudianteForm(forms.ModelForm):
@@ -51,13 +52,26 @@ class CursoForm(forms.ModelForm):
 
 # 4. MatriculaForm (Nuevo: para agregar alumnos a cursos)
 class MatriculaForm(forms.ModelForm):
+    """
+    Formulario para matricular un alumno en un curso.
+
+    El alumno se elige con un buscador (ver MatriculaBuscarEstudiantesView)
+    que completa un campo oculto con su id; así la página no renderiza un
+    <option> por cada estudiante y la validación consulta un único id.
+    """
     class Meta:
         model = Matricula
         fields = ['estudiante', 'nota'] 
         widgets = {
-            'estudiante': forms.Select(attrs={'class': 'form-select'}),
+            'estudiante': forms.HiddenInput(),
             'nota': forms.NumberInput(attrs={'class': 'form-control', 'min': 0, 'max': 10, 'placeholder': 'Nota inicial (opcional)'}),
         }
+        error_messages = {
+            'estudiante': {
+                'required': "Seleccione un alumno de la lista",
+                'invalid_choice': "El alumno no existe o ya está matriculado en este curso",
+            },
+        }
     
     # Filtra estudiantes que NO están matriculados en el curso actual
     def __init__(self, *args, **kwargs):
@@ -65,9 +79,121 @@ class MatriculaForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         
         if self.curso:
-            # Obtiene los IDs de los estudiantes ya matriculados
-            matriculados_ids = self.curso.matriculas.values_list('estudiante_id', flat=True)
-            # Filtra el queryset de estudiantes excluyendo a los que ya tienen matrícula
-            self.fields['estudiante'].queryset = Estudiante.objects.exclude(id__in=matriculados_ids).order_by('apellido')
+            # NOT EXISTS por estudiante: al validar solo se busca el id enviado
+            self.fields['estudiante'].queryset = no_matriculados(self.curso)
             self.fields['estudiante'].label = "Seleccionar Alumno"
-            self.fields['nota'].required = False
\ No newline at end of file
+            self.fields['nota'].required = False
+
+# 5. ValidadorEstudiante (Importación masiva: mismas reglas que EstudianteForm)
+class ValidadorEstudiante:
+    """
+    Valida filas de estudiantes con las reglas de EstudianteForm sin crear
+    un formulario por fila.
+
+    Se instancia un único EstudianteForm y se reutilizan sus campos
+    (`field.clean`) y su `clean_documento`; para 100k filas esto evita
+    construir 100k formularios con sus widgets y BoundFields.
+
+    Los campos opcionales que faltan en la fila toman el valor por defecto
+    del modelo (ej: activo=True), igual que al crear desde el admin.
+    """
+
+    def __init__(self):
+        self.form = EstudianteForm()
+        self.campos = list(self.form.fields.items())
+        self.defaults = {
+            nombre: Estudiante._meta.get_field(nombre).get_default()
+            for nombre, campo in self.campos if not campo.required
+        }
+
+    def limpiar(self, fila):
+        """
+        Valida una fila (dict con strings o valores JSON).
+
+        Returns:
+            tuple: (datos limpios, errores) donde errores es un dict
+                campo -> lista de mensajes (vacío si la fila es válida)
+        """
+        datos, errores = {}, {}
+        for nombre, campo in self.campos:
+            valor = fila.get(nombre)
+            if nombre in self.defaults and valor in (None, ''):
+                datos[nombre] = self.defaults[nombre]
+                continue
+            try:
+                datos[nombre] = campo.clean(valor)
+            except forms.ValidationError as exc:
+                errores[nombre] = exc.messages
+        if 'documento' in datos:
+            self.form.cleaned_data = datos
+            try:
+                datos['documento'] = self.form.clean_documento()
+            except forms.ValidationError as exc:
+                errores['documento'] = exc.messages
+        return datos, errores
+
+
+# 6. MatriculaLoteForm (Matrícula masiva por documentos)
+class MatriculaLoteForm(forms.Form):
+    """
+    Formulario para matricular una cohorte completa en un curso.
+
+    Recibe los documentos pegados en un textarea (uno por línea, o separados
+    por coma/espacio) en lugar de un select con todos los estudiantes.
+    """
+    documentos = forms.CharField(
+        label="Documentos de los alumnos",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 8,
+                                     'placeholder': 'Un documento por línea'}),
+    )
+    nota = forms.DecimalField(
+        max_digits=4, decimal_places=2, min_value=0, max_value=10, required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Nota inicial (opcional)'}),
+    )
+
+    def clean_documentos(self):
+        """Retorna la lista de documentos sin repetir"""
+        documentos = separar_valores(self.cleaned_data['documentos'])
+        if not documentos:
+            raise forms.ValidationError("Ingrese al menos un documento")
+        return documentos
+
+
+# 7. NotasCSVForm (Carga de notas de un curso desde un CSV documento,nota)
+class NotasCSVForm(forms.Form):
+    """
+    CSV `documento,nota` pegado en un textarea o subido como archivo.
+
+    El archivo se lee como UTF-8 (con o sin BOM) y, si no lo es, como
+    Windows-1252, que es como lo guarda Excel en español.
+    """
+    texto = forms.CharField(
+        label="Pegar CSV", required=False,
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 6,
+                                     'placeholder': 'documento,nota'}),
+    )
+    archivo = forms.FileField(
+        label="O subir un archivo CSV", required=False,
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.txt'}),
+    )
+
+    # Un CSV de 10.000 filas documento,nota ocupa bastante menos
+    MAX_BYTES = 2 * 1024 * 1024
+
+    def clean(self):
+        """Deja en cleaned_data['contenido'] el texto del CSV (del archivo o del textarea)"""
+        datos = super().clean()
+        archivo = datos.get('archivo')
+        if archivo:
+            if archivo.size > self.MAX_BYTES:
+                raise forms.ValidationError(f"El archivo supera {self.MAX_BYTES // (1024 * 1024)} MB")
+            crudo = archivo.read()
+            try:
+                datos['contenido'] = crudo.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                datos['contenido'] = crudo.decode('cp1252', errors='replace')
+        else:
+            datos['contenido'] = datos.get('texto', '')
+        if not datos['contenido'].strip():
+            raise forms.ValidationError("Pegue el CSV o elija un archivo")
+        return datos
@@ -0,0 +1,237 @@
+"""
+Generador de datos sintéticos (profesores, cursos, estudiantes y matrículas).
+
+Lo usan `manage.py create_setup` (datos de ejemplo, staging) y
+benchmarks/datos.py (bases de 10k a 1M estudiantes). Características:
+
+    - Determinista: cada bloque de BLOQUE filas usa su propio generador
+      aleatorio derivado de la semilla, así la fila i es siempre la misma,
+      con cualquier tamaño de lote y aunque la carga se corte y se retome.
+    - Por columnas: cada bloque genera sus valores de una vez
+      (`rng.choices(..., k=n)`) en lugar de fila por fila.
+    - Masivo: bulk_create por lotes, una transacción por lote.
+    - Idempotente: cada fila tiene una clave natural fija (email del
+      profesor, código del curso, documento del estudiante, par
+      estudiante/curso) y las que ya existen no se vuelven a insertar.
+      Correr dos veces con los mismos parámetros no duplica nada; con
+      parámetros mayores solo agrega lo que falta.
+
+Durante la carga se quitan los triggers de búsqueda (core.busqueda) y al
+final se reconstruye el índice y se recalculan los totales de matrículas
+(core.agregados) una sola vez.
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from . import agregados, busqueda, versiones
+from .models import Curso, Estudiante, Matricula, Profesor
+
+
+NOMBRES = (
+    'Juan', 'María', 'José', 'Ana', 'Luis', 'Lucía', 'Carlos', 'Sofía', 'Miguel', 'Valentina',
+    'Jorge', 'Camila', 'Diego', 'Martina', 'Pedro', 'Florencia', 'Andrés', 'Paula', 'Tomás', 'Julieta',
+)
+APELLIDOS = (
+    'Gómez', 'Rodríguez', 'Fernández', 'López', 'Martínez', 'González', 'Pérez', 'Sánchez', 'Romero', 'Díaz',
+    'Álvarez', 'Torres', 'Ruiz', 'Ramírez', 'Flores', 'Benítez', 'Acosta', 'Medina', 'Herrera', 'Suárez',
+    'Aguirre', 'Giménez', 'Gutiérrez', 'Pereyra', 'Rojas', 'Molina', 'Castro', 'Ortiz', 'Silva', 'Núñez',
+)
+MATERIAS = (
+    'Matemática', 'Lengua', 'Historia', 'Geografía', 'Física', 'Química', 'Biología', 'Inglés',
+    'Programación', 'Economía', 'Filosofía', 'Arte',
+)
+
+# Filas generadas con un mismo generador aleatorio (no cambia con --lote)
+BLOQUE = 1000
+LOTE = 10000
+
+NACIMIENTO_MINIMO = date(1995, 1, 1)
+
+
+# Claves naturales de las filas generadas
+def email_profesor(i):
+    return f"profesor{i}@escuela.test"
+
+
+def codigo_curso(i):
+    return f"C{i:05d}"
+
+
+def documento_estudiante(i):
+    return str(40000000 + i)
+
+
+def _rng(semilla, tabla, bloque):
+    return random.Random(f"{semilla}:{tabla}:{bloque}")
+
+
+def _bloques(semilla, tabla, total, lote):
+    """
+    Recorre 1..total en bloques de BLOQUE filas agrupados en lotes.
+
+    Yields:
+        list: Lote de tuplas (desde, hasta, rng) con `hasta` exclusivo
+    """
+    bloques = []
+    for numero, desde in enumerate(range(1, total + 1, BLOQUE)):
+        bloques.append((desde, min(desde + BLOQUE, total + 1), _rng(semilla, tabla, numero)))
+        if len(bloques) * BLOQUE >= lote:
+            yield bloques
+            bloques = []
+    if bloques:
+        yield bloques
+
+
+def _insertar_faltantes(model, clave, objetos):
+    """
+    Inserta los objetos cuya clave natural no existe; retorna {clave: id} de todos.
+
+    Dos consultas por lote (existentes e INSERT); los ids de las filas nuevas
+    los devuelve bulk_create (RETURNING en SQLite y PostgreSQL).
+    """
+    claves = [getattr(objeto, clave) for objeto in objetos]
+    ids = dict(model.objects.filter(**{f"{clave}__in": claves}).values_list(clave, 'id'))
+    nuevos = [objeto for objeto in objetos if getattr(objeto, clave) not in ids]
+    if nuevos:
+        model.objects.bulk_create(nuevos, batch_size=2000)
+        ids.update((getattr(objeto, clave), objeto.pk) for objeto in nuevos)
+    return ids, len(nuevos)
+
+
+class Generador:
+    """
+    Carga un conjunto de datos sintéticos en la base `default`.
+
+    Atributos:
+        estudiantes, cursos, profesores (int): Cantidad de filas de cada tabla
+        por_estudiante (int): Matrículas de cada estudiante (en cursos distintos)
+        semilla (int): Semilla de los datos; otra semilla genera otros valores
+            con las mismas claves
+        lote (int): Filas por transacción
+        informar (callable): Recibe (tabla, filas nuevas, filas totales, segundos)
+            al terminar cada tabla
+        insertadas (dict): Filas nuevas por tabla después de `ejecutar()`
+    """
+
+    def __init__(self, estudiantes, cursos, por_estudiante, profesores=None, semilla=1, lote=LOTE, informar=None):
+        self.estudiantes = estudiantes
+        self.cursos = cursos
+        self.profesores = profesores or max(1, cursos // 4)
+        self.por_estudiante = min(por_estudiante, cursos)
+        self.semilla = semilla
+        self.lote = max(BLOQUE, lote)
+        self.informar = informar or (lambda *args: None)
+        self.insertadas = {}
+
+    def ejecutar(self):
+        """Inserta lo que falta, reconstruye el índice de búsqueda y los totales"""
+        if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                # Datos regenerables: no hace falta esperar al disco en cada lote
+                # (SQLite no permite cambiarlo dentro de una transacción)
+                cursor.execute("PRAGMA synchronous=OFF")
+        # Los triggers FTS se quitan durante la carga y el índice se reconstruye una vez al final
+        busqueda.quitar_triggers(plan=True)
+        try:
+            profesores = self._tabla('profesores', self.profesores, self._profesores, Profesor, 'email')
+            self.ids_profesores = [profesores[email_profesor(i)] for i in range(1, self.profesores + 1)]
+            cursos = self._tabla('cursos', self.cursos, self._cursos, Curso, 'codigo')
+            self.ids_cursos = [cursos[codigo_curso(i)] for i in range(1, self.cursos + 1)]
+            self.insertadas['matriculas'] = 0
+            inicio = time.perf_counter()
+            self._tabla('estudiantes', self.estudiantes, self._estudiantes, Estudiante, 'documento',
+                        despues=self._matriculas, conservar_ids=False)
+            self.informar('matriculas', self.insertadas['matriculas'], self.estudiantes * self.por_estudiante,
+                          time.perf_counter() - inicio)
+        finally:
+            busqueda.instalar_indices()
+        if any(self.insertadas.values()):
+            agregados.recalcular_cursos()
+            agregados.recalcular_estudiantes()
+            versiones.registrar_cambio('profesor', 'matricula')
+        return self.insertadas
+
+    def _tabla(self, tabla, total, construir, model, clave, despues=None, conservar_ids=True):
+        """
+        Carga una tabla lote por lote.
+
+        Args:
+            despues (callable): Se llama con (lote, {clave: id}) dentro de la
+                transacción de cada lote (las matrículas de sus estudiantes)
+            conservar_ids (bool): Acumular {clave: id} de toda la tabla; con
+                1M de estudiantes no hace falta y ocuparía memoria
+
+        Returns:
+            dict: {clave: id} de la tabla completa (vacío sin conservar_ids)
+        """
+        inicio = time.perf_counter()
+        todos, nuevas = {}, 0
+        for lote in _bloques(self.semilla, tabla, total, self.lote):
+            objetos = [objeto for desde, hasta, rng in lote for objeto in construir(desde, hasta, rng)]
+            with transaction.atomic():
+                ids, cantidad = _insertar_faltantes(model, clave, objetos)
+                if despues is not None:
+                    despues(lote, ids)
+            nuevas += cantidad
+            if conservar_ids:
+                todos.update(ids)
+        self.insertadas[tabla] = nuevas
+        self.informar(tabla, nuevas, total, time.perf_counter() - inicio)
+        return todos
+
+    def _profesores(self, desde, hasta, rng):
+        n = hasta - desde
+        return map(
+            lambda i, nombre, apellido: Profesor(nombre=nombre, apellido=apellido, email=email_profesor(i)),
+            range(desde, hasta), rng.choices(NOMBRES, k=n), rng.choices(APELLIDOS, k=n),
+        )
+
+    def _cursos(self, desde, hasta, rng):
+        n = hasta - desde
+        return map(
+            lambda i, materia, profesor: Curso(
+                codigo=codigo_curso(i), nombre=f"{materia} {i}",
+                descripcion=f"Curso de {materia.lower()} ({codigo_curso(i)})", profesor_id=profesor,
+            ),
+            range(desde, hasta), rng.choices(MATERIAS, k=n), rng.choices(self.ids_profesores, k=n),
+        )
+
+    def _estudiantes(self, desde, hasta, rng):
+        n = hasta - desde
+        return map(
+            lambda i, nombre, apellido, dias, azar: Estudiante(
+                nombre=nombre, apellido=apellido, documento=documento_estudiante(i),
+                email=f"alumno{i}@escuela.test", fecha_nacimiento=NACIMIENTO_MINIMO + timedelta(days=dias),
+                activo=azar < 0.9,
+            ),
+            range(desde, hasta), rng.choices(NOMBRES, k=n), rng.choices(APELLIDOS, k=n),
+            [rng.randrange(4000) for _ in range(n)], [rng.random() for _ in range(n)],
+        )
+
+    def _matriculas(self, lote, ids_estudiantes):
+        """Inserta las matrículas de los estudiantes del lote que aún no existen"""
+        if not self.por_estudiante:
+            return
+        existentes = set(
+            Matricula.objects.filter(estudiante_id__in=ids_estudiantes.values()).values_list('estudiante_id', 'curso_id')
+        )
+        nuevas = []
+        for desde, hasta, _ in lote:
+            # Generador propio: las matrículas no dependen de cuántos estudiantes ya existían
+            rng = _rng(self.semilla, 'matriculas', desde // BLOQUE)
+            for i in range(desde, hasta):
+                estudiante_id = ids_estudiantes[documento_estudiante(i)]
+                cursos = rng.sample(self.ids_cursos, self.por_estudiante)
+                notas = [None if azar < 0.2 else Decimal(rng.randint(0, 100)) / 10
+                         for azar in (rng.random() for _ in cursos)]
+                nuevas.extend(
+                    Matricula(estudiante_id=estudiante_id, curso_id=curso_id, nota=nota)
+                    for curso_id, nota in zip(cursos, notas)
+                    if (estudiante_id, curso_id) not in existentes
+                )
+        Matricula.objects.bulk_create(nuevas, batch_size=2000)
+        self.insertadas['matriculas'] += len(nuevas)
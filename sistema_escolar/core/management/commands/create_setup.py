@@ -1,18 +1,64 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
-from core.models import Estudiante, Curso, Profesor, Matricula
-from datetime import date
-import random
+
+from core.generador import LOTE, Generador
+from core.models import Estudiante, Curso, Matricula
+
 
 class Command(BaseCommand):
-    help = "Crea grupos, usuarios y datos de ejemplo (profesores, cursos, estudiantes, matrículas)."
+    help = (
+        "Crea grupos, usuarios y datos de ejemplo (profesores, cursos, estudiantes, matrículas). "
+        "Es idempotente: se puede volver a correr, y con una escala mayor solo agrega lo que falta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiantes', '--students', type=int, default=10)
+        parser.add_argument('--cursos', '--courses', type=int, default=5)
+        parser.add_argument('--matriculas-por-estudiante', '--enrollments-per-student', type=int, default=2,
+                            help="Cursos distintos en los que se matricula cada estudiante.")
+        parser.add_argument('--profesores', '--professors', type=int, default=None,
+                            help="Por defecto un profesor cada 4 cursos (mínimo 3).")
+        parser.add_argument('--semilla', '--seed', type=int, default=1,
+                            help="Misma semilla y escala = mismos datos.")
+        parser.add_argument('--lote', type=int, default=LOTE, help="Filas por transacción/bulk_create.")
+        parser.add_argument('--sin-datos', action='store_true', help="Solo grupos y usuarios.")
 
     def handle(self, *args, **options):
+        for opcion in ('estudiantes', 'cursos', 'matriculas_por_estudiante'):
+            if options[opcion] < 0:
+                raise CommandError(f"--{opcion.replace('_', '-')} no puede ser negativo.")
+        if options['matriculas_por_estudiante'] and not options['cursos']:
+            raise CommandError("Hace falta al menos un curso para generar matrículas.")
+
+        self._grupos_y_usuarios()
+        if options['sin_datos']:
+            self.stdout.write(self.style.SUCCESS("Grupos y usuarios creados con éxito."))
+            return
+
+        inicio = time.perf_counter()
+        generador = Generador(
+            estudiantes=options['estudiantes'],
+            cursos=options['cursos'],
+            por_estudiante=options['matriculas_por_estudiante'],
+            profesores=options['profesores'] or max(3, options['cursos'] // 4),
+            semilla=options['semilla'],
+            lote=options['lote'],
+            informar=self._informar,
+        )
+        insertadas = generador.ejecutar()
+        self.stdout.write(self.style.SUCCESS(
+            f"Grupos, usuarios y datos de ejemplo listos: {sum(insertadas.values())} filas nuevas "
+            f"en {time.perf_counter() - inicio:.1f}s."
+        ))
+
+    def _grupos_y_usuarios(self):
         admin_group, _ = Group.objects.get_or_create(name='admin')
         staff_group, _ = Group.objects.get_or_create(name='staff')
 
-        ct_models = [Estudiante, Curso]
+        ct_models = [Estudiante, Curso, Matricula]
         for ct in ct_models:
             content_type = ContentType.objects.get_for_model(ct)
             for perm in Permission.objects.filter(content_type=content_type):
@@ -28,25 +74,8 @@ class Command(BaseCommand):
             u = User.objects.create_user('staff', 'staff@example.com', 'staff123')
             u.groups.add(staff_group)
 
-        # Datos de ejemplo
-        profesores = [Profesor.objects.create(nombre=f"Profesor {i}", email=f"prof{i}@mail.com") for i in range(1,4)]
-        cursos = [
-            Curso.objects.create(codigo=f"C{i:02}", nombre=f"Curso {i}", profesor=random.choice(profesores))
-            for i in range(1,6)
-        ]
-        estudiantes = [
-            Estudiante.objects.create(
-                nombre=f"Nombre{i}",
-                apellido=f"Apellido{i}",
-                documento=f"{1000+i}",
-                email=f"alumno{i}@mail.com",
-                fecha_nacimiento=date(2000+i%5, random.randint(1,12), random.randint(1,28)),
-                activo=True
-            )
-            for i in range(1,11)
-        ]
-        for e in estudiantes:
-            for c in random.sample(cursos, 2):
-                Matricula.objects.get_or_create(estudiante=e, curso=c)
-
-        self.stdout.write(self.style.SUCCESS("Grupos, usuarios y datos de ejemplo creados con éxito."))
+    def _informar(self, tabla, nuevas, total, segundos):
+        velocidad = nuevas / segundos if segundos else 0
+        self.stdout.write(
+            f"  {tabla:<12} {nuevas:>10} nuevas de {total:<10} {segundos:>7.1f}s  {velocidad:>10.0f} filas/s"
+        )
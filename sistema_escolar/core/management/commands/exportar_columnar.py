@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import columnar
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta las tablas a archivos Parquet o Arrow (uno por tabla) para análisis de datos. "
+        "Requiere pyarrow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', required=True, help="Carpeta destino (se crea si no existe).")
+        parser.add_argument('--tablas', nargs='+', choices=list(columnar.TABLAS), default=list(columnar.TABLAS))
+        parser.add_argument('--formato', choices=list(columnar.FORMATOS), default='parquet')
+        parser.add_argument('--compresion', choices=columnar.COMPRESIONES, default='zstd')
+        parser.add_argument('--lote', type=int, default=columnar.LOTE,
+                            help="Filas por RecordBatch (y por row group en Parquet).")
+        parser.add_argument('--desnormalizar', action='store_true',
+                            help=f"Agrega la tabla {columnar.DESNORMALIZADA} (matrículas con estudiante y curso).")
+
+    def handle(self, *args, **options):
+        if not columnar.disponible():
+            raise CommandError("pyarrow no está instalado: pip install pyarrow")
+        error = columnar.validar(options['formato'], options['compresion'])
+        if error:
+            raise CommandError(error)
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que cero.")
+
+        carpeta = Path(options['salida'])
+        carpeta.mkdir(parents=True, exist_ok=True)
+        tablas = list(options['tablas'])
+        if options['desnormalizar']:
+            tablas.append(columnar.DESNORMALIZADA)
+
+        inicio = time.perf_counter()
+        for tabla in tablas:
+            comienzo = time.perf_counter()
+            ruta, filas = columnar.exportar_tabla(
+                carpeta, tabla, options['formato'], options['compresion'], options['lote'],
+            )
+            self._informar(tabla, filas, ruta.stat().st_size, time.perf_counter() - comienzo)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tablas)} tablas exportadas a {carpeta} en {time.perf_counter() - inicio:.1f}s."
+        ))
+
+    def _informar(self, tabla, filas, tamano, segundos):
+        velocidad = filas / segundos if segundos else 0
+        self.stdout.write(
+            f"  {tabla:<20} {filas:>10} filas {tamano / 1024:>10.0f} KB {segundos:>7.1f}s  {velocidad:>10.0f} filas/s"
+        )
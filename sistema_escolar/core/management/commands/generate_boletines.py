@@ -0,0 +1,51 @@
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import boletines
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un boletín PDF por estudiante (cursos, profesor y nota de cada matrícula) "
+        "en una carpeta o un zip, renderizando por lotes en un pool de procesos."
+    )
+
+    def add_arguments(self, parser):
+        destino = parser.add_mutually_exclusive_group(required=True)
+        destino.add_argument('--salida', metavar='CARPETA', help="Carpeta donde escribir un PDF por estudiante.")
+        destino.add_argument('--zip', metavar='ARCHIVO', help="Archivo zip con todos los boletines.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Procesos que renderizan en paralelo (1 = en este proceso).")
+        parser.add_argument('--lote', type=int, default=boletines.LOTE, help="Estudiantes por lote de trabajo.")
+        parser.add_argument('--activos', action='store_true', help="Solo estudiantes activos.")
+        parser.add_argument('--cursos', nargs='+', metavar='CODIGO',
+                            help="Solo estudiantes matriculados en alguno de estos cursos.")
+
+    def handle(self, *args, **options):
+        ids = boletines.ids_estudiantes(cursos=options['cursos'], solo_activos=options['activos'])
+        if not ids:
+            raise CommandError("No hay estudiantes para los filtros indicados.")
+
+        workers = max(1, min(options['workers'], -(-len(ids) // max(1, options['lote']))))
+        self.stdout.write(f"Generando {len(ids)} boletines con {workers} worker(s)...")
+        self._inicio = time.perf_counter()
+        opciones = {'workers': workers, 'tamano_lote': options['lote'], 'progreso': self._progreso}
+        if options['zip']:
+            generados = boletines.escribir_zip(options['zip'], ids, **opciones)
+            destino = options['zip']
+        else:
+            generados = boletines.escribir_carpeta(Path(options['salida']), ids, **opciones)
+            destino = options['salida']
+        segundos = time.perf_counter() - self._inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{generados} boletines en {destino} ({segundos:.1f}s, {generados / segundos:.0f} boletines/s)."
+        ))
+
+    def _progreso(self, generados, total):
+        segundos = time.perf_counter() - self._inicio
+        self.stdout.write(
+            f"  {generados:>8}/{total:<8} {100 * generados / total:5.1f}%  {generados / segundos:8.0f} boletines/s"
+        )
@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import versiones
+from core.forms import ValidadorEstudiante
+from core.models import Estudiante
+
+
+# Campos que se actualizan cuando el documento ya existe
+CAMPOS_ACTUALIZABLES = ['nombre', 'apellido', 'email', 'fecha_nacimiento', 'activo']
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa estudiantes desde un archivo CSV o JSONL (o '-' para stdin). "
+        "Los documentos existentes se actualizan (upsert)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo a importar, o '-' para leer de stdin.")
+        parser.add_argument('--formato', choices=['csv', 'jsonl'],
+                            help="Formato de entrada; por defecto se deduce de la extensión (csv si no se reconoce).")
+        parser.add_argument('--delimitador', default=',', help="Separador de columnas del CSV.")
+        parser.add_argument('--lote', type=int, default=5000,
+                            help="Filas por transacción/bulk_create.")
+        parser.add_argument('--max-errores', type=int, default=20,
+                            help="Cantidad de errores de validación que se muestran en detalle.")
+        parser.add_argument('--validar', action='store_true',
+                            help="Solo valida el archivo, sin escribir en la base.")
+
+    def handle(self, *args, **options):
+        archivo = options['archivo']
+        formato = options['formato'] or ('jsonl' if archivo.endswith(('.jsonl', '.ndjson')) else 'csv')
+        lote_tam = max(1, options['lote'])
+        validador = ValidadorEstudiante()
+
+        self.procesadas = self.escritas = self.errores = 0
+        self.max_errores = options['max_errores']
+        self.inicio = time.perf_counter()
+        # documento -> Estudiante: una fila repetida dentro del lote pisa a la anterior,
+        # porque el upsert no admite dos filas con la misma clave en un mismo INSERT
+        lote = {}
+
+        with self._abrir(archivo) as entrada:
+            for numero, fila in self._filas(entrada, formato, options['delimitador']):
+                self.procesadas += 1
+                datos, errores = validador.limpiar(fila)
+                if errores:
+                    self._error(numero, errores)
+                    continue
+                lote[datos['documento']] = Estudiante(**datos)
+                if len(lote) >= lote_tam:
+                    self._escribir(lote, options['validar'])
+                    lote = {}
+            if lote:
+                self._escribir(lote, options['validar'])
+
+        accion = "validadas" if options['validar'] else "importadas"
+        transcurrido = time.perf_counter() - self.inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.escritas} filas {accion}, {self.errores} con errores "
+            f"(de {self.procesadas} leídas) en {transcurrido:.1f}s."
+        ))
+
+    def _abrir(self, archivo):
+        """Abre el archivo (o stdin) como texto UTF-8, tolerando el BOM de Excel"""
+        if archivo == '-':
+            return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        try:
+            return open(archivo, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(f"No se pudo abrir '{archivo}': {exc}")
+
+    def _filas(self, entrada, formato, delimitador):
+        """
+        Recorre la entrada fila por fila sin cargarla completa en memoria.
+
+        Yields:
+            tuple: (número de línea, dict campo -> valor)
+        """
+        if formato == 'jsonl':
+            for numero, linea in enumerate(entrada, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as exc:
+                    self.procesadas += 1
+                    self._error(numero, {'json': [str(exc)]})
+                    continue
+                if not isinstance(fila, dict):
+                    self.procesadas += 1
+                    self._error(numero, {'json': ["Se esperaba un objeto"]})
+                    continue
+                yield numero, fila
+        else:
+            lector = csv.DictReader(entrada, delimiter=delimitador)
+            faltantes = {'nombre', 'apellido', 'documento'} - set(lector.fieldnames or ())
+            if faltantes:
+                raise CommandError(f"Faltan columnas obligatorias: {', '.join(sorted(faltantes))}")
+            for fila in lector:
+                # La línea 1 es el encabezado
+                yield lector.line_num, fila
+
+    def _escribir(self, lote, solo_validar):
+        """Inserta o actualiza un lote en una única transacción"""
+        if not solo_validar:
+            with transaction.atomic():
+                Estudiante.objects.bulk_create(
+                    lote.values(),
+                    update_conflicts=True,
+                    unique_fields=['documento'],
+                    update_fields=CAMPOS_ACTUALIZABLES,
+                )
+                # bulk_create no dispara señales
+                versiones.registrar_cambio('estudiante')
+        self.escritas += len(lote)
+        self._progreso()
+
+    def _progreso(self):
+        """Muestra filas procesadas y velocidad acumulada"""
+        transcurrido = time.perf_counter() - self.inicio
+        velocidad = self.procesadas / transcurrido if transcurrido else 0
+        self.stdout.write(
+            f"  {self.procesadas} filas leídas, {self.escritas} escritas, "
+            f"{self.errores} con errores - {velocidad:,.0f} filas/s ({transcurrido:.1f}s)"
+        )
+
+    def _error(self, numero, errores):
+        """Cuenta un error de validación y muestra el detalle de los primeros"""
+        self.errores += 1
+        if self.errores <= self.max_errores:
+            detalle = '; '.join(f"{campo}: {' '.join(mensajes)}" for campo, mensajes in errores.items())
+            self.stderr.write(f"  Línea {numero}: {detalle}")
+        elif self.errores == self.max_errores + 1:
+            self.stderr.write("  (se omiten los errores siguientes)")
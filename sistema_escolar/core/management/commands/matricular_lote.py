@@ -0,0 +1,72 @@
+import sys
+
+from django import forms
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import matriculas
+from core.forms import MatriculaLoteForm
+
+
+class Command(BaseCommand):
+    help = (
+        "Matricula estudiantes en cursos en una sola transacción. "
+        "Ej: --curso C001 --archivo alumnos.txt, o --estudiante 12345 --cursos C001 C002."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', help="Código del curso donde se matriculan los estudiantes.")
+        parser.add_argument('--cursos', nargs='+', default=[], help="Códigos de varios cursos.")
+        parser.add_argument('--estudiante', help="Documento de un estudiante.")
+        parser.add_argument('--documentos', nargs='+', default=[], help="Documentos de varios estudiantes.")
+        parser.add_argument('--archivo',
+                            help="Archivo con documentos (uno por línea, o separados por coma/espacio); '-' para stdin.")
+        parser.add_argument('--nota', help="Nota inicial de las matrículas nuevas.")
+
+    def handle(self, *args, **options):
+        codigos = list(dict.fromkeys(([options['curso']] if options['curso'] else []) + options['cursos']))
+        documentos = ([options['estudiante']] if options['estudiante'] else []) + options['documentos']
+        if options['archivo']:
+            documentos += matriculas.separar_valores(self._leer(options['archivo']))
+        if not codigos or not documentos:
+            raise CommandError("Indique al menos un curso (--curso/--cursos) y un estudiante (--estudiante/--documentos/--archivo).")
+
+        # Misma validación que el formulario y el endpoint JSON (rango 0-10, dos decimales)
+        try:
+            nota = MatriculaLoteForm.base_fields['nota'].clean(options['nota'])
+        except forms.ValidationError as exc:
+            raise CommandError(f"Nota inválida ({options['nota']}): {' '.join(exc.messages)}")
+
+        ids = matriculas.cursos_por_codigo(codigos)
+        faltantes = [codigo for codigo in codigos if codigo not in ids]
+        if faltantes:
+            raise CommandError(f"Cursos inexistentes: {', '.join(faltantes)}")
+
+        # De a MAX_MATRICULAS documentos (límite de parámetros por consulta), todo en una transacción
+        documentos = list(dict.fromkeys(documentos))
+        resultados = []
+        with transaction.atomic():
+            for inicio in range(0, len(documentos), matriculas.MAX_MATRICULAS):
+                resultados += matriculas.matricular_documentos(
+                    documentos[inicio:inicio + matriculas.MAX_MATRICULAS], [ids[c] for c in codigos], nota
+                )
+        codigo_de = {id_: codigo for codigo, id_ in ids.items()}
+        for fila in resultados:
+            if fila['resultado'] != matriculas.CREADA:
+                self.stdout.write(f"  {fila['documento']} -> {codigo_de[fila['curso']]}: {fila['resultado']}")
+
+        totales = matriculas.resumen(resultados)
+        self.stdout.write(self.style.SUCCESS(
+            f"{totales[matriculas.CREADA]} matrículas creadas, "
+            f"{totales[matriculas.YA_MATRICULADO]} ya existentes, "
+            f"{totales[matriculas.NO_ENCONTRADO]} no encontradas."
+        ))
+
+    def _leer(self, archivo):
+        if archivo == '-':
+            return sys.stdin.read()
+        try:
+            with open(archivo, encoding='utf-8-sig') as entrada:
+                return entrada.read()
+        except OSError as exc:
+            raise CommandError(f"No se pudo abrir '{archivo}': {exc}")
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core import reportes
+from core.workers import ejecutar_reporte, inicializar
+from core.models import ReporteJob
+
+
+class Command(BaseCommand):
+    help = "Procesa los reportes encolados por las vistas usando un pool de procesos local."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Cantidad de procesos que renderizan reportes en paralelo.")
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help="Segundos de espera entre consultas de trabajos pendientes.")
+        parser.add_argument('--una-vez', action='store_true',
+                            help="Procesa los trabajos pendientes y termina, en lugar de quedar escuchando.")
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        # Los hijos abren sus propias conexiones; no deben heredar la del padre
+        connections.close_all()
+        contexto = multiprocessing.get_context('spawn')
+        en_curso = {}
+
+        self.stdout.write(f"Procesando reportes con {workers} worker(s)...")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto,
+                                 initializer=inicializar) as pool:
+            try:
+                while True:
+                    reclamados = reportes.reclamar(workers - len(en_curso))
+                    for job_id in reclamados:
+                        en_curso[pool.submit(ejecutar_reporte, job_id)] = job_id
+
+                    if not en_curso:
+                        if options['una_vez']:
+                            break
+                        time.sleep(options['intervalo'])
+                        continue
+
+                    terminados, _ = wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                    for futuro in terminados:
+                        self._informar(en_curso.pop(futuro), futuro)
+            except KeyboardInterrupt:
+                self.stdout.write("Interrumpido; esperando trabajos en curso...")
+                for futuro in list(en_curso):
+                    self._informar(en_curso.pop(futuro), futuro)
+
+    def _informar(self, job_id, futuro):
+        """Registra el resultado de un trabajo; si el proceso hijo murió, lo marca con error"""
+        try:
+            estado = futuro.result()
+        except Exception as exc:
+            ReporteJob.objects.filter(pk=job_id).update(
+                estado=ReporteJob.ERROR, error=f"{type(exc).__name__}: {exc}", terminado=timezone.now()
+            )
+            estado = ReporteJob.ERROR
+        estilo = self.style.SUCCESS if estado == ReporteJob.LISTO else self.style.ERROR
+        self.stdout.write(estilo(f"Reporte {job_id}: {estado}"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import agregados
+from core.models import Curso, Estudiante
+
+
+class Command(BaseCommand):
+    help = "Reconstruye (o verifica con --verificar) los totales de matrículas y notas de cursos y estudiantes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true',
+                            help="Solo compara los totales guardados con core_matricula y lista las diferencias.")
+
+    def handle(self, *args, **options):
+        if options['verificar']:
+            return self._verificar()
+        with transaction.atomic():
+            cursos = agregados.recalcular_cursos()
+            estudiantes = agregados.recalcular_estudiantes()
+        self.stdout.write(self.style.SUCCESS(
+            f"Totales recalculados: {cursos} cursos, {estudiantes} estudiantes."
+        ))
+
+    def _verificar(self):
+        errores = 0
+        for model, campo_fk in ((Curso, 'curso'), (Estudiante, 'estudiante')):
+            for fila, campos in agregados.inconsistentes(model, campo_fk):
+                errores += 1
+                detalle = ', '.join(
+                    f"{campo}={getattr(fila, campo)} (esperado {getattr(fila, f'calculado_{campo}')})"
+                    for campo in campos
+                )
+                self.stdout.write(f"  {model._meta.verbose_name} {fila.pk} ({fila}): {detalle}")
+        if errores:
+            raise CommandError(f"{errores} fila(s) con totales desactualizados; ejecute el comando sin --verificar.")
+        self.stdout.write(self.style.SUCCESS("Todos los totales coinciden con las matrículas."))
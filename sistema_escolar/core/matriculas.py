@@ -0,0 +1,174 @@
+"""
+Matrícula masiva de estudiantes en cursos.
+
+`matricular()` inscribe varios estudiantes en un curso, un estudiante en
+varios cursos (o cualquier combinación) con una cantidad fija de consultas,
+sin importar cuántas matrículas se pidan:
+
+    1. Ids válidos de estudiantes y cursos (una consulta por modelo)
+    2. Pares que ya estaban matriculados (una consulta)
+    3. `bulk_create(ignore_conflicts=True)` de los pares nuevos, dentro de
+       una transacción; la restricción única (estudiante, curso) descarta
+       los duplicados que otra petición haya insertado en paralelo.
+    4. Totales de los cursos y estudiantes afectados (core.agregados) y
+       versiones de los grupos modificados (core.versiones)
+
+Cada par pedido recibe un resultado: creada, ya_matriculado o no_encontrado.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Curso, Estudiante, Matricula
+from . import agregados, busqueda, versiones
+
+
+CREADA = 'creada'
+YA_MATRICULADO = 'ya_matriculado'
+NO_ENCONTRADO = 'no_encontrado'
+
+# Máximo de pares (estudiante, curso) por pedido desde la web
+MAX_MATRICULAS = 10000
+
+# Máximo de sugerencias que devuelve el buscador de alumnos
+MAX_SUGERENCIAS = 20
+
+
+def separar_valores(texto):
+    """
+    Separa un texto con valores por línea, coma, punto y coma o espacio.
+
+    Returns:
+        list: Valores sin repetir, en el orden en que aparecen
+    """
+    return list(dict.fromkeys(v for v in re.split(r'[\s,;]+', texto) if v))
+
+
+def estudiantes_por_documento(documentos):
+    """Retorna un dict documento -> id de los estudiantes existentes"""
+    return dict(Estudiante.objects.filter(documento__in=documentos).order_by().values_list('documento', 'id'))
+
+
+def cursos_por_codigo(codigos):
+    """Retorna un dict código -> id de los cursos existentes"""
+    return dict(Curso.objects.filter(codigo__in=codigos).order_by().values_list('codigo', 'id'))
+
+
+def no_matriculados(curso):
+    """
+    Estudiantes que todavía no están matriculados en `curso`.
+
+    Usa NOT EXISTS (anti-join por el índice único estudiante+curso) en
+    lugar de traer la lista de ids matriculados.
+    """
+    return Estudiante.objects.filter(
+        ~Exists(Matricula.objects.filter(curso=curso, estudiante=OuterRef('pk')))
+    )
+
+
+def sugerir_estudiantes(curso, q='', limite=MAX_SUGERENCIAS):
+    """
+    Hasta `limite` estudiantes no matriculados en `curso` que coinciden con `q`.
+
+    La búsqueda es por prefijo de palabra sobre nombre, apellido y documento
+    con el índice de texto (ver core.busqueda), así el costo depende del
+    límite y no del tamaño de la tabla.
+
+    Returns:
+        list: Dicts {id, texto} ordenados por apellido y nombre
+    """
+    queryset = no_matriculados(curso)
+    if q.strip():
+        queryset = busqueda.buscar(queryset, q)
+    filas = queryset.values_list('id', 'apellido', 'nombre', 'documento')[:max(1, min(limite, MAX_SUGERENCIAS))]
+    return [
+        {'id': id_, 'texto': f"{apellido}, {nombre} ({documento})"}
+        for id_, apellido, nombre, documento in filas
+    ]
+
+
+def matricular(estudiante_ids, curso_ids, nota=None):
+    """
+    Matricula cada estudiante de `estudiante_ids` en cada curso de `curso_ids`.
+
+    Args:
+        estudiante_ids (list): Ids de estudiantes
+        curso_ids (list): Ids de cursos
+        nota (Decimal): Nota inicial de las matrículas nuevas (opcional)
+
+    Returns:
+        list: Un dict {estudiante, curso, resultado} por cada par pedido
+    """
+    estudiante_ids = list(dict.fromkeys(estudiante_ids))
+    curso_ids = list(dict.fromkeys(curso_ids))
+    pares = [(e, c) for c in curso_ids for e in estudiante_ids]
+    if not pares:
+        return []
+
+    # order_by() vacío: el orden del modelo de Matricula agrega joins innecesarios
+    estudiantes_validos = set(Estudiante.objects.filter(pk__in=estudiante_ids).order_by().values_list('id', flat=True))
+    cursos_validos = set(Curso.objects.filter(pk__in=curso_ids).order_by().values_list('id', flat=True))
+    existentes = set(
+        Matricula.objects
+        .filter(estudiante_id__in=estudiantes_validos, curso_id__in=cursos_validos)
+        .order_by()
+        .values_list('estudiante_id', 'curso_id')
+    )
+
+    resultados, nuevas = [], []
+    for estudiante_id, curso_id in pares:
+        if estudiante_id not in estudiantes_validos or curso_id not in cursos_validos:
+            resultado = NO_ENCONTRADO
+        elif (estudiante_id, curso_id) in existentes:
+            resultado = YA_MATRICULADO
+        else:
+            resultado = CREADA
+            nuevas.append(Matricula(estudiante_id=estudiante_id, curso_id=curso_id, nota=nota))
+        resultados.append({'estudiante': estudiante_id, 'curso': curso_id, 'resultado': resultado})
+
+    if nuevas:
+        with transaction.atomic():
+            Matricula.objects.bulk_create(nuevas, ignore_conflicts=True)
+            # bulk_create no dispara señales: totales de Curso/Estudiante y versión a mano
+            versiones.registrar_cambio('matricula')
+            agregados.recalcular(
+                {m.curso_id for m in nuevas},
+                {m.estudiante_id for m in nuevas},
+            )
+    return resultados
+
+
+def matricular_documentos(documentos, curso_ids, nota=None):
+    """
+    Igual que `matricular()` pero identificando a los estudiantes por documento.
+
+    Los documentos que no existen se informan como no_encontrado.
+
+    Returns:
+        list: Un dict {documento, estudiante, curso, resultado} por cada par pedido
+    """
+    documentos = list(dict.fromkeys(documentos))
+    ids = estudiantes_por_documento(documentos)
+    por_par = {
+        (fila['estudiante'], fila['curso']): fila
+        for fila in matricular(ids.values(), curso_ids, nota)
+    }
+    resultados = []
+    for curso_id in dict.fromkeys(curso_ids):
+        for documento in documentos:
+            estudiante_id = ids.get(documento)
+            if estudiante_id is None:
+                resultados.append({'documento': documento, 'estudiante': None,
+                                   'curso': curso_id, 'resultado': NO_ENCONTRADO})
+            else:
+                resultados.append({'documento': documento, **por_par[(estudiante_id, curso_id)]})
+    return resultados
+
+
+def resumen(resultados):
+    """Cantidad de resultados por tipo: {'creada': n, 'ya_matriculado': n, 'no_encontrado': n}"""
+    totales = dict.fromkeys((CREADA, YA_MATRICULADO, NO_ENCONTRADO), 0)
+    for fila in resultados:
+        totales[fila['resultado']] += 1
+    return totales
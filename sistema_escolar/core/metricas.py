@@ -0,0 +1,239 @@
+"""
+Métricas por pedido: cantidad y tiempo de SQL, tiempo de plantillas y latencia.
+
+MetricasMiddleware abre un registro (`MetricasPedido`) al empezar cada
+pedido y al terminar:
+
+    1. Agrega el encabezado Server-Timing, que el navegador muestra en la
+       pestaña Red de las herramientas de desarrollo:
+
+           Server-Timing: sql;dur=4.2;desc="7 consultas", tpl;dur=11.0, total;dur=18.9
+
+    2. Acumula los valores por ruta en `REGISTRO`, que se consulta en
+       /metricas/ (JSON, solo staff o INTERNAL_IPS), y por nombre de URL en
+       core.prometheus (/metrics, formato de Prometheus).
+
+Las consultas se miden con un execute_wrapper que se instala en cada conexión
+nueva (señal connection_created). El registro del pedido vive en una
+ContextVar, así también se cuentan las consultas de las vistas async que
+corren en el hilo de la base (sync_to_async copia el contexto).
+
+El tiempo de plantillas cubre las TemplateResponse (vistas genéricas y las
+que devuelven TemplateResponse): se mide entre process_template_response y
+el fin del render. En respuestas streaming (CSV, NDJSON) la latencia llega
+hasta el primer byte; las consultas del resto del cuerpo no se cuentan.
+
+Se desactiva con METRICAS=False en .env.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from . import prometheus
+
+
+# Latencias recientes que se guardan por ruta para calcular percentiles
+MUESTRAS_POR_RUTA = 1000
+
+_pedido_actual = contextvars.ContextVar('metricas_pedido', default=None)
+
+
+class MetricasPedido:
+    """
+    Mediciones de un pedido.
+
+    Atributos:
+        consultas (int): Consultas SQL ejecutadas
+        tiempo_sql (float): Segundos en la base
+        tiempo_plantillas (float): Segundos renderizando plantillas
+        inicio (float): perf_counter() al empezar el pedido
+    """
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_plantillas = 0.0
+        self.inicio = time.perf_counter()
+        self._inicio_render = None
+
+    def server_timing(self, total):
+        """Valor del encabezado Server-Timing (duraciones en milisegundos)"""
+        return (
+            f'sql;dur={self.tiempo_sql * 1000:.1f};desc="{self.consultas} consultas", '
+            f'tpl;dur={self.tiempo_plantillas * 1000:.1f}, total;dur={total * 1000:.1f}'
+        )
+
+
+def pedido_actual():
+    """Métricas del pedido en curso (None fuera de un pedido)"""
+    return _pedido_actual.get()
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    metricas = _pedido_actual.get()
+    if metricas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metricas.consultas += 1
+        metricas.tiempo_sql += time.perf_counter() - inicio
+
+
+def instalar_medicion(sender, connection, **kwargs):
+    """Receptor de connection_created: mide las consultas de la conexión"""
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+connection_created.connect(instalar_medicion)
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+
+class RegistroMetricas:
+    """
+    Totales por ruta de este proceso (con varios workers, cada uno tiene el suyo).
+
+    Por ruta guarda contadores acumulados y las últimas MUESTRAS_POR_RUTA
+    latencias para los percentiles.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rutas = {}
+
+    def registrar(self, ruta, status, metricas, total):
+        with self._lock:
+            datos = self._rutas.get(ruta)
+            if datos is None:
+                datos = self._rutas[ruta] = {
+                    'pedidos': 0, 'errores': 0, 'consultas': 0, 'consultas_max': 0,
+                    'tiempo_total': 0.0, 'tiempo_sql': 0.0, 'tiempo_plantillas': 0.0,
+                    'latencias': deque(maxlen=MUESTRAS_POR_RUTA),
+                }
+            datos['pedidos'] += 1
+            datos['errores'] += status >= 500
+            datos['consultas'] += metricas.consultas
+            datos['consultas_max'] = max(datos['consultas_max'], metricas.consultas)
+            datos['tiempo_total'] += total
+            datos['tiempo_sql'] += metricas.tiempo_sql
+            datos['tiempo_plantillas'] += metricas.tiempo_plantillas
+            datos['latencias'].append(total)
+
+    def resumen(self):
+        """
+        Métricas por ruta, de la que más tiempo total consumió a la que menos.
+
+        Returns:
+            list: Dicts con ruta, pedidos, errores, consultas (promedio y
+            máximo) y tiempos en milisegundos (promedios y p50/p95/p99)
+        """
+        with self._lock:
+            copia = {ruta: {**datos, 'latencias': sorted(datos['latencias'])} for ruta, datos in self._rutas.items()}
+        filas = []
+        for ruta, datos in sorted(copia.items(), key=lambda item: -item[1]['tiempo_total']):
+            pedidos = datos['pedidos']
+            latencias = datos['latencias']
+            filas.append({
+                'ruta': ruta,
+                'pedidos': pedidos,
+                'errores': datos['errores'],
+                'consultas_promedio': round(datos['consultas'] / pedidos, 2),
+                'consultas_max': datos['consultas_max'],
+                'total_ms_promedio': round(datos['tiempo_total'] * 1000 / pedidos, 2),
+                'sql_ms_promedio': round(datos['tiempo_sql'] * 1000 / pedidos, 2),
+                'plantillas_ms_promedio': round(datos['tiempo_plantillas'] * 1000 / pedidos, 2),
+                'p50_ms': round(_percentil(latencias, 50) * 1000, 2),
+                'p95_ms': round(_percentil(latencias, 95) * 1000, 2),
+                'p99_ms': round(_percentil(latencias, 99) * 1000, 2),
+            })
+        return filas
+
+    def reiniciar(self):
+        with self._lock:
+            self._rutas.clear()
+
+
+REGISTRO = RegistroMetricas()
+
+
+def _ruta(request):
+    """Patrón de la URL (ej: 'estudiantes/<int:pk>/') para no abrir una entrada por id"""
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return '(sin ruta)'
+    return resolver_match.route or resolver_match.view_name
+
+
+class MetricasMiddleware:
+    """
+    Mide cada pedido y agrega el encabezado Server-Timing.
+
+    Funciona con WSGI y ASGI (vistas sync y async) sin cambiar de hilo.
+    Va primero en MIDDLEWARE para que la latencia incluya al resto.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activo = getattr(settings, 'METRICAS', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.activo:
+            return self.get_response(request)
+        metricas = MetricasPedido()
+        token = _pedido_actual.set(metricas)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pedido_actual.reset(token)
+        return self._terminar(request, response, metricas)
+
+    async def __acall__(self, request):
+        if not self.activo:
+            return await self.get_response(request)
+        metricas = MetricasPedido()
+        token = _pedido_actual.set(metricas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pedido_actual.reset(token)
+        return self._terminar(request, response, metricas)
+
+    def process_template_response(self, request, response):
+        metricas = _pedido_actual.get()
+        if metricas is not None:
+            metricas._inicio_render = time.perf_counter()
+            response.add_post_render_callback(lambda _: self._fin_render(metricas))
+        return response
+
+    @staticmethod
+    def _fin_render(metricas):
+        metricas.tiempo_plantillas += time.perf_counter() - metricas._inicio_render
+
+    def _terminar(self, request, response, metricas):
+        total = time.perf_counter() - metricas.inicio
+        response['Server-Timing'] = metricas.server_timing(total)
+        REGISTRO.registrar(_ruta(request), response.status_code, metricas, total)
+        resolver_match = getattr(request, 'resolver_match', None)
+        prometheus.registrar_pedido(
+            resolver_match.url_name or '(sin nombre)' if resolver_match else '(sin ruta)',
+            request.method, response.status_code, total, metricas.consultas, metricas.tiempo_sql,
+        )
+        return response
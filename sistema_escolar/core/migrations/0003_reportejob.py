@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_profesor_apellido'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='curso',
+            options={'ordering': ['codigo'], 'verbose_name': 'Curso', 'verbose_name_plural': 'Cursos'},
+        ),
+        migrations.AlterModelOptions(
+            name='estudiante',
+            options={'ordering': ['apellido', 'nombre'], 'verbose_name': 'Estudiante', 'verbose_name_plural': 'Estudiantes'},
+        ),
+        migrations.AlterModelOptions(
+            name='matricula',
+            options={'ordering': ['curso', 'estudiante'], 'verbose_name': 'Matricula', 'verbose_name_plural': 'Matriculas'},
+        ),
+        migrations.AlterModelOptions(
+            name='profesor',
+            options={'ordering': ['apellido', 'nombre'], 'verbose_name': 'Profesor', 'verbose_name_plural': 'Profesores'},
+        ),
+        migrations.CreateModel(
+            name='ReporteJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vista', models.CharField(max_length=200)),
+                ('formato', models.CharField(default='pdf', max_length=10)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('clave', models.CharField(db_index=True, max_length=64)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('listo', 'Listo'), ('error', 'Error')], db_index=True, default='pendiente', max_length=20)),
+                ('archivo', models.CharField(blank=True, max_length=255)),
+                ('nombre_descarga', models.CharField(max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('terminado', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reporte',
+                'verbose_name_plural': 'Reportes',
+                'ordering': ['-creado'],
+            },
+        ),
+    ]
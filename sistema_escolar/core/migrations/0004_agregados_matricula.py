@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+def _sql_totales(tabla, columna):
+    """UPDATE que carga los totales de matrículas de las filas existentes"""
+    sub = f"FROM core_matricula m WHERE m.{columna} = {tabla}.id"
+    return f"""UPDATE {tabla} SET
+        cantidad_matriculas = (SELECT COUNT(*) {sub}),
+        cantidad_calificadas = (SELECT COUNT(m.nota) {sub}),
+        promedio_nota = (SELECT ROUND(AVG(m.nota), 2) {sub}),
+        nota_minima = (SELECT MIN(m.nota) {sub}),
+        nota_maxima = (SELECT MAX(m.nota) {sub})"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_reportejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='cantidad_calificadas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='cantidad_matriculas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='nota_maxima',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='nota_minima',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='promedio_nota',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='cantidad_calificadas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='cantidad_matriculas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='nota_maxima',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='nota_minima',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='estudiante',
+            name='promedio_nota',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['-cantidad_matriculas', 'codigo', 'id'], name='curso_inscriptos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estudiante',
+            index=models.Index(fields=['-cantidad_matriculas', 'apellido', 'nombre', 'id'], name='estudiante_matriculas_idx'),
+        ),
+        migrations.RunSQL(_sql_totales('core_curso', 'curso_id'), migrations.RunSQL.noop),
+        migrations.RunSQL(_sql_totales('core_estudiante', 'estudiante_id'), migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+GRUPOS = ('estudiante', 'curso', 'profesor', 'matricula')
+
+
+def crear_versiones(apps, schema_editor):
+    """Una fila por grupo, así registrar un cambio es un único UPDATE"""
+    VersionTabla = apps.get_model('core', 'VersionTabla')
+    VersionTabla.objects.bulk_create([VersionTabla(grupo=grupo) for grupo in GRUPOS], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_agregados_matricula'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionTabla',
+            fields=[
+                ('grupo', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('modificado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Versión de tabla',
+                'verbose_name_plural': 'Versiones de tablas',
+            },
+        ),
+        migrations.RunPython(crear_versiones, migrations.RunPython.noop),
+    ]
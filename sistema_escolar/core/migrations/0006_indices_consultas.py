@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_version_tabla'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='estudiante',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='estudiante_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estudiante',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['apellido', 'nombre', 'id'], name='estudiante_activos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['curso', 'nota'], name='matricula_curso_nota_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['estudiante', 'curso', 'nota'], name='matricula_estudiante_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profesor',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='profesor_orden_idx'),
+        ),
+    ]
@@ -1,4 +1,41 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+
+from . import busqueda
+
+
+class BusquedaQuerySet(models.QuerySet):
+    """QuerySet con búsqueda de texto indexada (ver core/busqueda.py)"""
+
+    def buscar(self, q):
+        """Filtra por nombre/apellido/documento o código según el modelo, sin acentos ni mayúsculas"""
+        return busqueda.buscar(self, q)
+
+
+class AgregadosMatricula(models.Model):
+    """
+    Totales de matrículas y notas guardados en la fila (modelo abstracto).
+
+    Los mantiene `core.agregados` cada vez que se guarda o borra una
+    Matricula, en la misma transacción, así los listados y detalles los
+    muestran (y ordenan) sin COUNT/AVG sobre core_matricula.
+
+    Atributos:
+        cantidad_matriculas (int): Matrículas registradas
+        cantidad_calificadas (int): Matrículas con nota cargada
+        promedio_nota (decimal): Promedio de las notas cargadas (o nulo)
+        nota_minima (decimal): Nota más baja (o nula)
+        nota_maxima (decimal): Nota más alta (o nula)
+    """
+    cantidad_matriculas = models.PositiveIntegerField(default=0, editable=False)
+    cantidad_calificadas = models.PositiveIntegerField(default=0, editable=False)
+    promedio_nota = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, editable=False)
+    nota_minima = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, editable=False)
+    nota_maxima = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
 
 class Profesor(models.Model):
     """
@@ -21,9 +58,13 @@ class Profesor(models.Model):
         verbose_name = "Profesor"
         verbose_name_plural = "Profesores"
         ordering = ['apellido', 'nombre']
+        indexes = [
+            # Listados y selects ordenados (Meta.ordering, con id para desempatar)
+            models.Index(fields=['apellido', 'nombre', 'id'], name='profesor_orden_idx'),
+        ]
 
 
-class Curso(models.Model):
+class Curso(AgregadosMatricula):
     """
     Modelo Curso - Representa un curso académico.
     
@@ -32,12 +73,15 @@ class Curso(models.Model):
         nombre (str): Nombre del curso (máx 200 caracteres)
         descripcion (str): Descripción opcional del contenido del curso
         profesor (FK): Profesor asignado al curso (puede ser nulo)
+        (más los totales de AgregadosMatricula)
     """
     codigo = models.CharField(max_length=20, unique=True)
     nombre = models.CharField(max_length=200)
     descripcion = models.TextField(blank=True)
     profesor = models.ForeignKey(Profesor, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = BusquedaQuerySet.as_manager()
+
     def __str__(self):
         """Retorna la representación en string: 'CODIGO - Nombre'"""
         return f"{self.codigo} - {self.nombre}"
@@ -46,9 +90,13 @@ class Curso(models.Model):
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
         ordering = ['codigo']
+        indexes = [
+            # Listado ordenado por inscriptos (keyset: ver ORDENES en CursoListView)
+            models.Index(fields=['-cantidad_matriculas', 'codigo', 'id'], name='curso_inscriptos_idx'),
+        ]
 
 
-class Estudiante(models.Model):
+class Estudiante(AgregadosMatricula):
     """
     Modelo Estudiante - Representa un alumno del sistema.
     
@@ -59,6 +107,7 @@ class Estudiante(models.Model):
         email (str): Email del estudiante (opcional)
         fecha_nacimiento (date): Fecha de nacimiento (opcional)
         activo (bool): Indica si el estudiante está activo en el sistema
+        (más los totales de AgregadosMatricula)
     """
     nombre = models.CharField(max_length=200)
     apellido = models.CharField(max_length=200)
@@ -67,6 +116,8 @@ class Estudiante(models.Model):
     fecha_nacimiento = models.DateField(null=True, blank=True)
     activo = models.BooleanField(default=True)
 
+    objects = BusquedaQuerySet.as_manager()
+
     def __str__(self):
         """Retorna la representación en string: 'Apellido, Nombre'"""
         return f"{self.apellido}, {self.nombre}"
@@ -75,6 +126,15 @@ class Estudiante(models.Model):
         verbose_name = "Estudiante"
         verbose_name_plural = "Estudiantes"
         ordering = ['apellido', 'nombre']
+        indexes = [
+            models.Index(fields=['-cantidad_matriculas', 'apellido', 'nombre', 'id'], name='estudiante_matriculas_idx'),
+            # Listado por defecto (keyset por apellido, nombre, id: ver KeysetPaginationMixin)
+            models.Index(fields=['apellido', 'nombre', 'id'], name='estudiante_orden_idx'),
+            # Listado de solo activos (?activos=1): índice parcial, más chico que la tabla
+            models.Index(
+                fields=['apellido', 'nombre', 'id'], condition=models.Q(activo=True), name='estudiante_activos_idx',
+            ),
+        ]
 
 
 class Matricula(models.Model):
@@ -100,7 +160,106 @@ class Matricula(models.Model):
         verbose_name = "Matricula"
         verbose_name_plural = "Matriculas"
         ordering = ['curso', 'estudiante']
+        indexes = [
+            # Notas de un curso (estadísticas, totales del curso): se leen del índice sin ir a la tabla
+            models.Index(fields=['curso', 'nota'], name='matricula_curso_nota_idx'),
+            # Matrículas de un estudiante con su nota (detalle, totales del estudiante): el índice
+            # único (estudiante, curso) más la nota, así la consulta no toca la tabla
+            models.Index(fields=['estudiante', 'curso', 'nota'], name='matricula_estudiante_idx'),
+        ]
 
     def __str__(self):
         """Retorna la representación en string: 'Estudiante -> Curso'"""
         return f"{self.estudiante} -> {self.curso}"
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda dentro de una transacción para que la señal post_save
+        actualice los totales del curso y del estudiante (core.signals)
+        junto con la matrícula, o no se aplique ninguno de los dos.
+        """
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class ReporteJob(models.Model):
+    """
+    Modelo ReporteJob - Trabajo de generación de reportes en segundo plano.
+
+    Las vistas de listado encolan un ReporteJob en lugar de generar el PDF
+    dentro de la petición; el comando `procesar_reportes` los toma y los
+    renderiza en un pool de procesos.
+
+    Atributos:
+        vista (str): Ruta de la vista de listado que define el reporte
+        formato (str): Formato del archivo (ej: pdf)
+        parametros (dict): Parámetros GET del listado (ej: búsqueda 'q')
+        clave (str): Hash de vista + formato + parámetros; identifica el archivo en caché
+        estado (str): pendiente, procesando, listo o error
+        archivo (str): Nombre del archivo generado dentro de REPORTES_DIR
+        nombre_descarga (str): Nombre sugerido al descargar
+        error (str): Detalle del error si la generación falló
+        usuario (FK): Usuario que pidió el reporte (opcional)
+        creado (datetime): Fecha de creación (auto_now_add)
+        iniciado (datetime): Fecha en que un worker lo reclamó
+        terminado (datetime): Fecha en que terminó la generación
+    """
+    PENDIENTE = 'pendiente'
+    PROCESANDO = 'procesando'
+    LISTO = 'listo'
+    ERROR = 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESANDO, 'Procesando'),
+        (LISTO, 'Listo'),
+        (ERROR, 'Error'),
+    ]
+
+    vista = models.CharField(max_length=200)
+    formato = models.CharField(max_length=10, default='pdf')
+    parametros = models.JSONField(default=dict, blank=True)
+    clave = models.CharField(max_length=64, db_index=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE, db_index=True)
+    archivo = models.CharField(max_length=255, blank=True)
+    nombre_descarga = models.CharField(max_length=100)
+    error = models.TextField(blank=True)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    terminado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Reporte"
+        verbose_name_plural = "Reportes"
+        ordering = ['-creado']
+
+    def __str__(self):
+        """Retorna la representación en string: 'nombre_descarga (estado)'"""
+        return f"{self.nombre_descarga} ({self.estado})"
+
+
+class VersionTabla(models.Model):
+    """
+    Contador de cambios por grupo de datos (ver core/versiones.py).
+
+    Cada vez que se guarda o borra un Estudiante, Curso, Profesor o Matricula
+    (o se modifican en masa) se incrementa la versión de su grupo en la misma
+    transacción. Las vistas arman el ETag y el Last-Modified con estas filas
+    y responden 304 sin consultar los datos si nada cambió.
+
+    Atributos:
+        grupo (str): 'estudiante', 'curso', 'profesor' o 'matricula'
+        version (int): Cantidad de cambios registrados
+        modificado (datetime): Fecha del último cambio
+    """
+    grupo = models.CharField(max_length=20, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modificado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Versión de tabla"
+        verbose_name_plural = "Versiones de tablas"
+
+    def __str__(self):
+        """Retorna la representación en string: 'grupo v<version>'"""
+        return f"{self.grupo} v{self.version}"
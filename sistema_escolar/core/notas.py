@@ -0,0 +1,172 @@
+"""
+Carga masiva de notas de un curso (planilla de calificaciones).
+
+La planilla muestra todas las matrículas del curso en una grilla editable y
+se guarda en un solo envío:
+
+    1. Se validan todas las filas antes de escribir; si alguna es inválida
+       no se guarda ninguna.
+    2. Solo se escriben las filas que cambiaron, con un único
+       `bulk_update(['nota'])` dentro de una transacción.
+    3. Concurrencia optimista: cada fila de la grilla viaja con la nota que
+       se mostró al abrir la planilla. Si otra persona cambió esa nota
+       mientras tanto, se informa el conflicto y no se guarda nada (no se
+       pisa el cambio ajeno). Las filas que el usuario no tocó no se
+       escriben, así tampoco revierten cambios ajenos.
+    4. Totales del curso y de los estudiantes (core.agregados) y versión del
+       grupo 'matricula' (core.versiones) a mano, porque bulk_update no
+       dispara señales.
+
+También acepta un CSV `documento,nota` pegado o subido (ver `leer_csv`).
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django import forms
+from django.db import transaction
+from django.db.models import F
+
+from .models import Matricula
+from . import agregados, versiones
+
+
+# Mismas reglas que la nota de MatriculaLoteForm
+CAMPO_NOTA = forms.DecimalField(max_digits=4, decimal_places=2, min_value=0, max_value=10, required=False)
+
+# Máximo de filas de un CSV de notas
+MAX_FILAS_CSV = 10000
+
+
+def planilla(curso_id):
+    """
+    Matrículas del curso para la grilla, ordenadas por apellido y nombre.
+
+    Returns:
+        list: Dicts {id, estudiante_id, documento, apellido, nombre, nota}
+    """
+    return list(
+        Matricula.objects.filter(curso_id=curso_id)
+        .order_by('estudiante__apellido', 'estudiante__nombre', 'estudiante_id')
+        .values(
+            'id', 'estudiante_id', 'nota',
+            documento=F('estudiante__documento'),
+            apellido=F('estudiante__apellido'),
+            nombre=F('estudiante__nombre'),
+        )
+    )
+
+
+def limpiar_nota(valor):
+    """
+    Valida una nota escrita por el usuario ('' = sin nota, acepta coma decimal).
+
+    Returns:
+        tuple: (Decimal o None, mensaje de error o None)
+    """
+    valor = (valor or '').strip().replace(',', '.')
+    try:
+        return CAMPO_NOTA.clean(valor), None
+    except forms.ValidationError as exc:
+        return None, ' '.join(exc.messages)
+
+
+def nota_original(valor):
+    """Nota que se mostró al abrir la planilla (campo oculto); None si está vacía o es ilegible"""
+    try:
+        return Decimal(valor) if valor else None
+    except InvalidOperation:
+        return None
+
+
+def leer_csv(texto):
+    """
+    Lee un CSV `documento,nota` (con o sin encabezado; separado por coma,
+    punto y coma o tabulación, como lo exporta Excel).
+
+    Returns:
+        tuple: (dict documento -> nota, lista de errores 'Línea n: ...')
+    """
+    lineas = texto.splitlines()
+    muestra = next((linea for linea in lineas if linea.strip()), '')
+    delimitador = max(';\t,', key=muestra.count) if muestra else ','
+    notas, errores = {}, []
+    for numero, fila in enumerate(csv.reader(io.StringIO(texto), delimiter=delimitador), start=1):
+        if not fila or not any(celda.strip() for celda in fila):
+            continue
+        if len(notas) + len(errores) >= MAX_FILAS_CSV:
+            errores.append(f"Máximo {MAX_FILAS_CSV} filas por envío")
+            break
+        documento = fila[0].strip()
+        if numero == 1 and documento.lower() == 'documento':
+            continue
+        if len(fila) < 2:
+            errores.append(f"Línea {numero}: falta la nota")
+            continue
+        nota, error = limpiar_nota(fila[1])
+        if error:
+            errores.append(f"Línea {numero}: {error}")
+        elif not documento:
+            errores.append(f"Línea {numero}: falta el documento")
+        else:
+            notas[documento] = nota
+    return notas, errores
+
+
+def matriculas_por_documento(curso_id, documentos):
+    """Retorna un dict documento -> id de matrícula de los documentos matriculados en el curso"""
+    return dict(
+        Matricula.objects.filter(curso_id=curso_id, estudiante__documento__in=documentos)
+        .order_by().values_list('estudiante__documento', 'id')
+    )
+
+
+def guardar(curso_id, notas, originales=None):
+    """
+    Guarda las notas de un curso con un único bulk_update.
+
+    Args:
+        curso_id (int): Curso de las matrículas
+        notas (dict): id de matrícula -> nota nueva (Decimal o None)
+        originales (dict): id de matrícula -> nota que vio el usuario. Si se
+            indica, solo se escriben las filas cuya nota nueva difiere de la
+            original, y solo si en la base sigue estando la original
+
+    Returns:
+        dict: {'actualizadas': n, 'conflictos': {id: nota actual}}. Si hay
+            conflictos no se escribe ninguna fila; una matrícula borrada
+            mientras tanto también es un conflicto (con nota actual None)
+    """
+    if originales is not None:
+        notas = {pk: nota for pk, nota in notas.items() if nota != originales.get(pk)}
+    if not notas:
+        return {'actualizadas': 0, 'conflictos': {}}
+
+    with transaction.atomic():
+        # Bloquea las filas hasta el fin de la transacción (PostgreSQL); SQLite ya
+        # serializa las escrituras con BEGIN IMMEDIATE (settings.DATABASES)
+        actuales = {
+            m.pk: m for m in
+            Matricula.objects.select_for_update().filter(curso_id=curso_id, pk__in=notas)
+            .order_by().only('id', 'estudiante_id', 'nota')
+        }
+        conflictos = {pk: None for pk in notas if pk not in actuales}
+        if originales is not None:
+            conflictos.update(
+                (pk, matricula.nota) for pk, matricula in actuales.items()
+                if matricula.nota != originales.get(pk)
+            )
+        if conflictos:
+            return {'actualizadas': 0, 'conflictos': conflictos}
+
+        modificadas = []
+        for pk, matricula in actuales.items():
+            if matricula.nota != notas[pk]:
+                matricula.nota = notas[pk]
+                modificadas.append(matricula)
+        if modificadas:
+            Matricula.objects.bulk_update(modificadas, ['nota'])
+            # bulk_update no dispara señales: totales de Curso/Estudiante y versión a mano
+            versiones.registrar_cambio('matricula')
+            agregados.recalcular({curso_id}, {m.estudiante_id for m in modificadas})
+    return {'actualizadas': len(modificadas), 'conflictos': {}}
@@ -0,0 +1,256 @@
+"""
+Paginación por cursor (keyset).
+
+En lugar de `OFFSET n` + `COUNT(*)`, cada página se pide con la condición
+"después de la última fila vista" sobre las columnas del orden del modelo
+(`Meta.ordering` + `id` como desempate). Con un índice sobre esas columnas
+cualquier página cuesta lo mismo que la primera, y los cursores no se
+corren cuando se insertan o borran filas entre pedidos.
+
+El cursor es un token opaco (base64 de JSON) con la dirección y los valores
+de la fila límite. Las columnas del orden no deben admitir NULL.
+"""
+import base64
+import binascii
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Max, Q
+from django.http import Http404, QueryDict
+
+
+def campos_orden(model, ordering=None):
+    """
+    Campos del orden keyset: `ordering` (o Meta.ordering) más el id.
+
+    Las ForeignKey se ordenan por su columna (`curso_id`) y no por el orden
+    del modelo relacionado, para que el cursor sea un valor simple.
+
+    Returns:
+        list: Tuplas (nombre_de_campo, descendente)
+    """
+    campos = []
+    for nombre in ordering if ordering is not None else model._meta.ordering:
+        descendente = nombre.startswith('-')
+        nombre = nombre.lstrip('-')
+        campo = model._meta.get_field(nombre)
+        campos.append((campo.attname, descendente))
+    if not any(nombre in ('id', model._meta.pk.attname) for nombre, _ in campos):
+        campos.append((model._meta.pk.attname, False))
+    return campos
+
+
+def codificar_cursor(valores, direccion):
+    """Token opaco con la dirección ('s' siguiente, 'a' anterior) y los valores"""
+    contenido = json.dumps([direccion] + list(valores), default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(contenido.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(token, model, campos):
+    """
+    Recupera dirección y valores de un cursor, validándolos contra los campos.
+
+    Raises:
+        Http404: Si el token está mal formado
+    """
+    try:
+        relleno = '=' * (-len(token) % 4)
+        direccion, *valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+        if direccion not in ('s', 'a') or len(valores) != len(campos):
+            raise ValueError
+        valores = [
+            model._meta.get_field(nombre).to_python(valor)
+            for (nombre, _), valor in zip(campos, valores)
+        ]
+    except (ValueError, TypeError, ValidationError, binascii.Error, json.JSONDecodeError):
+        raise Http404("Cursor de paginación inválido")
+    return direccion, valores
+
+
+def filtro_keyset(campos, valores, hacia_atras=False):
+    """
+    Condición "fila posterior (o anterior) a `valores`" en el orden `campos`.
+
+    Para (a, b, id) genera: a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+    """
+    filtro = Q()
+    iguales = {}
+    for (nombre, descendente), valor in zip(campos, valores):
+        mayor = descendente == hacia_atras
+        filtro |= Q(**iguales, **{f"{nombre}__{'gt' if mayor else 'lt'}": valor})
+        iguales[nombre] = valor
+    return filtro
+
+
+def contar_estimado(queryset):
+    """
+    Cantidad aproximada de filas de una tabla sin filtros, sin COUNT(*).
+
+    Usa las estadísticas del motor (sqlite_stat1 tras ANALYZE, reltuples en
+    PostgreSQL) y si no hay, el id máximo como cota. Con filtros aplicados
+    retorna None: estimar requeriría recorrer las filas que se quieren evitar.
+    """
+    if queryset.query.where:
+        return None
+    tabla = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabla])
+                fila = cursor.fetchone()
+                if fila:
+                    return int(fila[0].split()[0])
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [tabla])
+            fila = cursor.fetchone()
+            if fila and fila[0] > 0:
+                return fila[0]
+        else:
+            return None
+    maximo = queryset.model._default_manager.using(queryset.db).aggregate(maximo=Max('pk'))['maximo']
+    return maximo or 0
+
+
+class PaginaKeyset:
+    """
+    Página de resultados con cursores a la página siguiente y anterior.
+
+    Expone la misma interfaz básica que `django.core.paginator.Page`
+    (object_list, has_next, has_previous, has_other_pages) más las URLs
+    listas para los enlaces de navegación.
+
+    Atributos:
+        object_list (list): Filas de la página
+        cursor_siguiente (str): Token para la página siguiente o None
+        cursor_anterior (str): Token para la página anterior o None
+        total_estimado (int): Cantidad aproximada de filas (o None)
+    """
+
+    def __init__(self, object_list, cursor_siguiente, cursor_anterior, total_estimado=None, parametros=None):
+        self.object_list = object_list
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+        self.total_estimado = total_estimado
+        self._parametros = parametros
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _url(self, cursor):
+        """Query string con los parámetros actuales (ej: 'q') y el cursor dado"""
+        if cursor is None:
+            return None
+        parametros = self._parametros.copy() if self._parametros is not None else QueryDict(mutable=True)
+        parametros.pop('page', None)
+        parametros['cursor'] = cursor
+        return '?' + parametros.urlencode()
+
+    @property
+    def url_siguiente(self):
+        return self._url(self.cursor_siguiente)
+
+    @property
+    def url_anterior(self):
+        return self._url(self.cursor_anterior)
+
+
+class KeysetPaginator:
+    """
+    Paginador por cursor sobre un queryset.
+
+    El trabajo se divide en `consulta()` (arma el queryset de la página, sin
+    ejecutarlo) y `pagina()` (arma la PaginaKeyset con las filas leídas),
+    así puede usarse tanto desde vistas síncronas como asíncronas.
+
+    Atributos:
+        queryset: QuerySet a paginar (se reordena por los campos keyset)
+        per_page (int): Filas por página
+        estimar_total (bool): Si se calcula `total_estimado`
+    """
+
+    def __init__(self, queryset, per_page, ordering=None, estimar_total=False):
+        self.model = queryset.model
+        self.campos = campos_orden(self.model, ordering)
+        self.queryset = queryset.order_by(*self._orden())
+        self.per_page = per_page
+        self.estimar_total = estimar_total
+
+    def _orden(self, hacia_atras=False):
+        return [
+            f"{'-' if descendente != hacia_atras else ''}{nombre}"
+            for nombre, descendente in self.campos
+        ]
+
+    def consulta(self, cursor=None):
+        """
+        Queryset de la página pedida (per_page + 1 filas para saber si hay más).
+
+        Returns:
+            tuple: (queryset, dirección, valores del cursor o None)
+        """
+        if not cursor:
+            return self.queryset[:self.per_page + 1], 's', None
+        direccion, valores = decodificar_cursor(cursor, self.model, self.campos)
+        hacia_atras = direccion == 'a'
+        queryset = self.queryset.filter(filtro_keyset(self.campos, valores, hacia_atras))
+        if hacia_atras:
+            queryset = queryset.order_by(*self._orden(hacia_atras=True))
+        return queryset[:self.per_page + 1], direccion, valores
+
+    def valores_de(self, fila):
+        """Valores de los campos keyset de una fila (instancia o dict de `.values()`)"""
+        if isinstance(fila, dict):
+            return [fila[nombre] for nombre, _ in self.campos]
+        return [getattr(fila, nombre) for nombre, _ in self.campos]
+
+    def pagina(self, filas, direccion='s', valores=None, parametros=None):
+        """Arma la PaginaKeyset a partir de las filas leídas por `consulta()`"""
+        filas = list(filas)
+        hay_mas = len(filas) > self.per_page
+        filas = filas[:self.per_page]
+        if direccion == 'a':
+            filas.reverse()
+            hay_siguiente, hay_anterior = True, hay_mas
+        else:
+            hay_siguiente, hay_anterior = hay_mas, valores is not None
+
+        siguiente = anterior = None
+        if filas:
+            if hay_siguiente:
+                siguiente = codificar_cursor(self.valores_de(filas[-1]), 's')
+            if hay_anterior:
+                anterior = codificar_cursor(self.valores_de(filas[0]), 'a')
+        elif valores is not None:
+            # Página vacía (p. ej. se borraron filas): permitir volver atrás
+            anterior = codificar_cursor(valores, 'a') if direccion == 's' else None
+
+        total = contar_estimado(self.queryset) if self.estimar_total else None
+        return PaginaKeyset(filas, siguiente, anterior, total, parametros)
+
+    def paginar(self, cursor=None, parametros=None):
+        """Versión síncrona: ejecuta la consulta y retorna la página"""
+        queryset, direccion, valores = self.consulta(cursor)
+        return self.pagina(queryset, direccion, valores, parametros)
+
+    async def apaginar(self, cursor=None, parametros=None):
+        """Versión asíncrona: lee las filas con el ORM asíncrono"""
+        queryset, direccion, valores = self.consulta(cursor)
+        filas = [fila async for fila in queryset]
+        # pagina() puede consultar la estimación del total: va al hilo de la base
+        return await sync_to_async(self.pagina)(filas, direccion, valores, parametros)
@@ -0,0 +1,194 @@
+"""
+Motor de reportes PDF por bloques.
+
+En lugar de una única `Table` con todas las filas (que reportlab tiene que
+medir y partir entre páginas con costo superlineal), las filas se leen de a
+`filas_por_tabla` y cada bloque se convierte en su propia tabla pequeña con
+el encabezado repetido. Los estilos (`ParagraphStyle`, `TableStyle`) se
+construyen una sola vez por proceso y se reutilizan en todas las tablas.
+
+La lista de flowables que recibe `SimpleDocTemplate.build()` se va llenando
+a medida que reportlab la consume, así solo hay un bloque de filas en
+memoria a la vez y el tiempo de maquetado crece de forma lineal.
+
+Este módulo es el único que importa reportlab: las vistas llegan a él a
+través del registro de core.exporters (`PDFExporter`), solo al generar un PDF.
+"""
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from .exporters import Exportador
+
+
+# Filas por tabla: un bloque ocupa aproximadamente una página carta
+FILAS_POR_TABLA = 40
+
+
+@lru_cache(maxsize=None)
+def estilos_parrafo():
+    """Estilos de título y pie de página (se crean una vez por proceso)"""
+    styles = getSampleStyleSheet()
+    titulo = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=20,
+        alignment=1
+    )
+    pie = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
+    return titulo, pie
+
+
+@lru_cache(maxsize=None)
+def estilo_subtitulo():
+    """Estilo de las líneas bajo el título (datos del alumno en un boletín)"""
+    return ParagraphStyle('Subtitle', parent=getSampleStyleSheet()['Normal'], fontSize=11, spaceAfter=4)
+
+
+@lru_cache(maxsize=None)
+def estilo_tabla(alineacion='CENTER'):
+    """TableStyle compartido por todas las tablas con la misma alineación"""
+    comandos = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), alineacion),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
+    ]
+    if alineacion == 'LEFT':
+        comandos.insert(3, ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'))
+    return TableStyle(comandos)
+
+
+class _FlujoPerezoso(list):
+    """
+    Lista de flowables que se recarga desde un generador cuando se vacía.
+
+    `BaseDocTemplate.build()` consume la lista desde el frente y consulta
+    `len()` en cada vuelta; al llegar a cero se trae el siguiente bloque.
+    """
+
+    def __init__(self, generador):
+        super().__init__()
+        self._generador = generador
+
+    def __len__(self):
+        if not super().__len__():
+            siguiente = next(self._generador, None)
+            if siguiente is not None:
+                self.append(siguiente)
+        return super().__len__()
+
+
+class ReportePDF:
+    """
+    Reporte tabular en PDF con título, tablas por bloques y pie con fecha.
+
+    Atributos:
+        titulo (str): Título que encabeza la primera página
+        encabezados (list): Títulos de las columnas (se repiten en cada tabla)
+        anchos (list): Ancho de cada columna en puntos
+        alineacion (str): Alineación horizontal de las celdas (CENTER o LEFT)
+        filas_por_tabla (int): Filas de datos por cada tabla del reporte
+        subtitulos (list): Líneas de texto entre el título y la primera tabla
+    """
+
+    def __init__(self, titulo, encabezados, anchos, alineacion='CENTER',
+                 filas_por_tabla=FILAS_POR_TABLA, pagesize=letter, subtitulos=()):
+        self.titulo = titulo
+        self.subtitulos = subtitulos
+        self.encabezados = list(encabezados)
+        self.anchos = anchos
+        self.alineacion = alineacion
+        self.filas_por_tabla = filas_por_tabla
+        self.pagesize = pagesize
+
+    def tablas(self, filas):
+        """Agrupa las filas en bloques y genera una tabla ya estilada por bloque"""
+        estilo = estilo_tabla(self.alineacion)
+        filas = iter(filas)
+        while True:
+            bloque = list(islice(filas, self.filas_por_tabla))
+            if not bloque:
+                return
+            yield Table([self.encabezados] + bloque, colWidths=self.anchos, repeatRows=1, style=estilo)
+
+    def flowables(self, filas):
+        """Secuencia completa del documento: título, tablas y pie"""
+        titulo, pie = estilos_parrafo()
+        yield Paragraph(self.titulo, titulo)
+        for linea in self.subtitulos:
+            yield Paragraph(linea, estilo_subtitulo())
+        yield Spacer(1, 0.2*inch)
+        tiene_filas = False
+        for tabla in self.tablas(filas):
+            tiene_filas = True
+            yield tabla
+        if not tiene_filas:
+            yield Table([self.encabezados], colWidths=self.anchos, style=estilo_tabla(self.alineacion))
+        yield Spacer(1, 0.3*inch)
+        yield Paragraph(f'Generado: {datetime.now().strftime("%d/%m/%Y %H:%M")}', pie)
+
+    def render(self, destino, filas):
+        """
+        Escribe el reporte en `destino` (ruta o archivo binario).
+
+        Args:
+            destino: Archivo abierto en modo binario o ruta
+            filas: Iterable de filas (listas de valores ya formateados)
+        """
+        doc = SimpleDocTemplate(destino, pagesize=self.pagesize)
+        doc.build(_FlujoPerezoso(self.flowables(filas)))
+
+
+def texto_pdf(valor, recorte=None):
+    """Texto de una celda: fechas dd/mm/aaaa, booleanos Sí/No, nulos '-' y recorte opcional"""
+    if valor is None:
+        return '-'
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, date):
+        return valor.strftime('%d/%m/%Y')
+    texto = str(valor)
+    if recorte and len(texto) > recorte:
+        return texto[:recorte] + '...'
+    return texto
+
+
+class PDFExporter(Exportador):
+    """
+    Exportador PDF del registro de core.exporters.
+
+    Se genera en segundo plano (ReporteJob): la vista encola el trabajo y
+    `procesar_reportes` llama a `render()`. Usa `titulo_corto`, `ancho` y
+    `recorte` de cada columna.
+    """
+    content_type = 'application/pdf'
+    en_segundo_plano = True
+
+    def render(self, destino, queryset):
+        """Escribe en `destino` el PDF del queryset, por bloques de filas"""
+        anchos = [columna.ancho for columna in self.columnas]
+        reporte = ReportePDF(
+            self.titulo, [columna.titulo_corto for columna in self.columnas],
+            [ancho * inch for ancho in anchos] if all(anchos) else None,
+            alineacion=self.alineacion,
+        )
+        recortes = [columna.recorte for columna in self.columnas]
+        reporte.render(destino, (
+            [texto_pdf(valor, recorte) for valor, recorte in zip(fila, recortes)]
+            for fila in self.filas(queryset)
+        ))
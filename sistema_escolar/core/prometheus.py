@@ -0,0 +1,285 @@
+"""
+Registro de métricas en formato de texto de Prometheus (/metrics).
+
+Métricas (todas con el prefijo `sistema_escolar_`):
+
+    http_duracion_segundos{vista,metodo}         Histograma de latencia por nombre de URL
+    http_respuestas_total{vista,codigo}           Respuestas por código HTTP
+    db_consultas_total{vista}                     Consultas SQL ejecutadas
+    db_duracion_segundos_total{vista}             Tiempo en la base
+    db_consultas_por_pedido{vista}                Histograma de consultas por pedido (N+1)
+    exportacion_duracion_segundos{exportador,formato}  Histograma de duración de cada exportación
+    exportacion_bytes_total{exportador,formato}   Bytes generados por las exportaciones
+
+Los pedidos los registra MetricasMiddleware (core.metricas), las descargas
+CSV/NDJSON `core.exporters.respuesta_descarga` y los PDF `core.reportes.ejecutar`.
+
+Cada proceso acumula en memoria: registrar un pedido es una búsqueda por
+etiquetas, un bisect y unas sumas bajo un único lock (~1.5 µs). Con varios workers
+(gunicorn) o con los procesos de `procesar_reportes`, cada proceso tiene sus
+propios totales; con METRICAS_DIR (carpeta compartida) cada uno vuelca los
+suyos a `<carpeta>/<pid>-<id>.json` como mucho una vez por
+INTERVALO_VOLCADO (lo último de un worker ocioso aparece con su próximo
+pedido o al terminar) y /metrics suma todos los archivos. Los archivos de
+procesos terminados se conservan (sus totales siguen contando): la carpeta
+debe vaciarse al desplegar, antes de levantar los workers.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+
+PREFIJO = 'sistema_escolar_'
+
+# Segundos mínimos entre dos volcados de un proceso (modo multiproceso)
+INTERVALO_VOLCADO = 1.0
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+LIMITES_EXPORTACION = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+
+
+class Contador:
+    """Contador acumulado por combinación de etiquetas"""
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = PREFIJO + nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.valores = {}
+
+    def inc(self, etiquetas, valor=1):
+        with _lock:
+            self._inc(etiquetas, valor)
+
+    def _inc(self, etiquetas, valor):
+        self.valores[etiquetas] = self.valores.get(etiquetas, 0) + valor
+
+    def vacio(self):
+        return 0
+
+    def sumar(self, destino, origen):
+        return destino + origen
+
+    def lineas(self, valores):
+        for etiquetas, valor in sorted(valores.items()):
+            yield f"{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(valor)}"
+
+
+class Histograma:
+    """
+    Histograma por combinación de etiquetas.
+
+    Cada serie es una lista con la cantidad de observaciones de cada
+    intervalo (no acumulada; la última posición es +Inf) más la suma al
+    final. Las cantidades acumuladas de Prometheus se calculan al exponer.
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas, limites):
+        self.nombre = PREFIJO + nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        self.valores = {}
+
+    def observar(self, etiquetas, valor):
+        with _lock:
+            self._observar(etiquetas, valor)
+
+    def _observar(self, etiquetas, valor):
+        serie = self.valores.get(etiquetas)
+        if serie is None:
+            serie = self.valores[etiquetas] = self.vacio()
+        serie[bisect_left(self.limites, valor)] += 1
+        serie[-1] += valor
+
+    def vacio(self):
+        return [0] * (len(self.limites) + 1) + [0.0]
+
+    def sumar(self, destino, origen):
+        return [a + b for a, b in zip(destino, origen)]
+
+    def lineas(self, valores):
+        for etiquetas, serie in sorted(valores.items()):
+            acumulado = 0
+            for limite, cantidad in zip(self.limites + ('+Inf',), serie):
+                acumulado += cantidad
+                extra = (('le', limite if isinstance(limite, str) else _numero(limite)),)
+                yield f"{self.nombre}_bucket{_etiquetas(self.etiquetas, etiquetas, extra)} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(serie[-1])}"
+            yield f"{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {acumulado}"
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(nombres, valores, extra=()):
+    pares = list(zip(nombres, valores)) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+HTTP_DURACION = Histograma(
+    'http_duracion_segundos', "Latencia de los pedidos por nombre de URL.", ('vista', 'metodo'), LIMITES_LATENCIA,
+)
+HTTP_RESPUESTAS = Contador('http_respuestas_total', "Respuestas por código HTTP.", ('vista', 'codigo'))
+DB_CONSULTAS = Contador('db_consultas_total', "Consultas SQL ejecutadas por los pedidos.", ('vista',))
+DB_DURACION = Contador('db_duracion_segundos_total', "Segundos en la base durante los pedidos.", ('vista',))
+DB_CONSULTAS_POR_PEDIDO = Histograma(
+    'db_consultas_por_pedido', "Consultas SQL por pedido.", ('vista',), LIMITES_CONSULTAS,
+)
+EXPORTACION_DURACION = Histograma(
+    'exportacion_duracion_segundos', "Duración de cada exportación (CSV, NDJSON, PDF).",
+    ('exportador', 'formato'), LIMITES_EXPORTACION,
+)
+EXPORTACION_BYTES = Contador(
+    'exportacion_bytes_total', "Bytes generados por las exportaciones.", ('exportador', 'formato'),
+)
+
+METRICAS = (
+    HTTP_DURACION, HTTP_RESPUESTAS, DB_CONSULTAS, DB_DURACION, DB_CONSULTAS_POR_PEDIDO,
+    EXPORTACION_DURACION, EXPORTACION_BYTES,
+)
+
+
+def registrar_pedido(vista, metodo, codigo, duracion, consultas, duracion_sql):
+    """Registra un pedido atendido (lo llama MetricasMiddleware); un solo lock para todo"""
+    por_vista = (vista,)
+    with _lock:
+        HTTP_DURACION._observar((vista, metodo), duracion)
+        HTTP_RESPUESTAS._inc((vista, str(codigo)), 1)
+        DB_CONSULTAS._inc(por_vista, consultas)
+        DB_DURACION._inc(por_vista, duracion_sql)
+        DB_CONSULTAS_POR_PEDIDO._observar(por_vista, consultas)
+    _volcar_si_corresponde()
+
+
+def registrar_exportacion(exportador, formato, duracion, cantidad_bytes):
+    """Registra una exportación terminada (CSV/NDJSON al enviarse, PDF al escribirse)"""
+    with _lock:
+        EXPORTACION_DURACION._observar((exportador, formato), duracion)
+        EXPORTACION_BYTES._inc((exportador, formato), cantidad_bytes)
+    _volcar_si_corresponde()
+
+
+# ----------------------------------------------------------------------------
+# Modo multiproceso (METRICAS_DIR)
+# ----------------------------------------------------------------------------
+
+class _Proceso:
+    """Archivo de volcado del proceso actual; se renueva después de un fork"""
+
+    def __init__(self):
+        self.archivo = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+        self.ultimo_volcado = 0.0
+
+
+_proceso = _Proceso()
+
+
+def _reiniciar_en_hijo():
+    """Un proceso hijo (fork) empieza de cero y con su propio archivo"""
+    global _proceso, _lock
+    _lock = threading.Lock()
+    for metrica in METRICAS:
+        metrica.valores = {}
+    _proceso = _Proceso()
+
+
+os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def carpeta():
+    """Carpeta compartida del modo multiproceso, o None si está desactivado"""
+    valor = getattr(settings, 'METRICAS_DIR', '')
+    return Path(valor) if valor else None
+
+
+def _instantanea():
+    with _lock:
+        return {
+            metrica.nombre: [[list(etiquetas), valor] for etiquetas, valor in metrica.valores.items()]
+            for metrica in METRICAS
+        }
+
+
+def volcar():
+    """Escribe los totales de este proceso en METRICAS_DIR (sin efecto si no está configurada)"""
+    destino = carpeta()
+    if destino is None:
+        return
+    destino.mkdir(parents=True, exist_ok=True)
+    ruta = destino / _proceso.archivo
+    temporal = ruta.with_suffix('.tmp')
+    temporal.write_text(json.dumps(_instantanea()))
+    os.replace(temporal, ruta)
+    _proceso.ultimo_volcado = time.monotonic()
+
+
+def _volcar_si_corresponde():
+    if getattr(settings, 'METRICAS_DIR', '') and time.monotonic() - _proceso.ultimo_volcado >= INTERVALO_VOLCADO:
+        volcar()
+
+
+atexit.register(volcar)
+
+
+def _combinadas():
+    """Totales de todos los procesos (o de este solo, sin METRICAS_DIR)"""
+    destino = carpeta()
+    if destino is None:
+        with _lock:
+            return {metrica.nombre: dict(metrica.valores) for metrica in METRICAS}
+    volcar()
+    por_nombre = {metrica.nombre: metrica for metrica in METRICAS}
+    totales = {nombre: {} for nombre in por_nombre}
+    for archivo in destino.glob('*.json'):
+        try:
+            datos = json.loads(archivo.read_text())
+        except (OSError, ValueError):
+            # Archivo de otro proceso a medio reemplazar o borrado: se ignora en esta lectura
+            continue
+        for nombre, series in datos.items():
+            metrica = por_nombre.get(nombre)
+            if metrica is None:
+                continue
+            for etiquetas, valor in series:
+                clave = tuple(etiquetas)
+                anterior = totales[nombre].get(clave, metrica.vacio())
+                totales[nombre][clave] = metrica.sumar(anterior, valor)
+    return totales
+
+
+def texto():
+    """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)"""
+    totales = _combinadas()
+    lineas = []
+    for metrica in METRICAS:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.lineas(totales[metrica.nombre]))
+    return '\n'.join(lineas) + '\n'
+
+
+def reiniciar():
+    """Borra los totales de este proceso (tests)"""
+    with _lock:
+        for metrica in METRICAS:
+            metrica.valores = {}
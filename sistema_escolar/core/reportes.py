@@ -0,0 +1,208 @@
+"""
+Generación de reportes en segundo plano.
+
+Flujo:
+    1. La vista de listado llama a `encolar()` con sus parámetros GET y
+       responde de inmediato con el id del trabajo (ReporteJob).
+    2. El comando `procesar_reportes` reclama los trabajos pendientes con
+       `reclamar()` y ejecuta `ejecutar()` en un pool de procesos.
+    3. El archivo queda en REPORTES_DIR con nombre `<clave>.<formato>`; la
+       clave es un hash de la vista, los parámetros y la versión de los
+       datos que lee (`cache_grupos` de la vista, ver core.versiones), así
+       pedidos iguales reutilizan el mismo archivo mientras siga vigente
+       (REPORTES_CACHE_TTL) y ningún dato haya cambiado.
+
+Un trabajo 'procesando' cuyo worker se cayó vuelve a la cola pasados
+REPORTES_TIMEOUT segundos (`reencolar_abandonados`).
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import prometheus, versiones
+from .models import ReporteJob
+
+
+# Parámetros GET que no cambian el contenido del reporte
+PARAMETROS_IGNORADOS = ('export', 'page', 'cursor')
+
+
+def directorio():
+    """Retorna el directorio de reportes, creándolo si no existe"""
+    ruta = Path(settings.REPORTES_DIR)
+    ruta.mkdir(parents=True, exist_ok=True)
+    return ruta
+
+
+def parametros_de(query_dict):
+    """Extrae de un QueryDict los parámetros que afectan al reporte"""
+    return {
+        clave: valor for clave, valor in sorted(query_dict.items())
+        if clave not in PARAMETROS_IGNORADOS and valor
+    }
+
+
+def calcular_clave(vista, formato, parametros, version=''):
+    """Hash estable de vista + formato + parámetros (orden de claves indiferente) + versión de los datos"""
+    contenido = json.dumps([vista, formato, parametros, version], sort_keys=True)
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def ruta_archivo(clave, formato):
+    """Ruta del archivo en caché para una clave de reporte"""
+    return directorio() / f"{clave}.{formato}"
+
+
+def archivo_vigente(ruta):
+    """Indica si el archivo existe y fue generado dentro de REPORTES_CACHE_TTL"""
+    try:
+        return time.time() - ruta.stat().st_mtime < settings.REPORTES_CACHE_TTL
+    except FileNotFoundError:
+        return False
+
+
+def encolar(vista, formato, parametros, nombre_descarga, usuario=None):
+    """
+    Retorna un trabajo para el reporte pedido, reutilizando uno existente.
+
+    Se reutiliza un trabajo con la misma clave si sigue pendiente o en
+    proceso, o si ya terminó y su archivo en disco sigue vigente. En otro
+    caso se crea un ReporteJob pendiente. La clave incluye la versión de los
+    grupos de `cache_grupos` de la vista: si los datos cambiaron, el
+    reporte se vuelve a generar aunque el anterior siga vigente.
+
+    Returns:
+        ReporteJob: Trabajo nuevo o reutilizado
+    """
+    grupos = getattr(import_string(vista), 'cache_grupos', ())
+    version = versiones.estado(grupos)[0] if grupos else ''
+    clave = calcular_clave(vista, formato, parametros, version)
+    existente = (
+        ReporteJob.objects
+        .filter(clave=clave, estado__in=[ReporteJob.PENDIENTE, ReporteJob.PROCESANDO, ReporteJob.LISTO])
+        .order_by('-creado')
+        .first()
+    )
+    if existente and (existente.estado != ReporteJob.LISTO or archivo_vigente(ruta_archivo(clave, formato))):
+        return existente
+
+    return ReporteJob.objects.create(
+        vista=vista,
+        formato=formato,
+        parametros=parametros,
+        clave=clave,
+        nombre_descarga=nombre_descarga,
+        usuario=usuario if usuario is not None and usuario.is_authenticated else None,
+    )
+
+
+def reencolar_abandonados():
+    """
+    Devuelve a la cola los trabajos 'procesando' reclamados hace más de
+    REPORTES_TIMEOUT segundos: el worker que los tomó se cayó o fue
+    terminado y ya no los va a completar.
+
+    Returns:
+        int: Cantidad de trabajos reencolados
+    """
+    limite = timezone.now() - timedelta(seconds=settings.REPORTES_TIMEOUT)
+    return (
+        ReporteJob.objects
+        .filter(Q(iniciado__lt=limite) | Q(iniciado__isnull=True, creado__lt=limite), estado=ReporteJob.PROCESANDO)
+        .update(estado=ReporteJob.PENDIENTE, iniciado=None)
+    )
+
+
+def reclamar(limite):
+    """
+    Marca como 'procesando' hasta `limite` trabajos pendientes.
+
+    Antes reencola los abandonados (`reencolar_abandonados`). El UPDATE
+    condicionado a estado='pendiente' garantiza que dos workers no tomen
+    el mismo trabajo.
+
+    Returns:
+        list: ids de los trabajos reclamados
+    """
+    reencolar_abandonados()
+    reclamados = []
+    pendientes = (
+        ReporteJob.objects.filter(estado=ReporteJob.PENDIENTE)
+        .order_by('id')
+        .values_list('id', flat=True)[:limite]
+    )
+    for job_id in list(pendientes):
+        actualizados = ReporteJob.objects.filter(pk=job_id, estado=ReporteJob.PENDIENTE).update(
+            estado=ReporteJob.PROCESANDO, iniciado=timezone.now(),
+        )
+        if actualizados:
+            reclamados.append(job_id)
+    return reclamados
+
+
+def construir_vista(ruta, parametros, formato='pdf'):
+    """
+    Instancia la vista de listado con una petición GET equivalente.
+
+    Así el worker aplica exactamente el mismo filtrado (`get_queryset`) que
+    vio el usuario, sin duplicar la lógica de búsqueda. La clase debe
+    ofrecer el formato en `export_formats` y definir
+    `render_export(formato, destino)` (ver views.ExportMixin y
+    core.boletines.ReporteBoletines).
+    """
+    clase = import_string(ruta)
+    if formato not in getattr(clase, 'export_formats', ()) or not hasattr(clase, 'render_export'):
+        raise ValueError(f"{ruta} no define un reporte exportable en {formato}")
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(mutable=True)
+    request.GET.update(parametros)
+    vista = clase()
+    vista.setup(request)
+    return vista
+
+
+def ejecutar(job_id):
+    """
+    Genera el archivo de un trabajo y actualiza su estado.
+
+    Si otro trabajo ya dejó un archivo vigente con la misma clave se
+    reutiliza sin volver a renderizar. El archivo se escribe primero en un
+    temporal y se renombra, para que nunca se sirva a medio escribir.
+
+    Returns:
+        str: Estado final del trabajo
+    """
+    job = ReporteJob.objects.get(pk=job_id)
+    try:
+        ruta = ruta_archivo(job.clave, job.formato)
+        if not archivo_vigente(ruta):
+            vista = construir_vista(job.vista, job.parametros, job.formato)
+            temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+            inicio = time.perf_counter()
+            with open(temporal, 'wb') as destino:
+                vista.render_export(job.formato, destino)
+            prometheus.registrar_exportacion(
+                job.nombre_descarga.rpartition('.')[0], job.formato,
+                time.perf_counter() - inicio, temporal.stat().st_size,
+            )
+            os.replace(temporal, ruta)
+        job.estado = ReporteJob.LISTO
+        job.archivo = ruta.name
+        job.error = ''
+    except Exception as exc:
+        job.estado = ReporteJob.ERROR
+        job.error = f"{type(exc).__name__}: {exc}"
+    job.terminado = timezone.now()
+    job.save(update_fields=['estado', 'archivo', 'error', 'terminado'])
+    return job.estado
+
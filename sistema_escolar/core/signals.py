@@ -0,0 +1,130 @@
+"""
+Señales de los modelos de core.
+
+- Matricula mantiene los totales de Curso y Estudiante. Matricula.save()
+  corre dentro de una transacción y el borrado (incluido el borrado en
+  cascada al eliminar un curso o un estudiante) también, así los totales se
+  actualizan junto con la matrícula.
+- Al borrar cursos o estudiantes, las matrículas borradas en cascada no
+  recalculan nada una por una: pre_delete marca el origen del borrado (la
+  instancia o el queryset de `delete()`), cada matrícula anota ahí su curso
+  y estudiante y, cuando se borró el último curso/estudiante, los afectados
+  se recalculan en una sola pasada y el cambio se registra una vez. Los
+  cursos/estudiantes borrados no se recalculan.
+- Guardar o borrar un Estudiante, Curso, Profesor o Matricula registra el
+  cambio de su grupo (core.versiones): versión para ETag e invalidación de
+  la caché.
+
+Se conectan en CoreConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import agregados, versiones
+from .models import Curso, Estudiante, Matricula, Profesor
+
+
+@receiver(pre_save, sender=Matricula)
+def recordar_relaciones(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda curso y estudiante anteriores si la matrícula cambia de alguno de los dos"""
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {'curso', 'estudiante'} & set(update_fields):
+        return
+    anterior = (
+        Matricula.objects.filter(pk=instance.pk)
+        .values_list('curso_id', 'estudiante_id')
+        .first()
+    )
+    instance._relaciones_anteriores = anterior
+
+
+@receiver(post_save, sender=Matricula)
+def matricula_guardada(sender, instance, raw=False, **kwargs):
+    """Recalcula los totales del curso y estudiante de la matrícula (y los anteriores si cambiaron)"""
+    if raw:
+        return
+    cursos, estudiantes = {instance.curso_id}, {instance.estudiante_id}
+    anterior = getattr(instance, '_relaciones_anteriores', None)
+    if anterior:
+        cursos.add(anterior[0])
+        estudiantes.add(anterior[1])
+        del instance._relaciones_anteriores
+    agregados.recalcular(cursos, estudiantes)
+
+
+class _Cascada:
+    """Borrado de cursos/estudiantes en curso (se guarda en el origen del borrado)"""
+
+    def __init__(self):
+        self.pendientes = set()  # (modelo, pk) aún no borrados
+        self.borrados = {Curso: set(), Estudiante: set()}
+        self.afectados = {Curso: set(), Estudiante: set()}
+
+
+def _cascada(origin):
+    return getattr(origin, '_cascada_matriculas', None)
+
+
+@receiver(pre_delete, sender=Curso)
+@receiver(pre_delete, sender=Estudiante)
+def preparar_cascada(sender, instance, origin=None, **kwargs):
+    """Marca el origen del borrado: sus matrículas en cascada se recalculan al final"""
+    cascada = _cascada(origin)
+    if cascada is None:
+        cascada = _Cascada()
+        origin._cascada_matriculas = cascada
+    cascada.pendientes.add((sender, instance.pk))
+    cascada.borrados[sender].add(instance.pk)
+
+
+@receiver(post_delete, sender=Curso)
+@receiver(post_delete, sender=Estudiante)
+def terminar_cascada(sender, instance, origin=None, **kwargs):
+    """Con el último curso/estudiante borrado, recalcula los afectados una sola vez"""
+    cascada = _cascada(origin)
+    cascada.pendientes.discard((sender, instance.pk))
+    if cascada.pendientes:
+        return
+    del origin._cascada_matriculas
+    agregados.recalcular(
+        cascada.afectados[Curso] - cascada.borrados[Curso],
+        cascada.afectados[Estudiante] - cascada.borrados[Estudiante],
+    )
+    versiones.registrar_cambio('matricula', *(_GRUPOS[m] for m, ids in cascada.borrados.items() if ids))
+
+
+@receiver(post_delete, sender=Matricula)
+def matricula_borrada(sender, instance, origin=None, **kwargs):
+    """Recalcula los totales del curso y estudiante de la matrícula borrada"""
+    cascada = _cascada(origin)
+    if cascada is not None:
+        # Borrada en cascada: se recalcula al terminar (terminar_cascada)
+        cascada.afectados[Curso].add(instance.curso_id)
+        cascada.afectados[Estudiante].add(instance.estudiante_id)
+        return
+    agregados.recalcular([instance.curso_id], [instance.estudiante_id])
+
+
+# Grupo de datos de cada modelo (core.versiones / core.cache)
+_GRUPOS = {
+    Estudiante: 'estudiante',
+    Curso: 'curso',
+    Profesor: 'profesor',
+    Matricula: 'matricula',
+}
+
+
+def registrar_cambio(sender, origin=None, **kwargs):
+    """Registra el cambio del grupo del modelo guardado o borrado"""
+    if _cascada(origin) is not None:
+        # Borrado de cursos/estudiantes: lo registra terminar_cascada una sola vez
+        return
+    versiones.registrar_cambio(_GRUPOS[sender])
+
+
+for _modelo in _GRUPOS:
+    post_save.connect(registrar_cambio, sender=_modelo)
+    # El borrado de cursos y estudiantes lo registra terminar_cascada
+    if _modelo not in (Curso, Estudiante):
+        post_delete.connect(registrar_cambio, sender=_modelo)
@@ -0,0 +1,53 @@
+"""
+Etiqueta {% cache_versionado %}: caché de fragmentos con las versiones de core.cache.
+
+Uso:
+    {% load cache_core %}
+    {% cache_versionado "tabla_estudiantes" "estudiante,matricula" request.GET.urlencode %}
+        ... fragmento ...
+    {% endcache_versionado %}
+
+El primer argumento nombra el fragmento, el segundo lista los grupos de
+datos de los que depende (separados por coma) y el resto son variantes
+(ej: la query string). A diferencia de {% cache %}, el fragmento se
+invalida solo al cambiar cualquiera de esos grupos.
+"""
+from django import template
+
+from core import cache as cache_core
+
+
+register = template.Library()
+
+
+class CacheVersionadoNode(template.Node):
+    def __init__(self, nodelist, nombre, grupos, variantes):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.grupos = grupos
+        self.variantes = variantes
+
+    def render(self, context):
+        grupos = tuple(g.strip() for g in self.grupos.resolve(context).split(',') if g.strip())
+        variantes = tuple(variante.resolve(context) for variante in self.variantes)
+        return cache_core.obtener(
+            f"fragmento:{self.nombre.resolve(context)}", grupos, variantes,
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def cache_versionado(parser, token):
+    partes = token.split_contents()
+    if len(partes) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{partes[0]}' requiere al menos el nombre del fragmento y los grupos"
+        )
+    nodelist = parser.parse(('endcache_versionado',))
+    parser.delete_first_token()
+    return CacheVersionadoNode(
+        nodelist,
+        parser.compile_filter(partes[1]),
+        parser.compile_filter(partes[2]),
+        [parser.compile_filter(parte) for parte in partes[3:]],
+    )
@@ -1,8 +1,37 @@
-from django.test import TestCase, Client
+import base64
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+import zipfile
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache as django_cache
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory, TestCase, TransactionTestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
 from django.db import IntegrityError
-from .models import Estudiante, Profesor, Curso, Matricula
+from django.db.models import F
+from .models import Estudiante, Profesor, Curso, Matricula, ReporteJob, VersionTabla
+from . import cache as cache_core
+from . import boletines, columnar, estadisticas, exporters, generador, matriculas, metricas, prometheus, reportes, versiones, views, xlsx
+from .pdf import ReportePDF
 
 
 class ModelTests(TestCase):
@@ -60,3 +89,1221 @@ class ViewTests(TestCase):
         # Redirect on success to the list view
         self.assertEqual(resp.status_code, 302)
         self.assertTrue(Estudiante.objects.filter(documento='444').exists())
+
+
+class ExportCSVTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+
+    def test_export_csv_estudiantes_es_streaming_y_respeta_busqueda(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200', activo=True)
+        Estudiante.objects.create(nombre='Pedro', apellido='Benitez', documento='300', activo=False)
+        resp = self.client.get(reverse('estudiante_list'), {'export': 'csv', 'q': 'Sosa'})
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="estudiantes.csv"')
+        lineas = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[0], 'Nombre,Apellido,Documento,Email,Fecha de Nacimiento,Activo')
+        self.assertEqual(lineas[1:], ['Carla,Sosa,200,,,Sí'])
+
+    def test_export_csv_cursos_incluye_profesor(self):
+        prof = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        Curso.objects.create(codigo='C001', nombre='Matemáticas', profesor=prof)
+        Curso.objects.create(codigo='C002', nombre='Historia')
+        resp = self.client.get(reverse('curso_list'), {'export': 'csv'})
+        lineas = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[1:], ['C001,Matemáticas,Ana Gomez,', 'C002,Historia,Sin profesor,'])
+
+    def test_export_json_con_tipos(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200', fecha_nacimiento='2001-02-03')
+        resp = self.client.get(reverse('estudiante_list'), {'export': 'json'})
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="estudiantes.json"')
+        datos = json.loads(b''.join(resp.streaming_content))
+        self.assertEqual(datos, [{
+            'nombre': 'Carla', 'apellido': 'Sosa', 'documento': '200', 'email': '',
+            'fecha_nacimiento': '2001-02-03', 'activo': True,
+        }])
+        resp = self.client.get(reverse('curso_list'), {'export': 'json'})
+        self.assertEqual(json.loads(b''.join(resp.streaming_content)), [])
+
+
+class ExportadoresTests(TestCase):
+    def test_cargar_las_urls_no_importa_reportlab(self):
+        codigo = (
+            "import sys, django; django.setup(); "
+            "from django.conf import settings; from importlib import import_module; "
+            "import_module(settings.ROOT_URLCONF); print('reportlab' in sys.modules)"
+        )
+        salida = subprocess.run(
+            [sys.executable, '-c', codigo], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            env={'DJANGO_SETTINGS_MODULE': 'sistema_escolar.settings', 'PATH': ''},
+        ).stdout
+        self.assertEqual(salida.strip(), 'False')
+
+    def test_registro_importa_al_primer_uso_y_acepta_formatos_nuevos(self):
+        self.assertIs(exporters.exportador('csv'), exporters.CSVExporter)
+        self.assertIsNone(exporters.exportador('txt'))
+        exporters.registrar('txt', 'core.exporters.CSVExporter')
+        try:
+            self.assertIs(exporters.exportador('txt'), exporters.CSVExporter)
+        finally:
+            del exporters.EXPORTADORES['txt']
+            exporters.exportador.cache_clear()
+
+
+class ExportXLSXTests(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+
+    def test_listados_enlazan_la_exportacion_xlsx(self):
+        for nombre in ('estudiante_list', 'curso_list', 'profesor_list'):
+            with self.subTest(nombre):
+                self.assertContains(self.client.get(reverse(nombre)), 'href="?export=xlsx"')
+
+    def test_export_xlsx_estudiantes_con_tipos(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa & Cía', documento='200',
+                                  fecha_nacimiento='2001-02-03', activo=False)
+        resp = self.client.get(reverse('estudiante_list'), {'export': 'xlsx'})
+        self.assertEqual(resp['Content-Type'], xlsx.CONTENT_TYPE)
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="estudiantes.xlsx"')
+        with zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content))) as archivo:
+            self.assertIn('xl/styles.xml', archivo.namelist())
+            self.assertIn(b'name="Reporte de Estudiantes"', archivo.read('xl/workbook.xml'))
+            hoja = archivo.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('<t>Sosa &amp; Cía</t>', hoja)
+        # 03/02/2001 = día 36925 de Excel; activo=False como booleano
+        self.assertIn(f'<c s="{xlsx.ESTILO_FECHA}"><v>36925</v></c><c t="b"><v>0</v></c></row>', hoja)
+
+    def test_celdas_tipadas(self):
+        self.assertEqual(xlsx.celda(Decimal('7.50')), f'<c s="{xlsx.ESTILO_DECIMAL}"><v>7.50</v></c>')
+        self.assertEqual(xlsx.celda(None), '<c/>')
+        self.assertEqual(xlsx.celda(3), '<c><v>3</v></c>')
+        self.assertEqual(xlsx.celda(True), '<c t="b"><v>1</v></c>')
+        self.assertEqual(xlsx.celda(' a\x01'), '<c t="inlineStr"><is><t xml:space="preserve"> a</t></is></c>')
+
+    def test_hoja_se_envia_por_partes(self):
+        # Textos al azar: comprimen poco, así el compresor entrega bytes durante la exportación
+        Estudiante.objects.bulk_create(
+            Estudiante(nombre=uuid.uuid4().hex, apellido=uuid.uuid4().hex, documento=str(i)) for i in range(3000)
+        )
+        exportador = xlsx.XLSXExporter(views.EstudianteListView.export_columns, titulo='Estudiantes')
+        with mock.patch.object(xlsx, 'FILAS_POR_ESCRITURA', 100):
+            partes = list(exportador.contenido(Estudiante.objects.all()))
+        self.assertGreater(len(partes), 5)
+        self.assertLess(max(map(len, partes)), len(b''.join(partes)) / 3)
+        with zipfile.ZipFile(io.BytesIO(b''.join(partes))) as archivo:
+            self.assertEqual(archivo.read('xl/worksheets/sheet1.xml').count(b'<row '), 3001)
+
+
+@override_settings(REPORTES_DIR=tempfile.mkdtemp())
+class ReporteJobTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+
+    def test_export_pdf_encola_y_reutiliza_trabajo(self):
+        resp = self.client.get(reverse('estudiante_list'), {'export': 'pdf', 'q': 'Sosa'})
+        self.assertEqual(resp.status_code, 202)
+        job = ReporteJob.objects.get(pk=resp.json()['id'])
+        self.assertEqual(job.estado, ReporteJob.PENDIENTE)
+        self.assertEqual(job.parametros, {'q': 'Sosa'})
+        # El mismo pedido reutiliza el trabajo pendiente
+        resp = self.client.get(reverse('estudiante_list'), {'q': 'Sosa', 'export': 'pdf'})
+        self.assertEqual(resp.json()['id'], job.pk)
+        self.assertEqual(ReporteJob.objects.count(), 1)
+
+    def test_worker_genera_archivo_y_permite_descarga(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200')
+        job_id = self.client.get(reverse('estudiante_list'), {'export': 'pdf'}).json()['id']
+        self.assertEqual(reportes.reclamar(5), [job_id])
+        self.assertEqual(reportes.ejecutar(job_id), ReporteJob.LISTO)
+
+        estado = self.client.get(reverse('reporte_estado', kwargs={'pk': job_id})).json()
+        self.assertEqual(estado['estado'], 'listo')
+        resp = self.client.get(estado['descarga_url'])
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="estudiantes.pdf"')
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+
+    def test_archivo_vigente_no_se_reutiliza_si_cambian_los_datos(self):
+        estudiante = Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200')
+        job_id = self.client.get(reverse('estudiante_list'), {'export': 'pdf'}).json()['id']
+        reportes.reclamar(5)
+        reportes.ejecutar(job_id)
+        self.assertEqual(self.client.get(reverse('estudiante_list'), {'export': 'pdf'}).json()['id'], job_id)
+        estudiante.apellido = 'Suárez'
+        estudiante.save()
+        nuevo = self.client.get(reverse('estudiante_list'), {'export': 'pdf'}).json()['id']
+        self.assertNotEqual(nuevo, job_id)
+        self.assertNotEqual(ReporteJob.objects.get(pk=nuevo).clave, ReporteJob.objects.get(pk=job_id).clave)
+
+    @override_settings(REPORTES_TIMEOUT=60)
+    def test_trabajo_abandonado_vuelve_a_la_cola(self):
+        job_id = self.client.get(reverse('estudiante_list'), {'export': 'pdf'}).json()['id']
+        self.assertEqual(reportes.reclamar(5), [job_id])
+        # El worker que lo tomó se cayó: sigue 'procesando' y nadie lo reclama
+        self.assertEqual(reportes.reclamar(5), [])
+        ReporteJob.objects.filter(pk=job_id).update(iniciado=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(reportes.reclamar(5), [job_id])
+        self.assertEqual(reportes.ejecutar(job_id), ReporteJob.LISTO)
+
+
+class ReportePDFTests(TestCase):
+    def test_tablas_por_bloques_comparten_estilo(self):
+        reporte = ReportePDF('Prueba', ['A', 'B'], [100, 100], filas_por_tabla=10)
+        tablas = list(reporte.tablas([str(i), 'x'] for i in range(25)))
+        self.assertEqual([len(t._cellvalues) for t in tablas], [11, 11, 6])
+        self.assertTrue(all(t.repeatRows == 1 for t in tablas))
+
+    def test_render_genera_pdf_multipagina(self):
+        destino = io.BytesIO()
+        ReportePDF('Prueba', ['A', 'B'], [100, 100]).render(destino, ([str(i), 'x'] for i in range(500)))
+        contenido = destino.getvalue()
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertGreater(contenido.count(b'/Type /Page\n'), 5)
+
+
+@override_settings(REPORTES_DIR=tempfile.mkdtemp())
+class BoletinesTests(TestCase):
+    def setUp(self):
+        prof = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.cursos = [Curso.objects.create(codigo=f'B{i}', nombre=f'Curso {i}', profesor=prof) for i in range(3)]
+        self.estudiantes = [
+            Estudiante.objects.create(nombre='Alumno', apellido=f'Apellido {i}', documento=f'D-{i}', activo=i != 4)
+            for i in range(5)
+        ]
+        for i, estudiante in enumerate(self.estudiantes):
+            for curso in self.cursos[:i % 3 + 1]:
+                Matricula.objects.create(estudiante=estudiante, curso=curso, nota=Decimal('7.5'))
+
+    def test_renderizar_lote_consultas_constantes(self):
+        ids = [e.pk for e in self.estudiantes]
+        with CaptureQueriesContext(connection) as consultas:
+            archivos = boletines.renderizar_lote(ids)
+        self.assertEqual(len(consultas.captured_queries), 2)
+        self.assertEqual(sorted(nombre for nombre, _ in archivos), [f'boletin_D-{i}.pdf' for i in range(5)])
+        self.assertTrue(all(datos.startswith(b'%PDF') for _, datos in archivos))
+
+    def test_comando_genera_zip_y_carpeta(self):
+        carpeta = tempfile.mkdtemp()
+        call_command('generate_boletines', '--zip', f'{carpeta}/todos.zip', '--workers', '1', '--lote', '2',
+                     stdout=io.StringIO())
+        with zipfile.ZipFile(f'{carpeta}/todos.zip') as archivo:
+            self.assertEqual(len(archivo.namelist()), 5)
+        call_command('generate_boletines', '--salida', f'{carpeta}/pdfs', '--workers', '1', '--activos',
+                     '--cursos', 'B2', stdout=io.StringIO())
+        # Matriculados en B2 (i % 3 == 2) y activos (i != 4): solo el estudiante 2
+        self.assertEqual(sorted(p.name for p in Path(carpeta, 'pdfs').iterdir()), ['boletin_D-2.pdf'])
+
+    def test_accion_admin_encola_zip_que_genera_el_worker(self):
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+        resp = self.client.post(reverse('admin:core_estudiante_changelist'), {
+            'action': 'generar_boletines', '_selected_action': [e.pk for e in self.estudiantes[:3]],
+        })
+        self.assertEqual(resp.status_code, 302)
+        job = ReporteJob.objects.get()
+        self.assertEqual((job.formato, job.nombre_descarga), ('zip', 'boletines.zip'))
+        self.assertEqual(reportes.ejecutar(job.pk), ReporteJob.LISTO)
+        resp = self.client.get(reverse('reporte_descargar', kwargs={'pk': job.pk}))
+        with zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content))) as archivo:
+            self.assertEqual(sorted(archivo.namelist()), [f'boletin_D-{i}.pdf' for i in range(3)])
+
+
+class BusquedaTests(TestCase):
+    def test_busqueda_estudiantes_ignora_acentos_y_usa_prefijos(self):
+        Estudiante.objects.create(nombre='José', apellido='Pérez', documento='4512')
+        Estudiante.objects.create(nombre='Ana', apellido='Gómez', documento='7788')
+        self.assertEqual(list(Estudiante.objects.buscar('perez').values_list('documento', flat=True)), ['4512'])
+        self.assertEqual(list(Estudiante.objects.buscar('ANA gom').values_list('documento', flat=True)), ['7788'])
+        self.assertEqual(list(Estudiante.objects.buscar('451').values_list('documento', flat=True)), ['4512'])
+
+    def test_indice_sigue_cambios_y_escrituras_masivas(self):
+        e = Estudiante.objects.create(nombre='Luis', apellido='Lopez', documento='1')
+        Estudiante.objects.filter(pk=e.pk).update(apellido='Martínez')
+        Estudiante.objects.bulk_create([Estudiante(nombre='Eva', apellido='Martin', documento='2')])
+        self.assertEqual(Estudiante.objects.buscar('martin').count(), 2)
+        self.assertFalse(Estudiante.objects.buscar('lopez').exists())
+        e.delete()
+        self.assertEqual(Estudiante.objects.buscar('martin').count(), 1)
+
+    def test_busqueda_cursos_por_profesor(self):
+        prof = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        Curso.objects.create(codigo='MAT001', nombre='Matemáticas', profesor=prof)
+        Curso.objects.create(codigo='HIS001', nombre='Historia')
+        self.assertEqual(list(Curso.objects.buscar('matematicas').values_list('codigo', flat=True)), ['MAT001'])
+        prof.apellido = 'Benítez'
+        prof.save()
+        self.assertEqual(list(Curso.objects.buscar('benitez').values_list('codigo', flat=True)), ['MAT001'])
+        self.assertEqual(list(Curso.objects.buscar('his').values_list('codigo', flat=True)), ['HIS001'])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+        # Apellidos repetidos para que el desempate por id importe
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre=f'N{i:02}', apellido=f'A{i % 3}', documento=str(i)) for i in range(25)
+        ])
+        self.esperado = list(Estudiante.objects.order_by('apellido', 'nombre', 'id').values_list('documento', flat=True))
+
+    def _documentos(self, resp):
+        return [e.documento for e in resp.context['object_list']]
+
+    def test_recorre_todas_las_paginas_y_vuelve(self):
+        url = reverse('estudiante_list')
+        vistos, paginas = [], []
+        resp = self.client.get(url)
+        while True:
+            paginas.append(resp)
+            vistos += self._documentos(resp)
+            if not resp.context['page_obj'].has_next():
+                break
+            resp = self.client.get(url + resp.context['page_obj'].url_siguiente)
+        self.assertEqual(vistos, self.esperado)
+        self.assertEqual(len(paginas), 3)
+        anterior = self.client.get(url + paginas[-1].context['page_obj'].url_anterior)
+        self.assertEqual(self._documentos(anterior), self._documentos(paginas[1]))
+
+    def test_no_hace_count_y_conserva_busqueda(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(reverse('estudiante_list'), {'q': 'n'})
+        # Sin COUNT sobre los datos (la detección única del índice FTS consulta sqlite_master)
+        self.assertFalse(any(
+            'COUNT(' in c['sql'].upper() and 'sqlite_master' not in c['sql'] for c in consultas.captured_queries
+        ))
+        self.assertIn('q=n', resp.context['page_obj'].url_siguiente)
+        self.assertIsNone(resp.context['page_obj'].total_estimado)
+
+    def test_cursor_invalido_da_404(self):
+        self.assertEqual(self.client.get(reverse('estudiante_list'), {'cursor': 'basura'}).status_code, 404)
+        # JSON válido con un valor que el campo no acepta (id no numérico)
+        alterado = base64.urlsafe_b64encode(json.dumps(['s', 'a', 'b', 'zz']).encode()).decode()
+        self.assertEqual(self.client.get(reverse('estudiante_list'), {'cursor': alterado}).status_code, 404)
+        alterado = base64.urlsafe_b64encode(json.dumps(['s', 'zz']).encode()).decode()
+        self.assertEqual(self.client.get(reverse('api_estudiantes'), {'cursor': alterado}).status_code, 400)
+
+
+class ImportEstudiantesTests(TestCase):
+    def _importar(self, contenido, sufijo='.csv', **opciones):
+        with tempfile.NamedTemporaryFile('w', suffix=sufijo, encoding='utf-8', delete=False) as archivo:
+            archivo.write(contenido)
+        salida, errores = io.StringIO(), io.StringIO()
+        call_command('import_estudiantes', archivo.name, stdout=salida, stderr=errores, **opciones)
+        return salida.getvalue(), errores.getvalue()
+
+    def test_csv_inserta_actualiza_y_reporta_errores(self):
+        Estudiante.objects.create(nombre='Viejo', apellido='Nombre', documento='100', activo=False)
+        salida, errores = self._importar(
+            "nombre,apellido,documento,email,fecha_nacimiento\n"
+            "Ana,Gómez,100,ana@example.com,2005-03-01\n"
+            "Luis,Pérez,101,,\n"
+            "Sin,Documento,,,\n"
+            "Mala,Fecha,102,,31/31/2005\n",
+            lote=1,
+        )
+        self.assertEqual(Estudiante.objects.count(), 2)
+        ana = Estudiante.objects.get(documento='100')
+        self.assertEqual((ana.nombre, ana.email, str(ana.fecha_nacimiento)), ('Ana', 'ana@example.com', '2005-03-01'))
+        # Sin columna 'activo' se usa el default del modelo
+        self.assertTrue(ana.activo)
+        self.assertIn('Línea 4: documento', errores)
+        self.assertIn('Línea 5: fecha_nacimiento', errores)
+        self.assertIn('2 filas importadas, 2 con errores', salida)
+
+    def test_jsonl_deduplica_y_usa_lotes_con_bulk(self):
+        filas = [{'nombre': f'N{i}', 'apellido': 'A', 'documento': str(i % 50)} for i in range(120)]
+        with CaptureQueriesContext(connection) as consultas:
+            self._importar('\n'.join(json.dumps(f) for f in filas), sufijo='.jsonl', lote=50)
+        self.assertEqual(Estudiante.objects.count(), 50)
+        self.assertEqual(Estudiante.objects.get(documento='0').nombre, 'N100')
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT INTO "core_estudiante"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_validar_no_escribe(self):
+        self._importar("nombre,apellido,documento\nAna,Gómez,1\n", validar=True)
+        self.assertFalse(Estudiante.objects.exists())
+
+
+class CreateSetupTests(TestCase):
+    def _setup(self, *argumentos):
+        salida = io.StringIO()
+        call_command('create_setup', *argumentos, stdout=salida)
+        return salida.getvalue()
+
+    def _datos(self):
+        return (
+            list(Estudiante.objects.order_by('documento').values_list('documento', 'nombre', 'apellido', 'activo')),
+            sorted(Matricula.objects.values_list('estudiante__documento', 'curso__codigo', 'nota')),
+        )
+
+    def test_idempotente_y_crea_usuarios(self):
+        self._setup()
+        datos = self._datos()
+        salida = self._setup()
+        self.assertEqual(self._datos(), datos)
+        self.assertIn('0 filas nuevas', salida)
+        self.assertEqual((Estudiante.objects.count(), Curso.objects.count(), Matricula.objects.count()), (10, 5, 20))
+        self.assertTrue(get_user_model().objects.filter(username='staff', groups__name='staff').exists())
+
+    def test_determinista_y_escala_agregando_lo_que_falta(self):
+        generador.Generador(estudiantes=15, cursos=4, por_estudiante=3, semilla=7).ejecutar()
+        chico = self._datos()
+        Matricula.objects.all().delete()
+        Estudiante.objects.all().delete()
+        generador.Generador(estudiantes=15, cursos=4, por_estudiante=3, semilla=7).ejecutar()
+        self.assertEqual(self._datos(), chico)
+
+        insertadas = generador.Generador(estudiantes=25, cursos=4, por_estudiante=3, semilla=7).ejecutar()
+        self.assertEqual(insertadas, {'profesores': 0, 'cursos': 0, 'estudiantes': 10, 'matriculas': 30})
+        estudiantes, inscripciones = self._datos()
+        self.assertEqual(estudiantes[:15], chico[0])
+        self.assertEqual(len(inscripciones), 75)
+        # Totales e índice de búsqueda al día aunque bulk_create no dispara señales ni triggers
+        self.assertEqual(set(Estudiante.objects.values_list('cantidad_matriculas', flat=True)), {3})
+        primero = Estudiante.objects.get(documento=generador.documento_estudiante(1))
+        self.assertIn(primero, Estudiante.objects.buscar(primero.apellido))
+
+    def test_escala_por_parametros_con_insercion_masiva(self):
+        with CaptureQueriesContext(connection) as consultas:
+            salida = self._setup('--students', '300', '--courses', '20', '--enrollments-per-student', '4', '--lote', '1000')
+        self.assertEqual((Estudiante.objects.count(), Matricula.objects.count()), (300, 1200))
+        # Una sentencia cada cientos de filas (SQLite limita los parámetros por INSERT), no una por fila
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT INTO "core_matricula"')]
+        self.assertLessEqual(len(inserts), 1200 // 200)
+        self.assertIn('filas/s', salida)
+
+
+class MatriculaLoteTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        prof = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.cursos = [Curso.objects.create(codigo=f'C{i}', nombre=f'Curso {i}', profesor=prof) for i in range(3)]
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre=f'N{i}', apellido='A', documento=f'D{i}') for i in range(30)
+        ])
+        self.estudiantes = list(Estudiante.objects.order_by('id').values_list('id', flat=True))
+        Matricula.objects.create(estudiante_id=self.estudiantes[0], curso=self.cursos[0])
+
+    def test_anonimo_va_al_login_aunque_el_curso_no_exista(self):
+        self.client.logout()
+        for pk in (self.cursos[0].pk, self.cursos[-1].pk + 100):
+            url = reverse('curso_matricular_lote', kwargs={'pk': pk})
+            with self.assertNumQueries(0):
+                resp = self.client.get(url)
+            self.assertRedirects(resp, f"{settings.LOGIN_URL}?next={url}", fetch_redirect_response=False)
+
+    def test_consultas_fijas_y_resultado_por_fila(self):
+        # ids de estudiantes, ids de cursos, existentes, el INSERT, los dos
+        # UPDATE de totales y los dos de versiones (más el savepoint)
+        with self.assertNumQueries(10):
+            resultados = matriculas.matricular(self.estudiantes + [999999], [self.cursos[0].pk])
+        self.assertEqual(matriculas.resumen(resultados), {'creada': 29, 'ya_matriculado': 1, 'no_encontrado': 1})
+        self.assertEqual(self.cursos[0].matriculas.count(), 30)
+
+    def test_api_un_estudiante_en_varios_cursos(self):
+        resp = self.client.post(
+            reverse('matricula_lote_api'),
+            json.dumps({'estudiante': self.estudiantes[0], 'cursos': [c.pk for c in self.cursos], 'nota': 8}),
+            content_type='application/json',
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['resumen'], {'creada': 2, 'ya_matriculado': 1, 'no_encontrado': 0})
+        self.assertEqual(Matricula.objects.get(estudiante_id=self.estudiantes[0], curso=self.cursos[2]).nota, 8)
+        malo = self.client.post(reverse('matricula_lote_api'), json.dumps({'curso': 'x'}), content_type='application/json')
+        self.assertEqual(malo.status_code, 400)
+
+    def test_vista_por_documentos(self):
+        resp = self.client.post(
+            reverse('curso_matricular_lote', kwargs={'pk': self.cursos[1].pk}),
+            {'documentos': 'D1\nD2, D3 NOEXISTE\nD1'},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context['resumen'], {'creada': 3, 'ya_matriculado': 0, 'no_encontrado': 1})
+        self.assertEqual(self.cursos[1].matriculas.count(), 3)
+
+    def test_comando_valida_la_nota(self):
+        for nota in ('15', 'NaN', '-1', 'siete'):
+            with self.assertRaisesMessage(CommandError, 'Nota inválida'):
+                call_command('matricular_lote', '--curso', 'C2', '--estudiante', 'D1', '--nota', nota, stdout=io.StringIO())
+        self.assertEqual(self.cursos[2].matriculas.count(), 0)
+        call_command('matricular_lote', '--curso', 'C2', '--documentos', 'D1', 'D2', '--nota', '7.5', stdout=io.StringIO())
+        self.assertEqual(set(self.cursos[2].matriculas.values_list('nota', flat=True)), {Decimal('7.50')})
+
+
+class CursoNotasTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_superuser(username='u', email='u@example.com', password='p')
+        self.client.login(username='u', password='p')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso')
+        estudiantes = [Estudiante.objects.create(nombre='N', apellido=f'A{i}', documento=f'D{i}') for i in range(3)]
+        self.m = [
+            Matricula.objects.create(estudiante=e, curso=self.curso, nota=nota)
+            for e, nota in zip(estudiantes, (Decimal('5'), None, Decimal('7')))
+        ]
+        self.url = reverse('curso_notas', kwargs={'pk': self.curso.pk})
+
+    def test_sin_acceso_no_revela_si_el_curso_existe(self):
+        faltante = reverse('curso_notas', kwargs={'pk': self.curso.pk + 100})
+        self.client.logout()
+        for url in (self.url, faltante):
+            resp = self.client.get(url)
+            self.assertRedirects(resp, f"{settings.LOGIN_URL}?next={url}", fetch_redirect_response=False)
+        get_user_model().objects.create_user(username='sin_permiso', password='p')
+        self.client.login(username='sin_permiso', password='p')
+        for url in (self.url, faltante):
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    def _grilla(self, **cambios):
+        """POST de la grilla como la arma la planilla (originales = notas mostradas)"""
+        claves = {m.pk: f'm{i}' for i, m in enumerate(self.m)}
+        datos = {}
+        for fila in self.client.get(self.url).context['filas']:
+            datos[f"original_{fila['id']}"] = fila['original']
+            datos[f"nota_{fila['id']}"] = cambios.get(claves[fila['id']], fila['valor'])
+        return datos
+
+    def test_guarda_solo_las_filas_cambiadas_con_un_update(self):
+        datos = self._grilla(m0='8,5', m1='6')
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.post(self.url, datos)
+        self.assertEqual(resp.context['actualizadas'], 2)
+        updates = [c for c in consultas.captured_queries if c['sql'].startswith('UPDATE "core_matricula"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            list(Matricula.objects.order_by('estudiante__apellido').values_list('nota', flat=True)),
+            [Decimal('8.5'), Decimal('6'), Decimal('7')],
+        )
+        # Totales del curso al día aunque bulk_update no dispara señales
+        self.curso.refresh_from_db()
+        self.assertEqual((self.curso.cantidad_calificadas, self.curso.promedio_nota), (3, Decimal('7.17')))
+
+    def test_una_fila_invalida_no_guarda_nada(self):
+        resp = self.client.post(self.url, self._grilla(m0='9', m2='11'))
+        self.assertEqual(resp.context['errores'], 1)
+        self.assertEqual(Matricula.objects.get(pk=self.m[0].pk).nota, Decimal('5'))
+
+    def test_conflicto_si_otro_cambio_la_nota(self):
+        datos = self._grilla(m0='9')
+        # Otra persona cambia la nota de m0 (conflicto) y la de m2, que este usuario no tocó
+        Matricula.objects.filter(pk=self.m[0].pk).update(nota=Decimal('6'))
+        Matricula.objects.filter(pk=self.m[2].pk).update(nota=Decimal('4'))
+        resp = self.client.post(self.url, datos)
+        self.assertEqual(resp.context['conflictos'], 1)
+        self.assertEqual(Matricula.objects.get(pk=self.m[0].pk).nota, Decimal('6'))
+        # Al reenviar la planilla marcada se sobrescribe a sabiendas y m2 conserva el cambio ajeno
+        reenvio = {f"nota_{f['id']}": f['valor'] for f in resp.context['filas']}
+        reenvio.update({f"original_{f['id']}": f['original'] for f in resp.context['filas']})
+        self.assertEqual(self.client.post(self.url, reenvio).context['actualizadas'], 1)
+        self.assertEqual(
+            list(Matricula.objects.order_by('estudiante__apellido').values_list('nota', flat=True)),
+            [Decimal('9'), None, Decimal('4')],
+        )
+
+    def test_csv_subido_todo_o_nada(self):
+        malo = self.client.post(self.url, {'cargar_csv': '1', 'texto': 'documento;nota\nD0;9\nNOEXISTE;5\n'})
+        self.assertIn('Documento NOEXISTE: no está matriculado en este curso', malo.context['errores_csv'])
+        self.assertEqual(Matricula.objects.get(pk=self.m[0].pk).nota, Decimal('5'))
+        # Archivo de Excel en español: punto y coma, coma decimal y Windows-1252
+        archivo = io.BytesIO('documento;nota\nD0;9,5\nD1;\nD2;7\n'.encode('cp1252'))
+        archivo.name = 'notas.csv'
+        resp = self.client.post(self.url, {'cargar_csv': '1', 'archivo': archivo})
+        self.assertEqual(resp.context['actualizadas'], 1)
+        self.assertEqual(Matricula.objects.get(pk=self.m[0].pk).nota, Decimal('9.5'))
+
+
+class MatriculaBuscadorTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso', profesor=Profesor.objects.create(nombre='A', apellido='B'))
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre=f'N{i}', apellido='Gómez' if i % 2 else 'Pérez', documento=f'{1000 + i}') for i in range(60)
+        ])
+        self.matriculado = Estudiante.objects.get(documento='1001')
+        Matricula.objects.create(estudiante=self.matriculado, curso=self.curso)
+
+    def test_pagina_no_lista_estudiantes(self):
+        url = reverse('curso_matricular', kwargs={'pk': self.curso.pk})
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(url)
+        Estudiante.objects.bulk_create([Estudiante(nombre='X', apellido='Y', documento=f'9{i}') for i in range(200)])
+        with self.assertNumQueries(len(consultas)):
+            self.client.get(url)
+        self.assertNotContains(resp, '<option')
+
+    def test_sugerencias_limitadas_y_sin_matriculados(self):
+        url = reverse('curso_matricular_buscar', kwargs={'pk': self.curso.pk})
+        resultados = self.client.get(url, {'q': 'gomez', 'limite': 5}).json()['resultados']
+        self.assertEqual(len(resultados), 5)
+        self.assertTrue(all('Gómez' in r['texto'] for r in resultados))
+        todos = self.client.get(url, {'q': 'gomez', 'limite': 500}).json()['resultados']
+        self.assertEqual(len(todos), 20)
+        self.assertNotIn(self.matriculado.pk, [r['id'] for r in self.client.get(url, {'q': '1001'}).json()['resultados']])
+
+    def test_valida_un_solo_id(self):
+        url = reverse('curso_matricular', kwargs={'pk': self.curso.pk})
+        otro = Estudiante.objects.get(documento='1002')
+        self.assertEqual(self.client.post(url, {'estudiante': otro.pk}).status_code, 302)
+        resp = self.client.post(url, {'estudiante': self.matriculado.pk})
+        self.assertFormError(resp.context['form'], 'estudiante', "El alumno no existe o ya está matriculado en este curso")
+
+
+class AgregadosMatriculaTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso')
+        self.e1 = Estudiante.objects.create(nombre='A', apellido='A', documento='1')
+        self.e2 = Estudiante.objects.create(nombre='B', apellido='B', documento='2')
+
+    def test_save_y_delete_actualizan_totales(self):
+        m1 = Matricula.objects.create(estudiante=self.e1, curso=self.curso, nota=Decimal('8'))
+        Matricula.objects.create(estudiante=self.e2, curso=self.curso, nota=Decimal('5'))
+        Matricula.objects.create(estudiante=self.e1, curso=Curso.objects.create(codigo='C2', nombre='Otro'))
+        self.curso.refresh_from_db()
+        self.assertEqual(
+            (self.curso.cantidad_matriculas, self.curso.cantidad_calificadas, self.curso.promedio_nota,
+             self.curso.nota_minima, self.curso.nota_maxima),
+            (2, 2, Decimal('6.50'), Decimal('5'), Decimal('8')),
+        )
+        m1.delete()
+        self.curso.refresh_from_db()
+        self.e1.refresh_from_db()
+        self.assertEqual((self.curso.cantidad_matriculas, self.curso.nota_maxima), (1, Decimal('5')))
+        self.assertEqual((self.e1.cantidad_matriculas, self.e1.cantidad_calificadas, self.e1.promedio_nota), (1, 0, None))
+
+    def test_borrado_en_cascada_recalcula_una_vez(self):
+        otro = Curso.objects.create(codigo='C2', nombre='Otro')
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre='N', apellido='N', documento=f'{100 + i}') for i in range(60)
+        ])
+        ids = list(Estudiante.objects.values_list('id', flat=True))
+        matriculas.matricular(ids, [self.curso.pk, otro.pk], Decimal('6'))
+        version = VersionTabla.objects.get(grupo='matricula').version
+        with CaptureQueriesContext(connection) as consultas:
+            self.curso.delete()
+        self.assertLess(len(consultas), 12)
+        self.assertEqual(VersionTabla.objects.get(grupo='matricula').version, version + 1)
+        self.e1.refresh_from_db()
+        self.assertEqual((self.e1.cantidad_matriculas, self.e1.promedio_nota), (1, Decimal('6.00')))
+
+        with CaptureQueriesContext(connection) as consultas:
+            Estudiante.objects.filter(pk__in=ids[:40]).delete()
+        self.assertLess(len(consultas), 12)
+        otro.refresh_from_db()
+        self.assertEqual(otro.cantidad_matriculas, 22)
+
+    def test_comando_verifica_y_reconstruye(self):
+        Matricula.objects.create(estudiante=self.e1, curso=self.curso, nota=Decimal('7'))
+        Curso.objects.update(cantidad_matriculas=99)
+        with self.assertRaises(CommandError):
+            call_command('recalcular_agregados', verificar=True, stdout=io.StringIO())
+        call_command('recalcular_agregados', stdout=io.StringIO())
+        call_command('recalcular_agregados', verificar=True, stdout=io.StringIO())
+        self.assertEqual(Curso.objects.get().cantidad_matriculas, 1)
+
+    def test_listado_ordenado_por_inscriptos(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        otro = Curso.objects.create(codigo='A0', nombre='Primero por código')
+        matriculas.matricular([self.e1.pk, self.e2.pk], [self.curso.pk])
+        resp = self.client.get(reverse('curso_list'), {'orden': 'inscriptos'})
+        self.assertEqual([c.pk for c in resp.context['object_list']], [self.curso.pk, otro.pk])
+        self.assertEqual(resp.context['object_list'][0].cantidad_matriculas, 2)
+
+
+class EstadisticasTests(TestCase):
+    def setUp(self):
+        prof = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.c1 = Curso.objects.create(codigo='C1', nombre='Uno', profesor=prof)
+        self.c2 = Curso.objects.create(codigo='C2', nombre='Dos')
+        self.notas = {self.c1: ['2', '5.5', '6', '6', '7.25', '10'], self.c2: ['4', '9']}
+        for curso, notas in self.notas.items():
+            Estudiante.objects.bulk_create([
+                Estudiante(nombre='N', apellido='A', documento=f'{curso.codigo}-{i}') for i in range(len(notas) + 1)
+            ])
+            for i, nota in enumerate(notas + [None]):
+                Matricula.objects.create(estudiante=Estudiante.objects.get(documento=f'{curso.codigo}-{i}'),
+                                         curso=curso, nota=None if nota is None else Decimal(nota))
+
+    @staticmethod
+    def _percentil(valores, p):
+        valores = sorted(valores)
+        posicion = (len(valores) - 1) * p / 100
+        inferior = int(posicion)
+        superior = min(inferior + 1, len(valores) - 1)
+        return valores[inferior] + (valores[superior] - valores[inferior]) * Decimal(str(posicion - inferior))
+
+    def test_distribucion_por_curso_en_dos_consultas(self):
+        with self.assertNumQueries(2):
+            resultado = {d.clave: d for d in estadisticas.distribuciones('curso')}
+        d = resultado[self.c1.pk]
+        valores = [Decimal(n) for n in self.notas[self.c1]]
+        self.assertEqual(d.cantidad, 6)
+        self.assertEqual(d.promedio, Decimal('6.13'))
+        for p in estadisticas.PERCENTILES:
+            self.assertEqual(d.percentiles[p], self._percentil(valores, p).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        self.assertEqual(d.histograma, [0, 0, 1, 0, 0, 1, 2, 1, 0, 1])
+        self.assertEqual((d.aprobados, d.porcentaje_aprobados), (4, Decimal('66.67')))
+        self.assertEqual(resultado[self.c2.pk].mediana, Decimal('6.50'))
+
+    def test_niveles_profesor_y_general(self):
+        por_profesor = {d.nombre: d.cantidad for d in estadisticas.distribuciones('profesor')}
+        self.assertEqual(por_profesor, {'Gomez, Ana': 6, 'Sin profesor': 2})
+        general, = estadisticas.distribuciones('general')
+        self.assertEqual((general.cantidad, general.minima, general.maxima), (8, Decimal('2'), Decimal('10')))
+
+    def test_tablero_y_exportaciones(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        url = reverse('estadisticas')
+        self.assertContains(self.client.get(url), 'C1 - Uno')
+        datos = self.client.get(url, {'nivel': 'profesor', 'export': 'json'}).json()
+        self.assertEqual([r['cantidad'] for r in datos['resultados']], [6, 2])
+        csv_texto = b''.join(self.client.get(url, {'export': 'csv'}).streaming_content).decode()
+        self.assertEqual(len(csv_texto.strip().splitlines()), 3)
+        self.assertEqual(self.client.get(url, {'nivel': 'x'}).status_code, 404)
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso')
+        self.estudiante = Estudiante.objects.create(nombre='Juan', apellido='Perez', documento='1')
+
+    def test_304_sin_consultar_datos_hasta_que_cambian(self):
+        url = reverse('estudiante_list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        tablas = [q['sql'] for q in consultas if 'core_' in q['sql']]
+        self.assertEqual(len(tablas), 1)
+        self.assertIn('core_versiontabla', tablas[0])
+        self.estudiante.nombre = 'Juana'
+        self.estudiante.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_export_csv_tiene_su_propio_etag(self):
+        url = reverse('curso_list')
+        etag_html = self.client.get(url)['ETag']
+        resp = self.client.get(url, {'export': 'csv'})
+        self.assertNotEqual(resp['ETag'], etag_html)
+        self.assertTrue(resp.has_header('Last-Modified'))
+        self.assertEqual(self.client.get(url, {'export': 'csv'}, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, {'export': 'csv'}, HTTP_IF_NONE_MATCH=etag_html).status_code, 200)
+
+    def test_matricula_masiva_cambia_el_etag_del_detalle(self):
+        url = reverse('curso_detail', kwargs={'pk': self.curso.pk})
+        etag = self.client.get(url)['ETag']
+        matriculas.matricular([self.estudiante.pk], [self.curso.pk])
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'Perez')
+
+    def test_renombrar_profesor_actualiza_detalle_de_estudiante(self):
+        profesor = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.curso.profesor = profesor
+        self.curso.save()
+        matriculas.matricular([self.estudiante.pk], [self.curso.pk])
+        url = reverse('estudiante_detail', kwargs={'pk': self.estudiante.pk})
+        resp = self.client.get(url)
+        self.assertContains(resp, 'Prof: Ana')
+        profesor.nombre = 'Beatriz'
+        profesor.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'Prof: Beatriz')
+
+class APITests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        self.profesor = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso', profesor=self.profesor)
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre=f'N{i}', apellido='Gómez' if i % 2 else 'Pérez', documento=f'{1000 + i}') for i in range(25)
+        ])
+        matriculas.matricular(Estudiante.objects.values_list('id', flat=True), [self.curso.pk], Decimal('7.50'))
+
+    def test_campos_busqueda_y_cursor(self):
+        url = reverse('api_estudiantes')
+        datos = self.client.get(url, {'fields': 'apellido,promedio_nota', 'q': 'gomez', 'limite': 5}).json()
+        self.assertEqual(len(datos['resultados']), 5)
+        self.assertEqual(set(datos['resultados'][0]), {'id', 'apellido', 'promedio_nota'})
+        self.assertEqual(datos['resultados'][0]['promedio_nota'], 7.5)
+        vistos = [r['id'] for r in datos['resultados']]
+        while datos['siguiente']:
+            datos = self.client.get(datos['siguiente']).json()
+            vistos += [r['id'] for r in datos['resultados']]
+        self.assertEqual(len(vistos), 12)
+        self.assertEqual(vistos, sorted(vistos))
+
+    def test_errores_detalle_y_filtros(self):
+        self.assertEqual(self.client.get(reverse('api_estudiantes'), {'fields': 'clave'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_profesores'), {'q': 'ana'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_cursos'), {'cursor': 'x'}).status_code, 400)
+        curso = self.client.get(reverse('api_cursos_detalle', kwargs={'pk': self.curso.pk})).json()
+        self.assertEqual((curso['profesor'], curso['profesor__nombre'], curso['cantidad_matriculas']), (self.profesor.pk, 'Ana', 25))
+        self.assertEqual(self.client.get(reverse('api_cursos_detalle', kwargs={'pk': 999})).status_code, 404)
+        filtradas = self.client.get(reverse('api_matriculas'), {'curso': self.curso.pk, 'limite': 1000}).json()
+        self.assertEqual(len(filtradas['resultados']), 25)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_profesores')).status_code, 403)
+
+    def test_ndjson_sin_instanciar_modelos(self):
+        with self.assertNumQueries(4):
+            resp = self.client.get(reverse('api_matriculas'), {'formato': 'ndjson', 'fields': 'nota'})
+            lineas = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(lineas), 25)
+        self.assertEqual(set(json.loads(lineas[0])), {'id', 'nota'})
+
+
+class ColumnarTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        self.profesor = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso', profesor=self.profesor)
+        Estudiante.objects.bulk_create([
+            Estudiante(nombre=f'N{i}', apellido='Gómez', documento=f'{1000 + i}', activo=bool(i % 2)) for i in range(25)
+        ])
+        ids = list(Estudiante.objects.values_list('id', flat=True))
+        matriculas.matricular(ids[:20], [self.curso.pk], Decimal('7.50'))
+        matriculas.matricular(ids[20:], [self.curso.pk], None)
+
+    @skipUnless(columnar.disponible(), "requiere pyarrow")
+    def test_api_parquet_con_tipos(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        resp = self.client.get(reverse('api_matriculas'), {'formato': 'parquet'})
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="matriculas.parquet"')
+        tabla = pq.read_table(io.BytesIO(b''.join(resp.streaming_content)))
+        self.assertEqual(tabla.num_rows, 25)
+        self.assertEqual(tabla.schema.field('estudiante_id').type, pa.int64())
+        self.assertEqual(tabla.schema.field('fecha').type, pa.date32())
+        self.assertEqual(tabla.schema.field('nota').type, pa.decimal128(4, 2))
+        self.assertEqual(tabla.column('nota').null_count, 5)
+        self.assertEqual(tabla.column('nota')[0].as_py(), Decimal('7.50'))
+
+        resp = self.client.get(reverse('api_matriculas'), {'formato': 'arrow', 'desnormalizado': '1'})
+        tabla = pa.ipc.open_file(b''.join(resp.streaming_content)).read_all()
+        self.assertEqual(set(tabla.column('curso_codigo').to_pylist()), {'C1'})
+        self.assertEqual(set(tabla.column('curso_profesor_id').to_pylist()), {self.profesor.pk})
+        self.assertEqual(self.client.get(reverse('api_matriculas'), {'formato': 'arrow', 'compresion': 'gzip'}).status_code, 400)
+
+    @skipUnless(columnar.disponible(), "requiere pyarrow")
+    def test_comando_escribe_por_lotes(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as carpeta:
+            call_command('exportar_columnar', '--salida', carpeta, '--lote', '10', '--desnormalizar', stdout=io.StringIO())
+            archivos = sorted(p.name for p in Path(carpeta).iterdir())
+            self.assertEqual(archivos, sorted(f'{t}.parquet' for t in [*columnar.TABLAS, columnar.DESNORMALIZADA]))
+            estudiantes = pq.ParquetFile(Path(carpeta) / 'estudiantes.parquet')
+            self.assertEqual(estudiantes.metadata.num_row_groups, 3)
+            tabla = estudiantes.read()
+            self.assertEqual(tabla.column('activo').to_pylist(), [bool(i % 2) for i in range(25)])
+            self.assertEqual(tabla.column('cantidad_matriculas').to_pylist(), [1] * 25)
+
+    def test_sin_pyarrow(self):
+        with mock.patch.object(columnar, 'pa', None):
+            with self.assertRaisesMessage(CommandError, 'pip install pyarrow'):
+                call_command('exportar_columnar', '--salida', tempfile.gettempdir())
+            resp = self.client.get(reverse('api_matriculas'), {'formato': 'parquet'})
+        self.assertEqual(resp.status_code, 501)
+
+class VistasAsyncTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='u', password='p')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso', profesor=Profesor.objects.create(nombre='Ana', apellido='Gomez'))
+        self.estudiante = Estudiante.objects.create(nombre='Juan', apellido='Perez', documento='1')
+        Matricula.objects.create(estudiante=self.estudiante, curso=self.curso, nota=Decimal('8'))
+
+    def _get(self, vista, url, usuario=None, **kwargs):
+        """Ejecuta la vista async como lo haría el servidor ASGI y renderiza la respuesta"""
+        request = RequestFactory().get(url)
+        usuario = usuario or self.user
+
+        async def auser():
+            return usuario
+        request.auser = auser
+        response = async_to_sync(vista.as_view())(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_listados_detalles_y_home(self):
+        casos = [
+            (views.EstudianteListAsyncView, '/estudiantes/?q=perez', {}, 'Perez'),
+            (views.CursoListAsyncView, '/cursos/?orden=inscriptos', {}, 'Gomez'),
+            (views.ProfesorListAsyncView, '/profesores/', {}, 'Gomez'),
+            (views.EstudianteDetailAsyncView, '/estudiantes/1/', {'pk': self.estudiante.pk}, 'Perez'),
+            (views.CursoDetailAsyncView, '/cursos/1/', {'pk': self.curso.pk}, 'Perez'),
+        ]
+        for vista, url, kwargs, texto in casos:
+            self.assertContains(self._get(vista, url, **kwargs), texto)
+        request = RequestFactory().get('/')
+        request.user = self.user
+        response = async_to_sync(views.home_async)(request)
+        self.assertContains(response.render(), 'Perez')
+        with self.assertRaises(Http404):
+            self._get(views.CursoDetailAsyncView, '/cursos/999/', pk=999)
+
+    def test_export_csv_con_iterador_asincrono(self):
+        response = self._get(views.EstudianteListAsyncView, '/estudiantes/?export=csv')
+        self.assertTrue(response.is_async)
+
+        async def leer():
+            return b''.join([parte async for parte in response.streaming_content])
+        lineas = async_to_sync(leer)().decode().splitlines()
+        self.assertEqual(len(lineas), 2)
+        self.assertIn('Perez', lineas[1])
+
+    def test_sin_sesion_redirige_y_etag(self):
+        self.assertEqual(self._get(views.CursoListAsyncView, '/cursos/', usuario=AnonymousUser()).status_code, 302)
+        etag = self._get(views.CursoListAsyncView, '/cursos/')['ETag']
+        request = RequestFactory().get('/cursos/', HTTP_IF_NONE_MATCH=etag)
+
+        async def auser():
+            return self.user
+        request.auser = auser
+        self.assertEqual(async_to_sync(views.CursoListAsyncView.as_view())(request).status_code, 304)
+
+# TransactionTestCase: dentro de una transacción (TestCase) no se guarda nada en caché
+class CacheTests(TransactionTestCase):
+    def setUp(self):
+        django_cache.clear()
+        User = get_user_model()
+        User.objects.create_user(username='u', password='p')
+        self.client.login(username='u', password='p')
+        self.profesor = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Curso', profesor=self.profesor)
+        self.estudiante = Estudiante.objects.create(nombre='Juan', apellido='Perez', documento='1')
+
+    def _consultas_core(self, url):
+        """Consultas a tablas de core (las de sesión, usuario y versiones no cuentan)"""
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(url)
+        return resp, [q['sql'] for q in consultas if 'core_' in q['sql'] and 'core_versiontabla' not in q['sql']]
+
+    def test_paginas_cacheadas_hasta_guardar(self):
+        for url in (reverse('home'), reverse('estudiante_list'), reverse('curso_list'),
+                    reverse('profesor_list'), reverse('curso_detail', kwargs={'pk': self.curso.pk})):
+            self.client.get(url)
+            resp, consultas = self._consultas_core(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(consultas, [], url)
+        self.estudiante.nombre = 'Juana'
+        self.estudiante.save()
+        resp, consultas = self._consultas_core(reverse('estudiante_list'))
+        self.assertContains(resp, 'Juana')
+        self.assertTrue(consultas)
+        self.assertContains(self.client.get(reverse('home')), 'Juana')
+
+    def test_matricula_masiva_e_import_invalidan(self):
+        url = reverse('curso_detail', kwargs={'pk': self.curso.pk})
+        self.assertNotContains(self.client.get(url), 'Perez')
+        matriculas.matricular([self.estudiante.pk], [self.curso.pk])
+        self.assertContains(self.client.get(url), 'Perez')
+        lista = reverse('estudiante_list')
+        self.client.get(lista)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as archivo:
+            archivo.write('nombre,apellido,documento\nJuan,Importado,1\n')
+        call_command('import_estudiantes', archivo.name, stdout=io.StringIO())
+        self.assertContains(self.client.get(lista), 'Importado')
+
+    def test_no_guarda_dentro_de_transacciones(self):
+        calculos = []
+        with transaction.atomic():
+            cache_core.obtener('prueba', ('curso',), (), lambda: calculos.append(1))
+        cache_core.obtener('prueba', ('curso',), (), lambda: calculos.append(1))
+        cache_core.obtener('prueba', ('curso',), (), lambda: calculos.append(1))
+        self.assertEqual(len(calculos), 2)
+        versiones.registrar_cambio('curso')
+        cache_core.obtener('prueba', ('curso',), (), lambda: calculos.append(1))
+        self.assertEqual(len(calculos), 3)
+
+    def test_cambio_de_otro_proceso_invalida(self):
+        # Otro worker confirma un cambio: solo se entera la base, no la caché de este proceso
+        url = reverse('estudiante_list')
+        self.client.get(url)
+        Estudiante.objects.filter(pk=self.estudiante.pk).update(nombre='Juana')
+        VersionTabla.objects.filter(grupo='estudiante').update(version=F('version') + 1)
+        self.assertContains(self.client.get(url), 'Juana')
+
+
+class BaseDatosTests(TestCase):
+    """Perfil de SQLite aplicado al abrir cada conexión (settings.DATABASES)"""
+
+    def _pragma(self, cursor, nombre):
+        cursor.execute(f"PRAGMA {nombre}")
+        return cursor.fetchone()[0]
+
+    def test_pragmas_aplicados_en_la_conexion(self):
+        with connection.cursor() as cursor:
+            self.assertEqual(self._pragma(cursor, 'synchronous'), 1)  # NORMAL
+            self.assertEqual(self._pragma(cursor, 'cache_size'), -65536)
+            self.assertEqual(self._pragma(cursor, 'temp_store'), 2)  # MEMORY
+            self.assertEqual(self._pragma(cursor, 'busy_timeout'), 20000)
+
+    def test_archivo_nuevo_en_modo_wal(self):
+        """La base de prueba está en memoria: se abre una en disco con la misma configuración"""
+        with tempfile.TemporaryDirectory() as carpeta:
+            ajustes = {**connection.settings_dict, 'NAME': f"{carpeta}/wal.sqlite3"}
+            conexion = type(connections['default'])(ajustes, alias='wal')
+            try:
+                with conexion.cursor() as cursor:
+                    self.assertEqual(self._pragma(cursor, 'journal_mode'), 'wal')
+                self.assertEqual(conexion.transaction_mode, 'IMMEDIATE')
+            finally:
+                conexion.close()
+
+
+    def _ajustes(self, **entorno):
+        """Carga sistema_escolar/settings.py con otro entorno y devuelve DATABASES['default']"""
+        from sistema_escolar import settings as modulo
+        variables = ('DB_ENGINE', 'DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT', 'DB_CONN_MAX_AGE')
+        try:
+            with mock.patch.dict(os.environ, entorno):
+                for variable in variables:
+                    os.environ.pop(variable, None)
+                return importlib.reload(modulo).DATABASES['default']
+        finally:
+            importlib.reload(modulo)
+
+    def test_postgres_con_pool_desde_database_url(self):
+        base = self._ajustes(DATABASE_URL='postgresql://u:p@h:5433/db', DB_POOL_MAX_SIZE='5')
+        self.assertEqual(base['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((base['NAME'], base['USER'], base['PASSWORD']), ('db', 'u', 'p'))
+        self.assertEqual((base['HOST'], base['PORT']), ('h', '5433'))
+        self.assertEqual(base['OPTIONS']['pool'], {'min_size': 2, 'max_size': 5, 'timeout': 10})
+        # El pool y las conexiones persistentes son excluyentes
+        self.assertEqual(base['CONN_MAX_AGE'], 0)
+
+    def test_postgres_sin_pool_usa_conexiones_persistentes(self):
+        base = self._ajustes(DATABASE_URL='postgres://u@h/db', DB_POOL_MAX_SIZE='0')
+        self.assertNotIn('pool', base['OPTIONS'])
+        self.assertEqual(base['CONN_MAX_AGE'], 60)
+        self.assertEqual(base['PORT'], '')
+
+
+class IndicesTests(TestCase):
+    """Las consultas de listados y detalles usan índices (EXPLAIN QUERY PLAN de SQLite)"""
+
+    def setUp(self):
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+        self.profesor = Profesor.objects.create(nombre='Ana', apellido='Gomez')
+        self.curso = Curso.objects.create(codigo='C1', nombre='Historia', profesor=self.profesor)
+        self.estudiante = Estudiante.objects.create(nombre='Juan', apellido='Perez', documento='1')
+        Matricula.objects.create(estudiante=self.estudiante, curso=self.curso, nota=Decimal('7'))
+
+    def _recorridos_completos(self, consultas):
+        """Pasos 'SCAN <tabla>' sin índice de las consultas capturadas"""
+        recorridos = []
+        with connection.cursor() as cursor:
+            for consulta in consultas:
+                if not consulta['sql'].startswith('SELECT') or 'sqlite_master' in consulta['sql']:
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + consulta['sql'])
+                recorridos += [
+                    f"{detalle} <- {consulta['sql'][:80]}"
+                    for *_, detalle in cursor.fetchall()
+                    if detalle.startswith('SCAN ') and ' USING ' not in detalle
+                ]
+        return recorridos
+
+    def test_listados_y_detalles_sin_recorridos_completos(self):
+        urls = [
+            reverse('estudiante_list'),
+            reverse('estudiante_list') + '?activos=1',
+            reverse('estudiante_list') + '?orden=matriculas',
+            reverse('curso_list'),
+            reverse('curso_list') + '?orden=inscriptos',
+            reverse('profesor_list'),
+            reverse('estudiante_detail', args=[self.estudiante.pk]),
+            reverse('curso_detail', args=[self.curso.pk]),
+            reverse('profesor_detail', args=[self.profesor.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual(self._recorridos_completos(consultas.captured_queries), [])
+
+    def test_activos_y_anti_join_usan_sus_indices(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('estudiante_list'), {'activos': '1'})
+            list(matriculas.no_matriculados(self.curso).filter(pk=self.estudiante.pk))
+        planes = []
+        with connection.cursor() as cursor:
+            for consulta in consultas.captured_queries:
+                if 'core_estudiante' in consulta['sql'] and consulta['sql'].startswith('SELECT'):
+                    cursor.execute('EXPLAIN QUERY PLAN ' + consulta['sql'])
+                    planes += [detalle for *_, detalle in cursor.fetchall()]
+        self.assertIn('SCAN core_estudiante USING INDEX estudiante_activos_idx', planes)
+        # Anti-join de MatriculaForm: busca por el índice (estudiante, curso), sin recorrer matrículas
+        self.assertTrue(any(
+            p.startswith('SEARCH ') and ' INDEX ' in p and '(estudiante_id=? AND curso_id=?)' in p for p in planes
+        ), planes)
+        self.assertEqual(self._recorridos_completos(consultas.captured_queries), [])
+
+
+# Consultas máximas por pedido GET de cada URL de core/urls.py, con los datos
+# de PresupuestoConsultasTests (varias filas relacionadas: un N+1 se pasa del
+# presupuesto). Incluyen sesión, usuario y versiones (core.versiones).
+PRESUPUESTO_CONSULTAS = {
+    'home': 6,
+    'estudiante_list': 6, 'estudiante_add': 2, 'estudiante_detail': 5, 'estudiante_edit': 3, 'estudiante_delete': 3,
+    'curso_list': 6, 'curso_add': 3, 'curso_detail': 6, 'curso_edit': 4, 'curso_delete': 3,
+    'curso_matricular': 4, 'curso_matricular_buscar': 4, 'curso_matricular_lote': 3, 'matricula_lote_api': 2,
+    'curso_notas': 4,
+    'profesor_list': 4, 'profesor_detail': 5, 'profesor_add': 2, 'profesor_edit': 3, 'profesor_delete': 3,
+    'estadisticas': 6, 'metricas': 2, 'metricas_prometheus': 2, 'reporte_estado': 3, 'reporte_descargar': 3,
+    'api_estudiantes': 4, 'api_estudiantes_detalle': 4, 'api_cursos': 4, 'api_cursos_detalle': 4,
+    'api_profesores': 4, 'api_profesores_detalle': 4, 'api_matriculas': 4, 'api_matriculas_detalle': 4,
+}
+
+
+class PresupuestoConsultasTests(TestCase):
+    """Cada URL tiene un máximo de consultas SQL: las regresiones N+1 fallan aquí"""
+
+    def setUp(self):
+        usuario = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+        profesores = [Profesor.objects.create(nombre=f'Prof{i}', apellido='Gomez') for i in range(3)]
+        cursos = [Curso.objects.create(codigo=f'C{i}', nombre='Curso', profesor=profesores[i % 3]) for i in range(4)]
+        estudiantes = [Estudiante.objects.create(nombre='Juan', apellido=f'Perez{i}', documento=str(i)) for i in range(5)]
+        matriculas_creadas = [
+            Matricula.objects.create(estudiante=e, curso=c, nota=Decimal('7')) for e in estudiantes for c in cursos
+        ]
+        reporte = ReporteJob.objects.create(
+            vista='x', clave='k', estado=ReporteJob.LISTO, archivo='no-existe.pdf', nombre_descarga='r.pdf', usuario=usuario,
+        )
+        self.pks = {
+            'estudiante': estudiantes[0].pk, 'curso': cursos[0].pk, 'profesor': profesores[0].pk, 'reporte': reporte.pk,
+            'api_estudiantes': estudiantes[0].pk, 'api_cursos': cursos[0].pk, 'api_profesores': profesores[0].pk,
+            'api_matriculas': matriculas_creadas[0].pk,
+        }
+
+    def assertPresupuestoConsultas(self, url, presupuesto):
+        """Falla si el GET a `url` hace más de `presupuesto` consultas (o responde 5xx)"""
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(url)
+        self.assertLess(resp.status_code, 500)
+        detalle = '\n'.join(c['sql'][:120] for c in consultas.captured_queries)
+        self.assertLessEqual(
+            len(consultas.captured_queries), presupuesto,
+            f"{url}: {len(consultas.captured_queries)} consultas (presupuesto {presupuesto})\n{detalle}",
+        )
+
+    def _url(self, patron):
+        if 'pk' not in patron.pattern.converters:
+            return reverse(patron.name)
+        prefijo = patron.name.removesuffix('_detalle') if patron.name.startswith('api_') else patron.name.split('_')[0]
+        return reverse(patron.name, kwargs={'pk': self.pks[prefijo]})
+
+    def test_todas_las_urls_respetan_su_presupuesto(self):
+        from . import urls
+        for patron in urls.urlpatterns:
+            with self.subTest(url=patron.name):
+                self.assertIn(patron.name, PRESUPUESTO_CONSULTAS, "URL nueva sin presupuesto de consultas")
+                self.assertPresupuestoConsultas(self._url(patron), PRESUPUESTO_CONSULTAS[patron.name])
+
+    def test_detalle_estudiante_muestra_cursos_y_profesor_sin_n_mas_1(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(reverse('estudiante_detail', args=[self.pks['estudiante']]))
+        self.assertContains(resp, '(Prof: Prof0)')
+        self.assertContains(resp, '(Prof: Prof2)')
+        self.assertNotContains(resp, 'no está matriculado')
+        self.assertEqual(sum('core_matricula' in c['sql'] for c in consultas.captured_queries), 1)
+
+
+class MetricasTests(TestCase):
+    def setUp(self):
+        metricas.REGISTRO.reiniciar()
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+
+    def test_server_timing_cuenta_consultas_y_plantillas(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200')
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(reverse('estudiante_list'))
+        timing = resp['Server-Timing']
+        self.assertIn(f'desc="{len(consultas.captured_queries)} consultas"', timing)
+        self.assertRegex(timing, r'^sql;dur=[\d.]+;desc="\d+ consultas", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        self.assertNotRegex(timing, r'tpl;dur=0\.0,')
+
+    def test_endpoint_resume_por_ruta(self):
+        for _ in range(3):
+            self.client.get(reverse('profesor_list'))
+        resp = self.client.get(reverse('metricas'))
+        rutas = {fila['ruta']: fila for fila in resp.json()['rutas']}
+        self.assertEqual(rutas['profesores/']['pedidos'], 3)
+        self.assertEqual(rutas['profesores/']['errores'], 0)
+        self.assertGreater(rutas['profesores/']['consultas_promedio'], 0)
+        self.assertGreaterEqual(rutas['profesores/']['p95_ms'], rutas['profesores/']['p50_ms'])
+
+    def test_endpoint_solo_staff_o_ip_interna(self):
+        get_user_model().objects.create_user(username='comun', password='secret')
+        self.client.login(username='comun', password='secret')
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+        with override_settings(INTERNAL_IPS=['127.0.0.1']):
+            self.assertEqual(self.client.get(reverse('metricas')).status_code, 200)
+
+
+class PrometheusTests(TestCase):
+    def setUp(self):
+        prometheus.reiniciar()
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret')
+        self.client.login(username='admin', password='secret')
+
+    def test_histograma_por_nombre_de_url_y_exportaciones(self):
+        Estudiante.objects.create(nombre='Carla', apellido='Sosa', documento='200')
+        self.client.get(reverse('estudiante_list'))
+        resp = self.client.get(reverse('estudiante_list'), {'export': 'csv'})
+        cuerpo = b''.join(resp.streaming_content)
+        texto = self.client.get(reverse('metricas_prometheus')).content.decode()
+        self.assertIn('# TYPE sistema_escolar_http_duracion_segundos histogram', texto)
+        self.assertIn('sistema_escolar_http_duracion_segundos_count{vista="estudiante_list",metodo="GET"} 2', texto)
+        self.assertIn('sistema_escolar_http_duracion_segundos_bucket{vista="estudiante_list",metodo="GET",le="+Inf"} 2', texto)
+        self.assertIn('sistema_escolar_http_respuestas_total{vista="estudiante_list",codigo="200"} 2', texto)
+        self.assertRegex(texto, r'sistema_escolar_db_consultas_total\{vista="estudiante_list"\} [1-9]')
+        self.assertIn('sistema_escolar_exportacion_duracion_segundos_count{exportador="estudiantes",formato="csv"} 1', texto)
+        self.assertIn(f'sistema_escolar_exportacion_bytes_total{{exportador="estudiantes",formato="csv"}} {len(cuerpo)}', texto)
+
+    def test_modo_multiproceso_suma_los_archivos_de_cada_proceso(self):
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(METRICAS_DIR=carpeta):
+            # Otro worker que ya volcó sus totales
+            with open(f"{carpeta}/999-otro.json", 'w') as archivo:
+                json.dump({prometheus.HTTP_RESPUESTAS.nombre: [[['home', '200'], 5]]}, archivo)
+            prometheus.registrar_pedido('home', 'GET', 200, 0.01, 3, 0.001)
+            texto = prometheus.texto()
+        self.assertIn('sistema_escolar_http_respuestas_total{vista="home",codigo="200"} 6', texto)
+        self.assertIn('sistema_escolar_db_consultas_total{vista="home"} 3', texto)
+
+    def test_acceso_con_token(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('metricas_prometheus')).status_code, 403)
+        with override_settings(METRICAS_TOKEN='secreto'):
+            resp = self.client.get(reverse('metricas_prometheus'), HTTP_AUTHORIZATION='Bearer secreto')
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp['Content-Type'].startswith('text/plain; version=0.0.4'))
+            self.assertEqual(
+                self.client.get(reverse('metricas_prometheus'), HTTP_AUTHORIZATION='Bearer otro').status_code, 403,
+            )
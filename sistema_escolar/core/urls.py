@@ -1,31 +1,60 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+
+def lectura(vista, vista_async):
+    """Vista de solo lectura: la versión async si VISTAS_ASYNC está activo (servidor ASGI)"""
+    return vista_async if settings.VISTAS_ASYNC else vista
+
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', lectura(views.home, views.home_async), name='home'),
 
     # Estudiantes
-    path('estudiantes/', views.EstudianteListView.as_view(), name='estudiante_list'),
+    path('estudiantes/', lectura(views.EstudianteListView, views.EstudianteListAsyncView).as_view(), name='estudiante_list'),
     path('estudiantes/add/', views.EstudianteCreateView.as_view(), name='estudiante_add'),
-    path('estudiantes/<int:pk>/', views.EstudianteDetailView.as_view(), name='estudiante_detail'),
+    path('estudiantes/<int:pk>/', lectura(views.EstudianteDetailView, views.EstudianteDetailAsyncView).as_view(), name='estudiante_detail'),
     path('estudiantes/<int:pk>/edit/', views.EstudianteUpdateView.as_view(), name='estudiante_edit'),
     path('estudiantes/<int:pk>/delete/', views.EstudianteDeleteView.as_view(), name='estudiante_delete'),
 
     # Cursos
-    path('cursos/', views.CursoListView.as_view(), name='curso_list'),
+    path('cursos/', lectura(views.CursoListView, views.CursoListAsyncView).as_view(), name='curso_list'),
     path('cursos/add/', views.CursoCreateView.as_view(), name='curso_add'),
-    path('cursos/<int:pk>/', views.CursoDetailView.as_view(), name='curso_detail'),
+    path('cursos/<int:pk>/', lectura(views.CursoDetailView, views.CursoDetailAsyncView).as_view(), name='curso_detail'),
     path('cursos/<int:pk>/edit/', views.CursoUpdateView.as_view(), name='curso_edit'),
     path('cursos/<int:pk>/delete/', views.CursoDeleteView.as_view(), name='curso_delete'),
     
     # AÑADIDO: URL para Matricular alumnos
     path('cursos/<int:pk>/matricular/', views.MatriculaCreateView.as_view(), name='curso_matricular'),
+    path('cursos/<int:pk>/matricular/estudiantes/', views.MatriculaBuscarEstudiantesView.as_view(), name='curso_matricular_buscar'),
+    path('cursos/<int:pk>/matricular/lote/', views.MatriculaLoteView.as_view(), name='curso_matricular_lote'),
+    path('cursos/<int:pk>/notas/', views.CursoNotasView.as_view(), name='curso_notas'),
+    path('matriculas/lote/', views.MatriculaLoteAPIView.as_view(), name='matricula_lote_api'),
 
     # Profesores
-    path('profesores/', views.ProfesorListView.as_view(), name='profesor_list'),
+    path('profesores/', lectura(views.ProfesorListView, views.ProfesorListAsyncView).as_view(), name='profesor_list'),
     path('profesores/<int:pk>/', views.ProfesorDetailView.as_view(), name='profesor_detail'),
     # CORREGIDO: Se elimina el 'as_as_view' extra
     path('profesores/nuevo/', views.ProfesorCreateView.as_view(), name='profesor_add'), 
     path('profesores/<int:pk>/editar/', views.ProfesorUpdateView.as_view(), name='profesor_edit'),
     path('profesores/<int:pk>/borrar/', views.ProfesorDeleteView.as_view(), name='profesor_delete'),
-]
\ No newline at end of file
+
+    # Estadísticas de notas
+    path('estadisticas/', views.EstadisticasView.as_view(), name='estadisticas'),
+
+    # Métricas de rendimiento por ruta (staff o INTERNAL_IPS)
+    path('metricas/', views.MetricasView.as_view(), name='metricas'),
+    path('metrics', views.MetricasPrometheusView.as_view(), name='metricas_prometheus'),
+
+    # Reportes en segundo plano
+    path('reportes/<int:pk>/', views.ReporteEstadoView.as_view(), name='reporte_estado'),
+    path('reportes/<int:pk>/descargar/', views.ReporteDescargarView.as_view(), name='reporte_descargar'),
+]
+
+# API JSON de solo lectura: /api/v1/<recurso>/ y /api/v1/<recurso>/<id>/
+for recurso in api.RECURSOS:
+    urlpatterns += [
+        path(f'api/v1/{recurso}/', api.RecursoAPIView.as_view(recurso=recurso), name=f'api_{recurso}'),
+        path(f'api/v1/{recurso}/<int:pk>/', api.RecursoAPIView.as_view(recurso=recurso), name=f'api_{recurso}_detalle'),
+    ]
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Registro de cambios por grupo de datos y GET condicional (ETag / Last-Modified).
+
+`registrar_cambio()` es el único punto por el que pasan las modificaciones:
+lo llaman las señales post_save/post_delete (core.signals) y los caminos
+masivos que no disparan señales (bulk_create, update). Incrementa
+VersionTabla.version del grupo dentro de la transacción actual, así la
+nueva versión se ve recién cuando el cambio se confirma. Las claves de
+core.cache incluyen estas versiones: subirlas invalida también lo cacheado
+del grupo, en todos los procesos.
+
+Las vistas leen las versiones con `estado()` (una consulta a una tabla de
+cuatro filas) y, si el ETag que manda el cliente coincide, responden 304 Not
+Modified sin consultar los datos ni renderizar.
+
+En los pedidos GET/HEAD, VersionesMiddleware guarda las versiones leídas la
+primera vez (todas las filas, en una consulta) y las reutilizan el resto de
+las lecturas del pedido: GET condicional, caché de página u objeto y
+fragmentos de la plantilla. Un GET no modifica datos; si igual se registra
+un cambio, la copia se descarta.
+"""
+import contextvars
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VersionTabla
+
+
+GRUPOS = ('estudiante', 'curso', 'profesor', 'matricula')
+
+
+class _Instantanea:
+    """Versiones de todos los grupos leídas en el pedido actual (None = sin leer)"""
+    filas = None
+
+
+_instantanea = contextvars.ContextVar('versiones_pedido', default=None)
+
+
+def registrar_cambio(*grupos):
+    """Incrementa la versión de los grupos en la base (e invalida así su caché)"""
+    grupos = set(grupos)
+    ahora = timezone.now()
+    actualizadas = VersionTabla.objects.filter(grupo__in=grupos).update(version=F('version') + 1, modificado=ahora)
+    if actualizadas < len(grupos):
+        # Primera modificación del grupo (o tabla vaciada): se crean las filas que faltan
+        existentes = set(VersionTabla.objects.filter(grupo__in=grupos).values_list('grupo', flat=True))
+        VersionTabla.objects.bulk_create(
+            [VersionTabla(grupo=grupo, version=1, modificado=ahora) for grupo in grupos - existentes],
+            ignore_conflicts=True,
+        )
+    instantanea = _instantanea.get()
+    if instantanea is not None:
+        instantanea.filas = None
+
+
+def estado(grupos):
+    """
+    Versión combinada y fecha del último cambio de los grupos.
+
+    Returns:
+        tuple: (texto con las versiones, datetime del último cambio o None)
+    """
+    instantanea = _instantanea.get()
+    if instantanea is None:
+        return _combinar(grupos, _filas(_consulta(grupos)))
+    if instantanea.filas is None:
+        instantanea.filas = _filas(_consulta())
+    return _combinar(grupos, instantanea.filas)
+
+
+async def aestado(grupos):
+    """Como `estado()`, con el ORM asíncrono (vistas async)"""
+    instantanea = _instantanea.get()
+    if instantanea is None:
+        return _combinar(grupos, {grupo: (v, m) async for grupo, v, m in _consulta(grupos)})
+    if instantanea.filas is None:
+        instantanea.filas = {grupo: (v, m) async for grupo, v, m in _consulta()}
+    return _combinar(grupos, instantanea.filas)
+
+
+def _consulta(grupos=GRUPOS):
+    return VersionTabla.objects.filter(grupo__in=grupos).values_list('grupo', 'version', 'modificado')
+
+
+def _filas(consulta):
+    return {grupo: (version, modificado) for grupo, version, modificado in consulta}
+
+
+def _combinar(grupos, filas):
+    version = '.'.join(str(filas[grupo][0]) if grupo in filas else '0' for grupo in grupos)
+    return version, max((filas[grupo][1] for grupo in grupos if grupo in filas), default=None)
+
+
+def etag(*partes):
+    """ETag (sin comillas) a partir de las partes que identifican la respuesta"""
+    return hashlib.md5(repr(partes).encode()).hexdigest()
+
+
+class VersionesMiddleware:
+    """
+    Lee las versiones una sola vez por pedido GET/HEAD (ver `estado()`).
+
+    Funciona con WSGI y ASGI; sync_to_async copia el contexto, así las
+    vistas async comparten la misma copia.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        token = _instantanea.set(_Instantanea())
+        try:
+            return self.get_response(request)
+        finally:
+            _instantanea.reset(token)
+
+    async def __acall__(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return await self.get_response(request)
+        token = _instantanea.set(_Instantanea())
+        try:
+            return await self.get_response(request)
+        finally:
+            _instantanea.reset(token)
@@ -1,19 +1,27 @@
-from django.shortcuts import render, get_object_or_404
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy, reverse
-from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.http import HttpResponse
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
+from django.views.generic import View, ListView, DetailView, CreateView, UpdateView, DeleteView, FormView, TemplateView
+from django.http import JsonResponse, FileResponse, Http404, HttpResponse
+from django import forms
 from django.db import models
-from .models import Estudiante, Curso, Profesor, Matricula 
-from .forms import EstudianteForm, CursoForm, ProfesorForm, MatriculaForm
-from django.db.models import Q
-import csv
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from datetime import datetime
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
+from .models import Estudiante, Curso, Profesor, Matricula, ReporteJob
+from .forms import EstudianteForm, CursoForm, ProfesorForm, MatriculaForm, MatriculaLoteForm, NotasCSVForm
+from .exporters import Columna, lineas_csv, respuesta_async, respuesta_descarga
+from .paginacion import KeysetPaginator
+from . import cache as cache_core
+from . import estadisticas, exporters, matriculas, metricas, notas, prometheus, reportes, versiones
+from django.db.models import Prefetch
 
 
 def home(request):
@@ -22,49 +30,296 @@ def home(request):
     
     Muestra los últimos 6 registros de estudiantes, cursos y profesores
     para dar una vista rápida del estado del sistema.
+
+    Optimización: El bloque se cachea como fragmento ({% cache_versionado %});
+    los querysets son perezosos y solo se consultan si el fragmento no está
+    en caché o alguno de los tres modelos cambió.
     """
     recent_students = Estudiante.objects.order_by('-id')[:6]
-    recent_courses = Curso.objects.order_by('-id')[:6]
+    recent_courses = Curso.objects.select_related('profesor').order_by('-id')[:6]
     recent_professors = Profesor.objects.order_by('-id')[:6]
-    return render(request, 'home.html', {
+    return TemplateResponse(request, 'home.html', {
         'recent_students': recent_students,
         'recent_courses': recent_courses,
         'recent_professors': recent_professors,
     })
 
+
+class KeysetPaginationMixin:
+    """
+    Paginación por cursor (keyset) para ListView.
+
+    Reemplaza el Paginator por OFFSET: cada página filtra "después de la
+    última fila vista" sobre `Meta.ordering` + id, sin COUNT(*), así las
+    páginas profundas cuestan lo mismo que la primera. En lugar del total
+    exacto se muestra una estimación (`estimate_count`) cuando no hay búsqueda.
+
+    Si la vista declara `cache_grupos`, cada página (filas, cursores y total
+    estimado) se guarda en caché por query string y se invalida cuando cambia
+    alguno de esos grupos de datos (ver core.cache).
+
+    Parámetros GET:
+        cursor: Token de la página (lo generan los enlaces Anterior/Siguiente)
+        orden: Clave de `keyset_orderings` (ej: 'inscriptos'); sin él se usa Meta.ordering
+    """
+    keyset_pagination = True
+    estimate_count = True
+    # nombre -> lista de campos; cada orden debería tener su índice
+    keyset_orderings = {}
+    # Grupos de core.cache de los que dependen las páginas (vacío = sin caché)
+    cache_grupos = ()
+
+    def get_keyset_ordering(self):
+        """Orden pedido en ?orden= (None = Meta.ordering del modelo)"""
+        return self.keyset_orderings.get(self.request.GET.get('orden'))
+
+    def get_context_data(self, **kwargs):
+        """Agrega el orden activo para marcar el encabezado correspondiente"""
+        context = super().get_context_data(**kwargs)
+        orden = self.request.GET.get('orden')
+        context['orden'] = orden if orden in self.keyset_orderings else ''
+        return context
+
+    def paginate_queryset(self, queryset, page_size):
+        """Retorna (paginator, page, object_list, is_paginated) como ListView espera"""
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        if getattr(self, 'paginacion_async', None) is not None:
+            return self.paginacion_async
+        paginator = KeysetPaginator(queryset, page_size, ordering=self.get_keyset_ordering(),
+                                    estimar_total=self.estimate_count)
+
+        def paginar():
+            return paginator.paginar(self.request.GET.get('cursor'), parametros=self.request.GET)
+
+        if self.cache_grupos:
+            page = cache_core.obtener(
+                f"pagina:{type(self).__name__}", self.cache_grupos,
+                (self.request.GET.urlencode(), page_size), paginar,
+            )
+        else:
+            page = paginar()
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        Versión asíncrona de `paginate_queryset()` (AsyncListMixin).
+
+        El resultado queda guardado para que `get_context_data()` lo use sin
+        volver a consultar.
+        """
+        paginator = KeysetPaginator(queryset, page_size, ordering=self.get_keyset_ordering(),
+                                    estimar_total=self.estimate_count)
+
+        async def paginar():
+            return await paginator.apaginar(self.request.GET.get('cursor'), parametros=self.request.GET)
+
+        if self.cache_grupos:
+            page = await cache_core.aobtener(
+                f"pagina:{type(self).__name__}", self.cache_grupos,
+                (self.request.GET.urlencode(), page_size), paginar,
+            )
+        else:
+            page = await paginar()
+        self.paginacion_async = (paginator, page, page.object_list, page.has_other_pages())
+        return self.paginacion_async
+
+
+class CacheObjectMixin:
+    """
+    Caché del objeto de las vistas de detalle.
+
+    `get_object()` (con sus select_related/prefetch_related ya resueltos) se
+    guarda en caché por pk y se invalida cuando cambia cualquiera de los
+    grupos de `cache_grupos` (ver core.cache). Un 404 no se cachea.
+    """
+    cache_grupos = ()
+
+    def get_object(self, queryset=None):
+        if queryset is not None or not self.cache_grupos:
+            return super().get_object(queryset)
+        return cache_core.obtener(
+            f"objeto:{type(self).__name__}", self.cache_grupos,
+            (self.kwargs.get(self.pk_url_kwarg),), super().get_object,
+        )
+
+    async def aget_object(self):
+        """Versión asíncrona de `get_object()` por pk, con `aget()` (AsyncDetailMixin)"""
+        pk = self.kwargs.get(self.pk_url_kwarg)
+
+        async def leer():
+            try:
+                return await self.get_queryset().aget(pk=pk)
+            except self.model.DoesNotExist:
+                raise Http404(f"No existe {self.model._meta.verbose_name} con id {pk}")
+
+        if not self.cache_grupos:
+            return await leer()
+        return await cache_core.aobtener(f"objeto:{type(self).__name__}", self.cache_grupos, (pk,), leer)
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) con las versiones de core.versiones.
+
+    Antes de armar la respuesta se leen las versiones de los grupos de
+    `cache_grupos` (una consulta a una tabla de cuatro filas). Si el cliente
+    manda If-None-Match o If-Modified-Since y nada cambió, se responde
+    304 Not Modified sin consultar los datos ni renderizar; vale también para
+    las descargas (?export=csv). El ETag depende de la vista, la URL completa
+    y el usuario (las páginas muestran su nombre).
+
+    Solo las respuestas 200 llevan ETag; un 404 o el 202 de ?export=pdf no.
+    En las vistas async las versiones se leen con el ORM asíncrono.
+    """
+    cache_grupos = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not self.cache_grupos:
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self._dispatch_async(request, *args, **kwargs)
+        validadores = self._validadores(request, *versiones.estado(self.cache_grupos))
+        no_modificado = get_conditional_response(request, *validadores)
+        if no_modificado is not None:
+            return no_modificado
+        return self._marcar(super().dispatch(request, *args, **kwargs), *validadores)
+
+    async def _dispatch_async(self, request, *args, **kwargs):
+        validadores = self._validadores(request, *await versiones.aestado(self.cache_grupos))
+        no_modificado = get_conditional_response(request, *validadores)
+        if no_modificado is not None:
+            return no_modificado
+        return self._marcar(await super().dispatch(request, *args, **kwargs), *validadores)
+
+    def _validadores(self, request, version, modificado):
+        """(ETag, Last-Modified como timestamp o None) de la respuesta pedida"""
+        etag = quote_etag(versiones.etag(
+            type(self).__name__, version, modificado, request.user.pk, request.get_full_path(),
+        ))
+        return etag, int(modificado.timestamp()) if modificado else None
+
+    def _marcar(self, response, etag, ultima_modificacion):
+        if response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+            if ultima_modificacion is not None:
+                response.headers.setdefault('Last-Modified', http_date(ultima_modificacion))
+            # El navegador guarda la página pero la revalida en cada visita
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ExportMixin:
+    """
+    Exportación de las vistas de listado con el registro de core.exporters.
+
+    La vista declara una sola vez `export_columns` (lista de `Columna`),
+    `export_filename`, `export_title` y opcionalmente `export_align`;
+    `?export=<formato>` elige el exportador entre `export_formats`, que se
+    importa recién al primer uso (el PDF, con reportlab, no se carga al
+    iniciar el worker).
+
+    - CSV, JSON y XLSX se envían en streaming durante la petición, recorriendo
+      `get_queryset()` por bloques con `values_list`, sin instanciar modelos
+      ni armar el archivo completo en memoria.
+    - PDF se genera en segundo plano: se encola un ReporteJob y se responde
+      al instante (HTTP 202) con su id y las URLs para consultar el estado y
+      descargar. El comando `procesar_reportes` llama a `render_export()`.
+    """
+    export_formats = ('csv', 'json', 'xlsx', 'pdf')
+    export_columns = []
+    export_filename = 'export'
+    export_title = ''
+    export_align = 'CENTER'
+
+    def get_export_format(self):
+        """Formato pedido en ?export= si la vista lo ofrece; si no, None"""
+        formato = self.request.GET.get('export')
+        return formato if formato in self.export_formats else None
+
+    def get_exporter(self, formato):
+        """Instancia el exportador registrado para el formato con las columnas de la vista"""
+        clase = exporters.exportador(formato)
+        return clase(self.export_columns, titulo=self.export_title, alineacion=self.export_align)
+
+    def export(self, formato):
+        """Descarga en streaming o, si el formato se genera en segundo plano, encola el reporte"""
+        exportador = self.get_exporter(formato)
+        nombre = f'{self.export_filename}.{formato}'
+        if exportador.en_segundo_plano:
+            vista = f"{type(self).__module__}.{type(self).__qualname__}"
+            job = reportes.encolar(
+                vista, formato, reportes.parametros_de(self.request.GET),
+                nombre_descarga=nombre, usuario=self.request.user,
+            )
+            return JsonResponse(reporte_a_dict(job), status=202)
+        return exportador.response(self.get_queryset(), nombre)
+
+    def render_export(self, formato, destino):
+        """Escribe en `destino` el archivo del queryset actual (lo ejecuta el worker de reportes)"""
+        self.get_exporter(formato).render(destino, self.get_queryset())
+
+    def get(self, request, *args, **kwargs):
+        """Con ?export=<formato> descarga el listado; si no, lista normal"""
+        formato = self.get_export_format()
+        if formato:
+            return self.export(formato)
+        return super().get(request, *args, **kwargs)
+
+
 # ============================================================================
 # VISTAS DE ESTUDIANTES
 # ============================================================================
 
-class EstudianteListView(LoginRequiredMixin, ListView):
+class EstudianteListView(LoginRequiredMixin, ConditionalGetMixin, KeysetPaginationMixin, ExportMixin, ListView):
     """
     Vista de listado de estudiantes con búsqueda avanzada y exportación.
     
     Características:
-        - Paginación: 10 registros por página
-        - Búsqueda: Por nombre, apellido o documento (case-insensitive)
-        - Exportación: CSV y PDF mediante ?export=csv y ?export=pdf
+        - Paginación: 10 registros por página, por cursor (apellido, nombre, id)
+        - Orden por cantidad de cursos (?orden=matriculas) con los totales guardados
+        - Búsqueda: Por nombre, apellido o documento (índice FTS, sin acentos ni mayúsculas)
+        - Filtro: solo activos (?activos=1), con el índice parcial estudiante_activos_idx
+        - Exportación: CSV, JSON y XLSX en streaming (?export=csv|json|xlsx) y PDF (?export=pdf)
+        - Caché: cada página y la tabla renderizada, hasta que cambien estudiantes o matrículas
+        - GET condicional: 304 Not Modified (también en ?export=csv) si nada cambió
         - Autenticación: Requiere LoginRequiredMixin
     
     URLs:
         /estudiantes/ - Listado con paginación
         /estudiantes/?q=busca - Búsqueda filtrada
         /estudiantes/?export=csv - Descarga CSV
+        /estudiantes/?export=json - Descarga JSON
+        /estudiantes/?export=xlsx - Descarga Excel
         /estudiantes/?export=pdf - Descarga PDF
     """
     model = Estudiante
     paginate_by = 10
     template_name = 'estudiantes/estudiante_list.html'
+    keyset_orderings = {'matriculas': ['-cantidad_matriculas', 'apellido', 'nombre']}
+    cache_grupos = ('estudiante', 'matricula')
+    export_filename = 'estudiantes'
+    export_title = 'Reporte de Estudiantes'
+    export_columns = [
+        Columna('Nombre', 'nombre', ancho=1.3),
+        Columna('Apellido', 'apellido', ancho=1.3),
+        Columna('Documento', 'documento', ancho=1.2),
+        Columna('Email', 'email', ancho=1.3),
+        Columna('Fecha de Nacimiento', 'fecha_nacimiento', titulo_corto='F. Nacimiento', ancho=1.1),
+        Columna('Activo', 'activo', ancho=0.7),
+    ]
 
     def get_queryset(self):
         """
         Retorna queryset filtrado según parámetro de búsqueda 'q'.
         
-        Búsqueda: Se filtra por nombre, apellido o documento con búsqueda
-        case-insensitive usando Q objects de Django.
+        Búsqueda: Se filtra por nombre, apellido o documento con el índice de
+        texto (`Estudiante.objects.buscar`); cada palabra se busca como prefijo
+        y sin distinguir acentos ni mayúsculas.
         
-        Parámetro GET:
+        Parámetros GET:
             q: Término de búsqueda
+            activos: '1' para listar solo estudiantes activos
         
         Returns:
             QuerySet: Estudiantes filtrados o todos si no hay búsqueda
@@ -72,99 +327,12 @@ class EstudianteListView(LoginRequiredMixin, ListView):
         queryset = super().get_queryset()
         q = self.request.GET.get('q')
         if q:
-            queryset = queryset.filter(
-                models.Q(nombre__icontains=q) |
-                models.Q(apellido__icontains=q) |
-                models.Q(documento__icontains=q)
-            )
+            queryset = queryset.buscar(q)
+        if self.request.GET.get('activos') == '1':
+            queryset = queryset.filter(activo=True)
         return queryset
 
-    def get(self, request, *args, **kwargs):
-        """Maneja solicitud GET: si export=csv, descarga CSV; si export=pdf, descarga PDF; si no, lista normal"""
-        if request.GET.get('export') == 'csv':
-            return self.export_csv()
-        if request.GET.get('export') == 'pdf':
-            return self.export_pdf()
-        return super().get(request, *args, **kwargs)
-
-    def export_csv(self):
-        """Exporta todos los estudiantes a archivo CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="estudiantes.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Nombre', 'Apellido', 'Documento', 'Email', 'Fecha de Nacimiento', 'Activo'])
-        
-        for estudiante in self.get_queryset():
-            writer.writerow([
-                estudiante.nombre,
-                estudiante.apellido,
-                estudiante.documento,
-                estudiante.email,
-                estudiante.fecha_nacimiento,
-                'Sí' if estudiante.activo else 'No'
-            ])
-        
-        return response
-
-    def export_pdf(self):
-        """Exporta todos los estudiantes a archivo PDF con tabla formateada"""
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="estudiantes.pdf"'
-        
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Título
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=20,
-            alignment=1
-        )
-        story.append(Paragraph('Reporte de Estudiantes', title_style))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Datos para la tabla
-        data = [['Nombre', 'Apellido', 'Documento', 'Email', 'F. Nacimiento', 'Activo']]
-        for estudiante in self.get_queryset():
-            data.append([
-                estudiante.nombre,
-                estudiante.apellido,
-                estudiante.documento,
-                estudiante.email,
-                estudiante.fecha_nacimiento.strftime('%d/%m/%Y') if estudiante.fecha_nacimiento else '-',
-                'Sí' if estudiante.activo else 'No'
-            ])
-        
-        # Tabla con estilo
-        table = Table(data, colWidths=[1.3*inch, 1.3*inch, 1.2*inch, 1.3*inch, 1.1*inch, 0.7*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
-        ]))
-        story.append(table)
-        
-        # Footer con fecha
-        story.append(Spacer(1, 0.3*inch))
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
-        story.append(Paragraph(f'Generado: {datetime.now().strftime("%d/%m/%Y %H:%M")}', footer_style))
-        
-        doc.build(story)
-        return response
-
-class EstudianteDetailView(LoginRequiredMixin, DetailView):
+class EstudianteDetailView(LoginRequiredMixin, ConditionalGetMixin, CacheObjectMixin, DetailView):
     """
     Vista de detalle de estudiante con matrículas y cursos asociados.
     
@@ -174,22 +342,29 @@ class EstudianteDetailView(LoginRequiredMixin, DetailView):
         - Información de cursos matriculados
         - Notas asignadas
     
-    Optimización: Usa prefetch_related para evitar problema N+1 en queries.
+    Optimización: Usa prefetch_related para evitar problema N+1 en queries
+    (matrículas con curso y profesor en una sola consulta adicional); el
+    estudiante con sus matrículas se guarda en caché (CacheObjectMixin).
     """
     model = Estudiante
     template_name = 'estudiantes/estudiante_detail.html'
+    # 'profesor': el template muestra el profesor de cada curso
+    cache_grupos = ('estudiante', 'matricula', 'curso', 'profesor')
 
     def get_queryset(self):
         """
         Retorna queryset optimizado con prefetch_related.
         
-        Optimización: Carga matrículas y sus cursos asociados en una sola
-        consulta adicional, evitando queries separadas por cada matrícula.
+        Optimización: Carga matrículas, sus cursos y el profesor de cada
+        curso (select_related dentro del Prefetch) en una sola consulta
+        adicional, evitando queries separadas por cada matrícula.
         
         Returns:
-            QuerySet: Estudiantes con matrículas y cursos precargadas
+            QuerySet: Estudiantes con matrículas, cursos y profesores precargados
         """
-        return super().get_queryset().prefetch_related('matriculas__curso')
+        return super().get_queryset().prefetch_related(
+            Prefetch('matriculas', queryset=Matricula.objects.select_related('curso__profesor'))
+        )
 
 class EstudianteCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """
@@ -246,25 +421,44 @@ class EstudianteDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteVi
 # VISTAS DE CURSOS
 # ============================================================================
 
-class CursoListView(LoginRequiredMixin, ListView):
+class CursoListView(LoginRequiredMixin, ConditionalGetMixin, KeysetPaginationMixin, ExportMixin, ListView):
     """
     Vista de listado de cursos con búsqueda avanzada y exportación.
     
     Características:
-        - Paginación: 10 registros por página
-        - Búsqueda: Por código, nombre o profesor
-        - Exportación: CSV y PDF mediante parámetros GET
+        - Paginación: 10 registros por página, por cursor (código, id)
+        - Orden por inscriptos (?orden=inscriptos) con los totales guardados
+        - Búsqueda: Por código, nombre o profesor (índice FTS, sin JOIN ni DISTINCT)
+        - Exportación: CSV, JSON y XLSX en streaming y PDF mediante parámetros GET
         - Optimización: select_related('profesor') para evitar N+1
+        - Caché: cada página y la tabla renderizada, hasta que cambien cursos, profesores o matrículas
+        - GET condicional: 304 Not Modified (también en ?export=csv) si nada cambió
     
     URLs:
         /cursos/ - Listado completo
         /cursos/?q=busca - Búsqueda filtrada
         /cursos/?export=csv - Descarga CSV
+        /cursos/?export=json - Descarga JSON
+        /cursos/?export=xlsx - Descarga Excel
         /cursos/?export=pdf - Descarga PDF
     """
     model = Curso
     paginate_by = 10
     template_name = 'cursos/curso_list.html'
+    keyset_orderings = {'inscriptos': ['-cantidad_matriculas', 'codigo']}
+    cache_grupos = ('curso', 'profesor', 'matricula')
+    export_filename = 'cursos'
+    export_title = 'Reporte de Cursos'
+    export_columns = [
+        Columna('Código', 'codigo', ancho=1),
+        Columna('Nombre', 'nombre', ancho=1.5),
+        Columna(
+            'Profesor', 'profesor__nombre', 'profesor__apellido', ancho=2,
+            formato=lambda nombre, apellido: f"{nombre} {apellido}" if nombre is not None else "Sin profesor",
+        ),
+        Columna('Descripción', 'descripcion', ancho=2, recorte=50),
+    ]
+    export_align = 'LEFT'
 
     def get_queryset(self):
         """
@@ -273,7 +467,8 @@ class CursoListView(LoginRequiredMixin, ListView):
         Optimización: select_related('profesor') carga el profesor en la misma
         query que el curso, evitando una query adicional por cada curso.
         
-        Búsqueda: Filtra por código, nombre o datos del profesor.
+        Búsqueda: Filtra por código, nombre o datos del profesor con el índice
+        de texto (`Curso.objects.buscar`).
         
         Returns:
             QuerySet: Cursos filtrados con profesor precargado
@@ -282,100 +477,12 @@ class CursoListView(LoginRequiredMixin, ListView):
         q = self.request.GET.get('q')
 
         if q:
-            # Búsqueda por múltiples campos: código, nombre o datos del profesor
-            queryset = queryset.filter(
-                Q(codigo__icontains=q) |
-                Q(nombre__icontains=q) |
-                Q(profesor__nombre__icontains=q) |
-                Q(profesor__apellido__icontains=q) 
-            ).distinct() 
+            # Búsqueda indexada por código, nombre o datos del profesor
+            queryset = queryset.buscar(q)
 
         return queryset
-
-    def get(self, request, *args, **kwargs):
-        """Maneja solicitud GET: si export=csv, descarga CSV; si export=pdf, descarga PDF; si no, lista normal"""
-        if request.GET.get('export') == 'csv':
-            return self.export_csv()
-        if request.GET.get('export') == 'pdf':
-            return self.export_pdf()
-        return super().get(request, *args, **kwargs)
-
-    def export_csv(self):
-        """Exporta todos los cursos a archivo CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="cursos.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Código', 'Nombre', 'Profesor', 'Descripción'])
-        
-        for curso in self.get_queryset():
-            writer.writerow([
-                curso.codigo,
-                curso.nombre,
-                f"{curso.profesor.nombre} {curso.profesor.apellido}" if curso.profesor else "Sin profesor",
-                curso.descripcion
-            ])
         
-        return response
-
-    def export_pdf(self):
-        """Exporta todos los cursos a archivo PDF con tabla formateada"""
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="cursos.pdf"'
-        
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Título
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=20,
-            alignment=1
-        )
-        story.append(Paragraph('Reporte de Cursos', title_style))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Datos para la tabla
-        data = [['Código', 'Nombre', 'Profesor', 'Descripción']]
-        for curso in self.get_queryset():
-            profesor_nombre = f"{curso.profesor.nombre} {curso.profesor.apellido}" if curso.profesor else "Sin profesor"
-            data.append([
-                curso.codigo,
-                curso.nombre,
-                profesor_nombre,
-                curso.descripcion[:50] + "..." if len(curso.descripcion) > 50 else curso.descripcion
-            ])
-        
-        # Tabla con estilo
-        table = Table(data, colWidths=[1*inch, 1.5*inch, 2*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
-        ]))
-        story.append(table)
-        
-        # Footer con fecha
-        story.append(Spacer(1, 0.3*inch))
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
-        story.append(Paragraph(f'Generado: {datetime.now().strftime("%d/%m/%Y %H:%M")}', footer_style))
-        
-        doc.build(story)
-        return response
-        
-class CursoDetailView(LoginRequiredMixin, DetailView):
+class CursoDetailView(LoginRequiredMixin, ConditionalGetMixin, CacheObjectMixin, DetailView):
     """
     Vista de detalle de curso con estudiantes matriculados.
     
@@ -385,10 +492,12 @@ class CursoDetailView(LoginRequiredMixin, DetailView):
         - Estudiantes matriculados
         - Notas de cada estudiante (si existen)
     
-    Optimización: Usa select_related + prefetch_related para evitar N+1 queries
+    Optimización: Usa select_related + prefetch_related para evitar N+1 queries;
+    el curso con sus matrículas se guarda en caché (CacheObjectMixin).
     """
     model = Curso
     template_name = 'cursos/curso_detail.html'
+    cache_grupos = ('curso', 'matricula', 'estudiante', 'profesor')
 
     def get_queryset(self):
         """
@@ -463,7 +572,7 @@ class MatriculaCreateView(LoginRequiredMixin, CreateView):
     Vista para matricular estudiantes en cursos.
     
     Características:
-        - Filtra automáticamente estudiantes NO matriculados
+        - Elige el alumno con un buscador (solo estudiantes NO matriculados)
         - Asigna el curso desde la URL
         - Valida que no exista matrícula duplicada
         - Guarda fecha de matrícula automáticamente
@@ -471,8 +580,9 @@ class MatriculaCreateView(LoginRequiredMixin, CreateView):
     URL: /cursos/<id>/matricular/
     Redirección exitosa: /cursos/<id>/ (detalle del curso)
     
-    Lógica: El formulario recibe el curso_id de la URL y filtra
-            los estudiantes que YA NO están matriculados en ese curso.
+    Lógica: El formulario recibe el curso_id de la URL y valida que el
+            alumno enviado NO esté matriculado en ese curso. La página no
+            lista estudiantes: los sugiere MatriculaBuscarEstudiantesView.
     """
     model = Matricula
     form_class = MatriculaForm
@@ -501,108 +611,276 @@ class MatriculaCreateView(LoginRequiredMixin, CreateView):
         return reverse('curso_detail', kwargs={'pk': self.curso.pk})
 
 
+class MatriculaBuscarEstudiantesView(LoginRequiredMixin, View):
+    """
+    Autocompletado de alumnos para el formulario de matrícula.
+
+    URL: /cursos/<id>/matricular/estudiantes/?q=<texto>&limite=<n>
+    Respuesta JSON: {"resultados": [{"id": 1, "texto": "Apellido, Nombre (documento)"}, ...]}
+
+    Optimización: Retorna como máximo `matriculas.MAX_SUGERENCIAS` alumnos
+    no matriculados (NOT EXISTS), buscando por prefijo con el índice de texto.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        curso = get_object_or_404(Curso, pk=self.kwargs['pk'])
+        try:
+            limite = int(request.GET.get('limite', matriculas.MAX_SUGERENCIAS))
+        except ValueError:
+            limite = matriculas.MAX_SUGERENCIAS
+        resultados = matriculas.sugerir_estudiantes(curso, request.GET.get('q', ''), limite)
+        return JsonResponse({'resultados': resultados})
+
+
+class MatriculaLoteView(LoginRequiredMixin, FormView):
+    """
+    Vista para matricular una cohorte completa en un curso en un solo envío.
+
+    Características:
+        - Recibe los documentos de los alumnos pegados en un textarea
+        - Inserta todas las matrículas en una transacción (bulk_create)
+        - Muestra el resultado de cada documento: creada, ya matriculado
+          o no encontrado
+
+    URL: /cursos/<id>/matricular/lote/
+
+    Optimización: La cantidad de consultas es fija (ver core.matriculas),
+    no crece con la cantidad de alumnos.
+    """
+    form_class = MatriculaLoteForm
+    template_name = 'cursos/matricular_lote_form.html'
+
+    @cached_property
+    def curso(self):
+        """Curso de la URL; se busca después del control de acceso"""
+        return get_object_or_404(Curso, pk=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        """Pasa el curso al contexto para mostrar en el template"""
+        context = super().get_context_data(**kwargs)
+        context['curso'] = self.curso
+        return context
+
+    def form_valid(self, form):
+        """Matricula los documentos y vuelve a mostrar el formulario con los resultados"""
+        documentos = form.cleaned_data['documentos']
+        if len(documentos) > matriculas.MAX_MATRICULAS:
+            form.add_error('documentos', f"Máximo {matriculas.MAX_MATRICULAS} documentos por envío")
+            return self.form_invalid(form)
+        resultados = matriculas.matricular_documentos(documentos, [self.curso.pk], form.cleaned_data['nota'])
+        return self.render_to_response(self.get_context_data(
+            form=self.form_class(),
+            resultados=resultados,
+            resumen=matriculas.resumen(resultados),
+        ))
+
+
+class CursoNotasView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """
+    Planilla de notas: todas las matrículas del curso en una grilla editable.
+
+    Características:
+        - Un envío guarda las notas de todo el curso (un único bulk_update
+          de las filas que cambiaron, en una transacción)
+        - Valida todas las filas antes de escribir: con un error no se
+          guarda ninguna y se marcan las filas a corregir
+        - Concurrencia optimista: si otra persona cambió una nota desde que
+          se abrió la planilla, se muestra el valor nuevo y no se guarda nada
+        - También acepta un CSV `documento,nota` pegado o subido
+
+    URL: /cursos/<id>/notas/
+
+    Optimización: La cantidad de consultas es fija (ver core.notas), no
+    crece con la cantidad de alumnos del curso.
+    """
+    template_name = 'cursos/curso_notas.html'
+    permission_required = 'core.change_matricula'
+
+    @cached_property
+    def curso(self):
+        """Curso de la URL; se busca después de los controles de acceso"""
+        return get_object_or_404(Curso.objects.select_related('profesor'), pk=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        """Curso, filas de la grilla y formulario del CSV"""
+        context = super().get_context_data(**kwargs)
+        context['curso'] = self.curso
+        if 'filas' not in context:
+            context['filas'] = self._filas(notas.planilla(self.curso.pk))
+        context.setdefault('csv_form', NotasCSVForm())
+        return context
+
+    @staticmethod
+    def _filas(filas):
+        """
+        Agrega a cada fila los textos de la grilla: `valor` (lo que muestra el
+        input) y `original` (campo oculto con la nota vista, sin localizar:
+        la plantilla la mostraría con coma decimal). Las filas que vuelven de
+        un envío conservan lo enviado.
+        """
+        for fila in filas:
+            actual = '' if fila['nota'] is None else str(fila['nota'])
+            fila.setdefault('original', actual)
+            fila.setdefault('valor', actual)
+        return filas
+
+    @staticmethod
+    def _refrescar(fila):
+        """La fila vuelve a mostrar la nota actual de la base"""
+        fila.pop('valor', None)
+        fila.pop('original', None)
+
+    def post(self, request, *args, **kwargs):
+        if 'cargar_csv' in request.POST:
+            return self._post_csv(request)
+        filas = notas.planilla(self.curso.pk)
+        nuevas, originales, errores = {}, {}, 0
+        for fila in filas:
+            valor = request.POST.get(f"nota_{fila['id']}")
+            if valor is None:
+                # Matrícula creada después de abrir la planilla: no se toca
+                continue
+            fila['valor'], fila['original'] = valor, request.POST.get(f"original_{fila['id']}", '')
+            nuevas[fila['id']], fila['error'] = notas.limpiar_nota(valor)
+            errores += fila['error'] is not None
+            originales[fila['id']] = notas.nota_original(fila['original'])
+            fila['editada'] = fila['error'] is not None or nuevas[fila['id']] != originales[fila['id']]
+        if errores:
+            # Las filas editadas conservan la nota original enviada, así el
+            # próximo envío sigue detectando cambios ajenos
+            for fila in filas:
+                if not fila.get('editada'):
+                    self._refrescar(fila)
+            return self.render_to_response(self.get_context_data(filas=self._filas(filas), errores=errores))
+
+        resultado = notas.guardar(self.curso.pk, nuevas, originales)
+        if resultado['conflictos']:
+            # En las filas en conflicto se conserva lo que escribió el usuario y el
+            # campo oculto pasa a la nota actual: si vuelve a guardar, sobrescribe
+            # a sabiendas. Las que no editó muestran la nota actual.
+            for fila in filas:
+                fila['conflicto'] = fila['id'] in resultado['conflictos']
+                if fila['conflicto']:
+                    fila.pop('original', None)
+                elif not fila.get('editada'):
+                    self._refrescar(fila)
+            return self.render_to_response(self.get_context_data(
+                filas=self._filas(filas), conflictos=len(resultado['conflictos']),
+            ))
+        return self.render_to_response(self.get_context_data(actualizadas=resultado['actualizadas']))
+
+    def _post_csv(self, request):
+        """Aplica un CSV documento,nota: todo o nada, como la grilla"""
+        csv_form = NotasCSVForm(request.POST, request.FILES)
+        if not csv_form.is_valid():
+            return self.render_to_response(self.get_context_data(csv_form=csv_form))
+        por_documento, errores_csv = notas.leer_csv(csv_form.cleaned_data['contenido'])
+        ids = notas.matriculas_por_documento(self.curso.pk, por_documento)
+        errores_csv += [
+            f"Documento {documento}: no está matriculado en este curso"
+            for documento in por_documento if documento not in ids
+        ]
+        if errores_csv:
+            return self.render_to_response(self.get_context_data(csv_form=csv_form, errores_csv=errores_csv))
+        resultado = notas.guardar(self.curso.pk, {ids[documento]: nota for documento, nota in por_documento.items()})
+        return self.render_to_response(self.get_context_data(actualizadas=resultado['actualizadas']))
+
+
+class MatriculaLoteAPIView(LoginRequiredMixin, View):
+    """
+    Endpoint JSON de matrícula masiva.
+
+    URL: /matriculas/lote/ (solo POST, cuerpo JSON)
+
+    Cuerpo:
+        - Varios estudiantes en un curso:
+          {"curso": 1, "estudiantes": [10, 11, 12]}  o  {"curso": 1, "documentos": ["123", "456"]}
+        - Un estudiante en varios cursos:
+          {"estudiante": 10, "cursos": [1, 2, 3]}
+        - "nota" (opcional): nota inicial de las matrículas nuevas
+
+    Respuesta: {"resumen": {...}, "resultados": [{estudiante, curso, resultado}, ...]}
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        try:
+            datos = json.loads(request.body)
+            if not isinstance(datos, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            cursos = self._ids(datos, 'curso', 'cursos')
+            nota = MatriculaLoteForm.base_fields['nota'].clean(datos.get('nota'))
+            if 'documentos' in datos:
+                documentos = [str(d) for d in self._lista(datos['documentos'])]
+                total = len(documentos) * len(cursos)
+            else:
+                estudiantes = self._ids(datos, 'estudiante', 'estudiantes')
+                total = len(estudiantes) * len(cursos)
+        except forms.ValidationError as exc:
+            return JsonResponse({'error': ' '.join(exc.messages)}, status=400)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+        if total > matriculas.MAX_MATRICULAS:
+            return JsonResponse({'error': f"Máximo {matriculas.MAX_MATRICULAS} matrículas por pedido"}, status=400)
+        if 'documentos' in datos:
+            resultados = matriculas.matricular_documentos(documentos, cursos, nota)
+        else:
+            resultados = matriculas.matricular(estudiantes, cursos, nota)
+        return JsonResponse({'resumen': matriculas.resumen(resultados), 'resultados': resultados})
+
+    @staticmethod
+    def _lista(valor):
+        if not isinstance(valor, list):
+            raise ValueError("Se esperaba una lista")
+        return valor
+
+    def _ids(self, datos, singular, plural):
+        """Lista de ids desde `singular` (un valor) o `plural` (lista)"""
+        valores = [datos[singular]] if singular in datos else self._lista(datos.get(plural, []))
+        if not valores:
+            raise ValueError(f"Falta '{singular}' o '{plural}'")
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in valores):
+            raise ValueError(f"'{plural}' debe contener ids enteros")
+        return valores
+
+
 # ============================================================================
 # VISTAS DE PROFESORES
 # ============================================================================
 
-class ProfesorListView(LoginRequiredMixin, ListView):
+class ProfesorListView(LoginRequiredMixin, ConditionalGetMixin, ExportMixin, ListView):
     """
     Vista de listado de todos los profesores del sistema.
     
     Características:
         - Listado completo sin búsqueda (tabla simple)
-        - Exportación: CSV y PDF mediante ?export=csv y ?export=pdf
+        - Exportación: CSV, JSON y XLSX en streaming (?export=csv|json|xlsx) y PDF (?export=pdf)
         - Muestra: Nombre, apellido, email
         - Acciones: Ver detalle, editar, eliminar
+        - Caché: la tabla renderizada, hasta que cambien los profesores
+        - GET condicional: 304 Not Modified (también en ?export=csv) si nada cambió
     
     URLs:
         /profesores/ - Listado completo
         /profesores/?export=csv - Descarga CSV
+        /profesores/?export=json - Descarga JSON
+        /profesores/?export=xlsx - Descarga Excel
         /profesores/?export=pdf - Descarga PDF
     """
     model = Profesor
     template_name = 'profesores/profesor_list.html'
+    export_filename = 'profesores'
+    export_title = 'Reporte de Profesores'
+    export_columns = [
+        Columna('Nombre', 'nombre', ancho=2),
+        Columna('Apellido', 'apellido', ancho=2),
+        Columna('Email', 'email', ancho=2.5),
+    ]
+    cache_grupos = ('profesor',)
 
-    def get(self, request, *args, **kwargs):
-        """Maneja solicitud GET: si export=csv, descarga CSV; si export=pdf, descarga PDF; si no, lista normal"""
-        if request.GET.get('export') == 'csv':
-            return self.export_csv()
-        if request.GET.get('export') == 'pdf':
-            return self.export_pdf()
-        return super().get(request, *args, **kwargs)
-
-    def export_csv(self):
-        """Exporta todos los profesores a archivo CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="profesores.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Nombre', 'Apellido', 'Email'])
-        
-        for profesor in self.get_queryset():
-            writer.writerow([
-                profesor.nombre,
-                profesor.apellido,
-                profesor.email
-            ])
-        
-        return response
-
-    def export_pdf(self):
-        """Exporta todos los profesores a archivo PDF con tabla formateada"""
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="profesores.pdf"'
-        
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Título
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=20,
-            alignment=1
-        )
-        story.append(Paragraph('Reporte de Profesores', title_style))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Datos para la tabla
-        data = [['Nombre', 'Apellido', 'Email']]
-        for profesor in self.get_queryset():
-            data.append([
-                profesor.nombre,
-                profesor.apellido,
-                profesor.email
-            ])
-        
-        # Tabla con estilo
-        table = Table(data, colWidths=[2*inch, 2*inch, 2.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')])
-        ]))
-        story.append(table)
-        
-        # Footer con fecha
-        story.append(Spacer(1, 0.3*inch))
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
-        story.append(Paragraph(f'Generado: {datetime.now().strftime("%d/%m/%Y %H:%M")}', footer_style))
-        
-        doc.build(story)
-        return response
-
-class ProfesorDetailView(LoginRequiredMixin, DetailView):
+class ProfesorDetailView(LoginRequiredMixin, ConditionalGetMixin, CacheObjectMixin, DetailView):
     """
     Vista de detalle de profesor con cursos que imparte.
     
@@ -611,10 +889,12 @@ class ProfesorDetailView(LoginRequiredMixin, DetailView):
         - Lista de cursos que imparte
         - Cantidad de estudiantes por curso
     
-    Optimización: Usa prefetch_related para cargar cursos en una consulta
+    Optimización: Usa prefetch_related para cargar cursos en una consulta;
+    el profesor con sus cursos se guarda en caché (CacheObjectMixin).
     """
     model = Profesor
     template_name = 'profesores/profesor_detail.html'
+    cache_grupos = ('profesor', 'curso')
 
     def get_queryset(self):
         """
@@ -666,4 +946,272 @@ class ProfesorDeleteView(LoginRequiredMixin, DeleteView):
     """
     model = Profesor
     template_name = 'profesores/profesor_confirm_delete.html'
-    success_url = reverse_lazy('profesor_list')
\ No newline at end of file
+    success_url = reverse_lazy('profesor_list')
+
+
+# ============================================================================
+# ESTADÍSTICAS DE NOTAS
+# ============================================================================
+
+class EstadisticasView(LoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    """
+    Tablero de estadísticas de notas por curso, por profesor y general.
+
+    Características:
+        - Promedio, mediana, percentiles, mínimo/máximo, histograma y
+          porcentaje de aprobados (NOTA_APROBACION)
+        - Exportación CSV (?export=csv) y JSON (?export=json) del nivel elegido
+
+    URLs:
+        /estadisticas/?nivel=curso|profesor|general
+        /estadisticas/?nivel=profesor&export=csv
+
+    Optimización: Cada nivel sale de una consulta agrupada por (grupo, nota)
+    (ver core.estadisticas); nunca se leen las matrículas una por una. Si no
+    cambiaron las notas responde 304 (ConditionalGetMixin).
+    """
+    template_name = 'estadisticas.html'
+    cache_grupos = ('matricula', 'curso', 'profesor')
+
+    def get(self, request, *args, **kwargs):
+        """Si export=csv o export=json descarga los datos; si no, muestra el tablero"""
+        self.nivel = request.GET.get('nivel', 'curso')
+        if self.nivel not in estadisticas.NIVELES:
+            raise Http404("Nivel de estadísticas desconocido")
+        formato = request.GET.get('export')
+        if formato == 'csv':
+            filas_csv = (estadisticas.fila_csv(d) for d in estadisticas.distribuciones(self.nivel))
+            return respuesta_descarga(
+                lineas_csv(estadisticas.encabezados_csv(), filas_csv),
+                f'estadisticas_{self.nivel}.csv', 'text/csv',
+            )
+        if formato == 'json':
+            return JsonResponse({
+                'nivel': self.nivel,
+                'nota_aprobacion': float(estadisticas.nota_aprobacion()),
+                'resultados': [d.como_dict() for d in estadisticas.distribuciones(self.nivel)],
+            })
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        """Resumen general más las distribuciones del nivel elegido"""
+        context = super().get_context_data(**kwargs)
+        general = estadisticas.distribuciones('general')
+        context.update({
+            'nivel': self.nivel,
+            'niveles': [('curso', 'Por curso'), ('profesor', 'Por profesor')],
+            'general': general[0] if general else None,
+            'distribuciones': estadisticas.distribuciones(self.nivel) if self.nivel != 'general' else general,
+            'rangos': [f'{desde}-{hasta}' for desde, hasta in estadisticas.RANGOS_HISTOGRAMA],
+            'nota_aprobacion': estadisticas.nota_aprobacion(),
+        })
+        return context
+
+
+# ============================================================================
+# MÉTRICAS DE RENDIMIENTO
+# ============================================================================
+
+class MetricasView(UserPassesTestMixin, View):
+    """
+    Métricas por ruta de este proceso en JSON (ver core.metricas).
+
+    Por cada patrón de URL: pedidos, errores, consultas SQL (promedio y
+    máximo) y tiempos promedio de SQL, plantillas y total, más p50/p95/p99
+    de la latencia. Ordenado por tiempo total consumido.
+
+    Acceso: usuarios staff o pedidos desde INTERNAL_IPS (ej: un script en
+    el mismo servidor); el resto recibe 403.
+
+    URL:
+        /metricas/
+    """
+    http_method_names = ['get', 'head']
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff or self.request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'rutas': metricas.REGISTRO.resumen()})
+
+
+class MetricasPrometheusView(MetricasView):
+    """
+    Métricas en el formato de texto de Prometheus (ver core.prometheus).
+
+    Además de staff e INTERNAL_IPS acepta el encabezado
+    `Authorization: Bearer <METRICAS_TOKEN>`, para el scraper de Prometheus.
+    Con METRICAS_DIR suma las métricas de todos los workers.
+
+    URL:
+        /metrics
+    """
+
+    def test_func(self):
+        token = settings.METRICAS_TOKEN
+        if token and constant_time_compare(self.request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return True
+        return super().test_func()
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(prometheus.texto(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ============================================================================
+# VISTAS ASÍNCRONAS (ASGI)
+# ============================================================================
+#
+# Versiones async de las vistas de lectura más pedidas. Las usa urls.py cuando
+# VISTAS_ASYNC está activo (asgi.py lo activa): con un servidor ASGI un worker
+# atiende muchos clientes lentos a la vez, porque mientras espera a la red no
+# ocupa un hilo. Las consultas van por el ORM asíncrono (aget, async for) y
+# la plantilla se renderiza después, en el hilo de la base, así lo que quede
+# perezoso en ella (fragmentos en caché, `user`) funciona igual que en WSGI.
+
+async def home_async(request):
+    """
+    Versión async de `home`.
+
+    Los querysets son perezosos: solo se consultan al renderizar si el
+    fragmento de la página no está en caché.
+    """
+    return TemplateResponse(request, 'home.html', {
+        'recent_students': Estudiante.objects.order_by('-id')[:6],
+        'recent_courses': Curso.objects.select_related('profesor').order_by('-id')[:6],
+        'recent_professors': Profesor.objects.order_by('-id')[:6],
+    })
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """
+    LoginRequiredMixin para vistas async.
+
+    `request.user` se carga con una consulta síncrona que no puede hacerse
+    desde el event loop: se resuelve antes con `request.auser()`.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        response = super().dispatch(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+
+class AsyncListMixin(AsyncLoginRequiredMixin):
+    """
+    get() asíncrono para las vistas de listado (con o sin KeysetPaginationMixin).
+
+    Las exportaciones usan el mismo código síncrono en el hilo de la base y
+    el CSV se envía con un iterador asíncrono (`respuesta_async`).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        formato = self.get_export_format()
+        if formato:
+            return respuesta_async(await sync_to_async(self.export)(formato))
+        # La búsqueda puede consultar si el índice FTS está disponible
+        self.object_list = await sync_to_async(self.get_queryset)()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size and getattr(self, 'keyset_pagination', False):
+            await self.apaginate_queryset(self.object_list, page_size)
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncDetailMixin(AsyncLoginRequiredMixin):
+    """get() asíncrono para las vistas de detalle con CacheObjectMixin"""
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+class EstudianteListAsyncView(AsyncListMixin, EstudianteListView):
+    """Versión async de EstudianteListView"""
+
+
+class CursoListAsyncView(AsyncListMixin, CursoListView):
+    """Versión async de CursoListView"""
+
+
+class ProfesorListAsyncView(AsyncListMixin, ProfesorListView):
+    """Versión async de ProfesorListView"""
+
+
+class EstudianteDetailAsyncView(AsyncDetailMixin, EstudianteDetailView):
+    """Versión async de EstudianteDetailView"""
+
+
+class CursoDetailAsyncView(AsyncDetailMixin, CursoDetailView):
+    """Versión async de CursoDetailView"""
+
+
+# ============================================================================
+# VISTAS DE REPORTES EN SEGUNDO PLANO
+# ============================================================================
+
+def reporte_a_dict(job):
+    """Serializa el estado de un ReporteJob para las respuestas JSON"""
+    datos = {
+        'id': job.pk,
+        'estado': job.estado,
+        'estado_url': reverse('reporte_estado', kwargs={'pk': job.pk}),
+        'descarga_url': None,
+        'error': job.error or None,
+    }
+    if job.estado == ReporteJob.LISTO:
+        datos['descarga_url'] = reverse('reporte_descargar', kwargs={'pk': job.pk})
+    return datos
+
+
+class ReporteEstadoView(LoginRequiredMixin, DetailView):
+    """
+    Consulta el estado de un reporte encolado.
+
+    URL: /reportes/<id>/
+    Respuesta JSON: id, estado, estado_url, descarga_url (si está listo), error
+    """
+    model = ReporteJob
+
+    def render_to_response(self, context, **response_kwargs):
+        """Responde JSON en lugar de renderizar un template"""
+        return JsonResponse(reporte_a_dict(self.object))
+
+
+class ReporteDescargarView(LoginRequiredMixin, DetailView):
+    """
+    Descarga el archivo de un reporte terminado.
+
+    URL: /reportes/<id>/descargar/
+    Retorna 404 si el reporte no está listo o su archivo ya no existe.
+    """
+    model = ReporteJob
+
+    def get_queryset(self):
+        """Solo los reportes terminados pueden descargarse"""
+        return super().get_queryset().filter(estado=ReporteJob.LISTO)
+
+    def get(self, request, *args, **kwargs):
+        """
+        El archivo de un reporte no cambia una vez generado: responde 304 si
+        el cliente ya lo tiene (ETag = clave + id, Last-Modified = terminado).
+        """
+        self.object = self.get_object()
+        etag = quote_etag(f"{self.object.clave}-{self.object.pk}")
+        terminado = int(self.object.terminado.timestamp()) if self.object.terminado else None
+        no_modificado = get_conditional_response(request, etag=etag, last_modified=terminado)
+        if no_modificado is not None:
+            return no_modificado
+        response = self.render_to_response(self.get_context_data(object=self.object))
+        response.headers['ETag'] = etag
+        if terminado is not None:
+            response.headers['Last-Modified'] = http_date(terminado)
+        return response
+
+    def render_to_response(self, context, **response_kwargs):
+        """Envía el archivo en caché con el nombre de descarga del reporte"""
+        ruta = reportes.directorio() / self.object.archivo
+        if not ruta.is_file():
+            raise Http404("El archivo del reporte ya no está disponible")
+        return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=self.object.nombre_descarga)
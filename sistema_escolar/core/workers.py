@@ -0,0 +1,34 @@
+"""
+Puntos de entrada para pools de procesos.
+
+Los procesos hijos se crean con 'spawn' y desempaquetan estas funciones
+antes de que Django esté configurado, por eso este módulo no importa
+modelos a nivel de módulo: cada función los importa al ejecutarse.
+"""
+
+
+def inicializar():
+    """Inicializador del pool: prepara Django en cada proceso hijo"""
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
+
+
+def ejecutar_reporte(job_id):
+    """Genera el archivo de un ReporteJob (ver `core.reportes.ejecutar`)"""
+    from core import prometheus, reportes
+
+    estado = reportes.ejecutar(job_id)
+    # El proceso del pool puede quedar ocioso mucho tiempo: la exportación
+    # se publica ya en METRICAS_DIR (si está configurada) para /metrics
+    prometheus.volcar()
+    return estado
+
+
+def generar_boletines(ids):
+    """Renderiza un lote de boletines (ver `core.boletines.renderizar_lote`)"""
+    from core import boletines
+
+    return boletines.renderizar_lote(ids)
@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sistema_escolar.settings")
+# Con ASGI las vistas de lectura se sirven en su versión async (ver core/urls.py)
+os.environ.setdefault("VISTAS_ASYNC", "True")
+application = get_asgi_application()